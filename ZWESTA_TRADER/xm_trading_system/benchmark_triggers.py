@@ -0,0 +1,105 @@
+"""
+Benchmark: SL/TP checks with the trigger index vs. scanning every position
+Run with: python benchmark_triggers.py [positions] [quotes]
+"""
+
+import random
+import sys
+import time
+
+from src.risk.trigger_index import TriggerIndex
+
+
+def make_positions(n: int, symbols: list, seed: int = 42) -> list:
+    """Synthetic positions spread around 1.1000 with 10-60 pip SL/TP"""
+    rng = random.Random(seed)
+    positions = []
+    for ticket in range(n):
+        side = rng.choice(("BUY", "SELL"))
+        entry = 1.1 + rng.uniform(-0.005, 0.005)
+        sl_dist = rng.uniform(0.0010, 0.0060)
+        tp_dist = rng.uniform(0.0010, 0.0060)
+        if side == "BUY":
+            sl, tp = entry - sl_dist, entry + tp_dist
+        else:
+            sl, tp = entry + sl_dist, entry - tp_dist
+        positions.append((ticket, rng.choice(symbols), side, sl, tp))
+    return positions
+
+
+def make_quotes(n: int, symbols: list, seed: int = 7) -> list:
+    """Random-walk quotes with a 1 pip spread"""
+    rng = random.Random(seed)
+    prices = {s: 1.1 for s in symbols}
+    quotes = []
+    for _ in range(n):
+        symbol = rng.choice(symbols)
+        prices[symbol] += rng.gauss(0, 0.00005)
+        bid = prices[symbol]
+        quotes.append((symbol, bid, bid + 0.0001))
+    return quotes
+
+
+def naive_scan(positions: list, quotes: list) -> int:
+    """What check_and_close_positions did before: test every open position"""
+    open_positions = {p[0]: p for p in positions}
+    fired = 0
+    for symbol, bid, ask in quotes:
+        for ticket, (_, pos_symbol, side, sl, tp) in list(open_positions.items()):
+            if pos_symbol != symbol:
+                continue
+            price = bid if side == "BUY" else ask
+            if side == "BUY":
+                hit = price >= tp or price <= sl
+            else:
+                hit = price <= tp or price >= sl
+            if hit:
+                del open_positions[ticket]
+                fired += 1
+    return fired
+
+
+def indexed(positions: list, quotes: list) -> int:
+    index = TriggerIndex()
+    for ticket, symbol, side, sl, tp in positions:
+        index.add(ticket, symbol, side, sl, tp)
+    fired = 0
+    for symbol, bid, ask in quotes:
+        fired += len(index.check(symbol, bid, ask))
+    return fired
+
+
+def main():
+    n_positions = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    n_quotes = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    symbols = ["EURUSD", "GBPUSD", "USDJPY", "USDCAD"]
+
+    positions = make_positions(n_positions, symbols)
+    quotes = make_quotes(n_quotes, symbols)
+
+    print("\n" + "=" * 60)
+    print(f"TRIGGER BENCHMARK - {n_positions} positions, {n_quotes} quotes")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    naive_fired = naive_scan(positions, quotes)
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_fired = indexed(positions, quotes)
+    index_time = time.perf_counter() - start
+
+    print(f"  Scan all positions : {naive_time * 1000:9.1f} ms  ({naive_fired} closes)")
+    print(f"  Trigger index      : {index_time * 1000:9.1f} ms  ({index_fired} closes, incl. build)")
+    print(f"  Per quote          : {naive_time / n_quotes * 1e6:9.1f} us -> {index_time / n_quotes * 1e6:.1f} us")
+    print(f"  Speedup            : {naive_time / index_time:9.1f}x")
+
+    if naive_fired != index_fired:
+        print("\n[FAIL] Trigger counts differ")
+        return 1
+    print("\n[OK] Same positions closed by both methods\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ from typing import Dict, List
 from src.utils.logger import get_logger
 from src.utils.config_loader import get_config
 from src.api.xm_connector import XMConnector
+from src.data.event_log import EventReader
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 CORS(app)
@@ -80,13 +81,31 @@ def get_price_with_history(symbol: str) -> Dict:
         logger.error(f"Error getting price for {symbol}: {e}")
         return {'price': 0, 'bid': 0, 'ask': 0, 'trend': 'neutral', 'trend_percent': 0}
 
-def load_trades_from_logs():
-    """Load trade history from log files"""
+event_reader = EventReader()
+
+def trade_from_event(event: Dict) -> Dict:
+    """Shape a close event as a dashboard trade row"""
+    return {
+        'ticket': event.get('ticket'),
+        'symbol': event.get('symbol'),
+        'type': event.get('side'),
+        'volume': event.get('volume', 0),
+        'entry_price': event.get('entry_price', 0),
+        'exit_price': event.get('close_price', 0),
+        'profit': event.get('profit', 0),
+        'status': event.get('close_reason') or 'closed',
+        'open_time': event.get('open_time'),
+        'timestamp': event.get('close_time')
+    }
+
+def load_trades_from_logs(last: int = 0):
+    """Load closed trades from the trader's event log (oldest first; last > 0 for the newest only)"""
     try:
-        log_file = 'logs/trading_log.json'
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                return json.load(f)
+        if last:
+            events = event_reader.last(last, types=("close",))
+        else:
+            events = event_reader.read(types=("close",))
+        return [trade_from_event(e) for e in events]
     except Exception as e:
         logger.error(f"Error loading trades: {e}")
     return []
@@ -152,11 +171,10 @@ def get_positions():
 def get_trades():
     """Get recent trades"""
     try:
-        trades = load_trades_from_logs()
-        # Return last 20 trades
+        # Last 20 trades, read through the event log index
         return jsonify({
             'status': 'success',
-            'data': trades[-20:] if trades else []
+            'data': load_trades_from_logs(last=20)
         })
     except Exception as e:
         logger.error(f"Error fetching trades: {e}")
@@ -3,31 +3,53 @@ XM Global Trading System - Main Application
 Automated scalping bot with volatility-based entry, risk management, and profitability filters
 """
 
-import time
+import logging
 import signal
+import threading
+import time
 import sys
 from datetime import datetime, timedelta
 from typing import Optional
 
 from src.utils.logger import get_logger
 from src.utils.config_loader import get_config
+from src.utils.clock import get_clock, VirtualClock
+from src.utils.instrumentation import get_instrumentation
+from src.utils.metrics import get_metrics, MetricsServer
 from src.api.xm_connector import XMConnector
+from src.api.paper_connector import PaperConnector
 from src.risk.position_manager import PositionManager
+from src.risk.deal_reconciler import DealReconciler
+from src.risk.stop_manager import StopManager
+from src.risk.portfolio_risk import PortfolioRisk
 from src.trading.profitability_filter import ProfitabilityFilter
 from src.trading.volatility_analyzer import VolatilityAnalyzer
 from src.trading.trade_executor import TradeExecutor
 from src.trading.market_scanner import MarketScanner
+from src.trading.order_book import OrderManager
+from src.trading.execution_queue import ExecutionQueue
+from src.trading.execution_analytics import ExecutionAnalytics
+from src.data.tick_recorder import TickRecorder
+from src.data.event_log import EventLog
+from src.data.bar_builder import TIMEFRAME_SECONDS
+from src.utils.scheduler import Scheduler
 
 
 class XMTradingSystem:
     """Main trading system orchestrator"""
     
-    def __init__(self):
+    def __init__(self, api_connector=None):
+        """
+        api_connector: prebuilt connector (e.g. a PaperConnector on a TickReplay
+        for simulation); by default an XMConnector is created from the credentials
+        """
         self.logger = get_logger()
         self.config = get_config()
+        self.clock = get_clock()
+        self.instruments = get_instrumentation()
         
         # Validate credentials
-        if not self.config.xm_login or not self.config.xm_password:
+        if api_connector is None and (not self.config.xm_login or not self.config.xm_password):
             self.logger.error(
                 "ERROR: MT5 credentials not configured!\n"
                 "Please create a .env file with the following variables:\n"
@@ -38,32 +60,95 @@ class XMTradingSystem:
                 "See .env.example for a template."
             )
             raise ValueError("Missing MT5 credentials in environment variables")
+        self.settings = self.config.risk_settings()
+        self.config.add_reload_listener(self._on_config_reload)
         self.running = False
+        self.stopped = False
         self.cycle_count = 0
         
         # Initialize components
-        self.api = XMConnector(
+        self.api = api_connector or XMConnector(
             login=self.config.xm_login,
             password=self.config.xm_password,
             server=self.config.xm_server
         )
+        if api_connector is None and self.config.trading_mode == "paper":
+            # Live quotes from MT5, simulated fills - no orders reach the broker
+            self.api = PaperConnector(self.api)
+        
+        # Structured signal/order/fill/modify/close events for the dashboard and analysis
+        self.event_log = EventLog() if self.config.get("event_log.enabled", True) else None
         
         self.position_manager = PositionManager(self.api)
+        if self.event_log is not None:
+            self.position_manager.add_close_listener(self._on_position_closed)
+        self.deal_reconciler = DealReconciler(self.api, self.position_manager)
+        self.stop_manager = StopManager(self.api, self.position_manager, self.event_log)
+        self.portfolio_risk = PortfolioRisk(self.position_manager, self.api.symbol_specs)
         self.volatility_analyzer = VolatilityAnalyzer()
         self.profitability_filter = ProfitabilityFilter(self.position_manager)
+        self.order_manager = OrderManager(self.api, self.position_manager, self.event_log)
+        
+        # Send market orders from worker threads so scanning never waits on order_send
+        # (not on a virtual clock: worker threads would race the simulated time)
+        self.execution_queue = None
+        if self.config.get("execution.async_orders", True) and not isinstance(self.clock, VirtualClock):
+            self.execution_queue = ExecutionQueue(self.api)
+        
+        # Fill quality (slippage, spread, order round-trip) kept across restarts
+        self.execution_analytics = None
+        if self.config.get("execution_analytics.enabled", True):
+            self.execution_analytics = ExecutionAnalytics()
+            self.execution_analytics.load()
         
         self.trade_executor = TradeExecutor(
             api_connector=self.api,
             position_manager=self.position_manager,
             volatility_analyzer=self.volatility_analyzer,
-            profitability_filter=self.profitability_filter
+            profitability_filter=self.profitability_filter,
+            portfolio_risk=self.portfolio_risk,
+            order_manager=self.order_manager,
+            execution_queue=self.execution_queue,
+            execution_analytics=self.execution_analytics,
+            event_log=self.event_log,
+            deal_reconciler=self.deal_reconciler
         )
         
         self.market_scanner = MarketScanner(self.api)
         
+        # Record every tick the terminal delivers for later replay
+        self.tick_recorder = None
+        if api_connector is None and self.config.get("tick_recorder.enabled", True):
+            self.tick_recorder = TickRecorder()
+            self.api.add_tick_listener(self.tick_recorder.on_tick)
+        
+        # One loop drives every periodic job and sleeps until the next one is due
+        self.scheduler = Scheduler(self.clock)
+        self._pushed_ticks = {}  # latest tick per symbol since the last exit check
+        self._tick_lock = threading.Lock()
+        self.api.add_tick_listener(self._on_tick)
+        
+        # Prometheus metrics; the endpoint only serves values the trading loop sets
+        metrics = get_metrics()
+        self.balance_gauge = metrics.gauge("xm_account_balance", "Account balance")
+        self.equity_gauge = metrics.gauge("xm_account_equity", "Account equity")
+        metrics.gauge("xm_open_positions", "Tracked open positions").set_function(
+            lambda: len(self.position_manager.open_positions))
+        self.exposure_gauge = metrics.gauge("xm_gross_exposure_usd", "Gross notional exposure by asset class",
+                                            ("asset_class",))
+        self.cycle_latency = metrics.histogram("xm_cycle_duration_seconds", "Market cycle duration",
+                                               buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+        self.reconnects_total = metrics.counter("xm_reconnects_total", "Terminal reconnects after a failed heartbeat")
+        self.metrics_server = MetricsServer(metrics) if self.config.get("metrics.enabled", False) else None
+        
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
+        if hasattr(signal, "SIGUSR1"):
+            # kill -USR1 <pid>: instrumentation report now; kill -USR2: toggle the profiler
+            signal.signal(signal.SIGUSR1, lambda sig, frame: self.scheduler.notify("instrumentation_now"))
+            signal.signal(signal.SIGUSR2, lambda sig, frame: self.instruments.set_profiling(
+                not self.instruments.profiler.running))
     
     def _signal_handler(self, sig, frame):
         """Handle shutdown signals"""
@@ -83,6 +168,17 @@ class XMTradingSystem:
                 self.logger.error("Failed to connect to XM Global")
                 return False
             
+            # Contract specs for sizing and lot/price rounding
+            symbols = self.config.get_all_symbols()
+            self.api.symbol_specs.load(symbols)
+            if self.tick_recorder is not None:
+                self.tick_recorder.save_specs(
+                    spec for spec in map(self.api.symbol_specs.get, symbols) if spec is not None
+                )
+            
+            # Pick up positions left open by a previous run
+            self.position_manager.reconcile_with_terminal()
+            
             # Get account info
             account_info = self.api.get_account_info()
             self.logger.info(
@@ -91,6 +187,18 @@ class XMTradingSystem:
                 f"Currency: {account_info.get('currency', 'USD')}"
             )
             
+            if self.tick_recorder is not None:
+                self.tick_recorder.start()
+            
+            if self.event_log is not None:
+                self.event_log.start()
+            
+            if self.metrics_server is not None:
+                self.metrics_server.start()
+            
+            # Load local bar history
+            self.market_scanner.warm_start()
+            
             # Log configuration
             self.logger.info(f"Trading Mode: {self.config.trading_mode}")
             self.logger.info(f"Symbols: {self.config.get_all_symbols()}")
@@ -116,36 +224,88 @@ class XMTradingSystem:
             self.logger.error(f"Initialization error: {e}")
             return False
     
+    def simulate(self, replay) -> int:
+        """
+        Run the whole bot over recorded ticks on a VirtualClock
+        Scheduled jobs run at their due simulated times between ticks, so 24h
+        windows, expiries and rate limits behave as live, only faster.
+        The system must be built with set_clock(VirtualClock()) in effect and
+        a connector fed by the replay
+        Returns: number of ticks replayed
+        """
+        if not isinstance(self.clock, VirtualClock):
+            raise ValueError("simulate() requires set_clock(VirtualClock()) before building the system")
+        
+        ticks = iter(replay.ticks())
+        first = next(ticks, None)
+        if first is None:
+            self.logger.warning("Simulation: no ticks to replay")
+            return 0
+        
+        self.clock.advance_to(first[1].time_msc / 1000)
+        replay.publish(*first)
+        if not self.initialize():
+            return 0
+        
+        self.running = True
+        self._schedule_jobs()
+        count = 1
+        try:
+            for symbol, tick in ticks:
+                if not self.running:
+                    break
+                self.scheduler.run_until(tick.time_msc / 1000)
+                replay.publish(symbol, tick)
+                count += 1
+        finally:
+            self.stop()
+        self.logger.info(f"Simulation finished: {count} ticks, {self.cycle_count} cycles")
+        return count
+    
+    def _on_tick(self, symbol: str, tick):
+        """Keep the latest tick per symbol and wake the scheduler to check exits on it"""
+        with self._tick_lock:
+            self._pushed_ticks[symbol] = tick
+        self.scheduler.notify("exits")
+    
+    def _take_pushed_ticks(self) -> dict:
+        with self._tick_lock:
+            ticks, self._pushed_ticks = self._pushed_ticks, {}
+        return ticks
+    
+    def _schedule_jobs(self):
+        """Register the periodic jobs (intervals from the scheduler config section)"""
+        scheduler = self.scheduler
+        scheduler.every("reconcile", self.config.get("scheduler.reconcile_interval", 1), self._reconcile)
+        scheduler.every("scan", self.config.get("scheduler.scan_interval", 5), self._market_cycle)
+        scheduler.every("stats", self.config.get("scheduler.stats_interval", 300), self._log_session_stats)
+        scheduler.every("heartbeat", self.config.get("scheduler.heartbeat_interval", 30), self._heartbeat,
+                        first_delay=self.config.get("scheduler.heartbeat_interval", 30))
+        scheduler.on_event("exits", self._check_exits)
+        if not isinstance(self.clock, VirtualClock):
+            scheduler.every("config_watch", self.config.get("config_watch.interval", 2), self.config.check_for_changes)
+        if self.instruments.enabled:
+            scheduler.every("instrumentation", self.config.get("instrumentation.report_interval", 300),
+                            self._log_instrumentation, first_delay=self.config.get("instrumentation.report_interval", 300))
+            scheduler.on_event("instrumentation_now", self._log_instrumentation)
+        
+        # Rescan right after each bar closes instead of waiting for the next scan slot
+        timeframe = self.config.get("trading.timeframe", "5m")
+        if timeframe in TIMEFRAME_SECONDS:
+            scheduler.every("bar_close", TIMEFRAME_SECONDS[timeframe], lambda: scheduler.run_soon("scan"),
+                            align=True, offset=self.config.get("scheduler.bar_close_offset", 1.0))
+    
     def run(self):
         """Main trading loop"""
         if not self.initialize():
             return
         
         self.running = True
-        scan_interval = 5  # Scan every 5 seconds
-        last_scan = 0
-        last_stats_log = 0
-        stats_log_interval = 300  # Log stats every 5 minutes
-        
+        self._schedule_jobs()
         self.logger.info("Starting trading loop...")
         
         try:
-            while self.running:
-                current_time = time.time()
-                self.cycle_count += 1
-                
-                # Perform market scan
-                if current_time - last_scan >= scan_interval:
-                    self._market_cycle()
-                    last_scan = current_time
-                
-                # Log statistics
-                if current_time - last_stats_log >= stats_log_interval:
-                    self._log_session_stats()
-                    last_stats_log = current_time
-                
-                # Sleep to prevent CPU overload
-                time.sleep(0.1)
+            self.scheduler.run()
         
         except KeyboardInterrupt:
             self.logger.info("Keyboard interrupt received")
@@ -154,32 +314,121 @@ class XMTradingSystem:
         finally:
             self.stop()
     
+    def _reconcile(self):
+        """Apply finished orders and broker-side fills/closes"""
+        try:
+            # Apply orders completed since the last cycle
+            if self.execution_queue is not None:
+                self.execution_queue.drain()
+            
+            # Track pending entries that filled, expired or were cancelled
+            # (before deal polling, so a filled entry already stopped out is closed too)
+            self.order_manager.poll_fills()
+            self.order_manager.expire()
+            
+            # Drop positions the broker already closed (server-side SL/TP)
+            self.deal_reconciler.poll()
+        except Exception as e:
+            self.logger.error(f"Reconciliation error: {e}")
+    
+    def _check_exits(self):
+        """Run stop management and TP/SL checks on the latest pushed ticks"""
+        ticks = self._take_pushed_ticks()
+        if not ticks or not self.position_manager.get_open_positions_count():
+            return
+        try:
+            # Built from the ticks rather than fetched, so checking exits does not publish more ticks
+            quotes = {}
+            for symbol in self.position_manager.open_positions.symbols():
+                tick = ticks.get(symbol)
+                if tick is not None:
+                    spec = self.api.symbol_specs.get(symbol)
+                    quotes[symbol] = {"symbol": symbol, "bid": tick.bid, "ask": tick.ask,
+                                      "digits": spec.digits if spec else 5}
+            if not quotes:
+                return
+            self.stop_manager.on_quotes(quotes)
+            self.stop_manager.flush()
+            self.trade_executor.check_and_close_positions(quotes)
+        except Exception as e:
+            self.logger.error(f"Exit check error: {e}")
+    
+    def _log_instrumentation(self):
+        """Log stage timings, API counters and profiler samples, then start a new window"""
+        self.logger.info(self.instruments.report(reset=self.config.get("instrumentation.reset_on_report", True)))
+    
+    def _on_position_closed(self, position: dict):
+        """Close event for every tracked position, whether we or the broker closed it"""
+        fields = {k: v for k, v in position.items() if k not in ("ticket", "type")}
+        self.event_log.emit("close", position["ticket"], side=position["type"], **fields)
+    
+    def _on_config_reload(self, snapshot):
+        """Apply reloaded risk settings and job intervals; other sections take effect on restart"""
+        self.settings = snapshot.risk
+        for name in ("scan", "reconcile", "stats", "heartbeat"):
+            job = self.scheduler.jobs.get(name)
+            interval = self.config.get(f"scheduler.{name}_interval")
+            if job is not None and interval and interval != job.interval:
+                self.logger.info(f"Scheduler: {name} interval {job.interval}s -> {interval}s")
+                job.interval = interval
+    
+    def _heartbeat(self):
+        """Reconnect if the terminal stopped answering"""
+        if self.api.get_account_info():
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Heartbeat OK - {self.scheduler.get_stats()}")
+            return
+        self.logger.warning("Heartbeat failed - reconnecting to terminal")
+        self.reconnects_total.inc()
+        self.api.connect()
+    
     def _market_cycle(self):
         """Execute one market scanning and trading cycle"""
+        self.cycle_count += 1
+        timer = self.instruments.timer
+        started = time.perf_counter()
         try:
             # Get current account state
             account_info = self.api.get_account_info()
             balance = account_info.get('balance', 0)
+            self.balance_gauge.set(balance)
+            self.equity_gauge.set(account_info.get('equity', balance))
             
-            self.logger.debug(
-                f"\n[Cycle #{self.cycle_count}] "
-                f"Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} | "
-                f"Open Positions: {self.position_manager.get_open_positions_count()} | "
-                f"Balance: ${balance:.2f}"
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    f"\n[Cycle #{self.cycle_count}] "
+                    f"Time: {self.clock.utcnow().strftime('%Y-%m-%d %H:%M:%S')} | "
+                    f"Open Positions: {self.position_manager.get_open_positions_count()} | "
+                    f"Balance: ${balance:.2f}"
+                )
             
             # Scan markets
-            market_data = self.market_scanner.scan_all_markets()
+            with timer("cycle.scan"):
+                market_data = self.market_scanner.scan_all_markets()
             if not market_data:
                 return
             
+            # Ticks seen by the scan are handled below, so the exit check can skip them
+            self._take_pushed_ticks()
+            current_quotes = self.market_scanner.get_current_quotes()
+            
+            # Trail stops / move to breakeven
+            with timer("cycle.stops"):
+                self.stop_manager.on_quotes(current_quotes)
+                self.stop_manager.flush()
+            
             # Check and close any positions that hit TP/SL
-            closed_positions = self.trade_executor.check_and_close_positions(
-                self.market_scanner.get_current_quotes()
-            )
+            with timer("cycle.close_checks"):
+                closed_positions = self.trade_executor.check_and_close_positions(current_quotes)
+            
+            # Covariance and exposure once per cycle, shared by all pre-trade checks
+            with timer("cycle.portfolio_risk"):
+                self.portfolio_risk.update(self.market_scanner.ohlc_cache, current_quotes)
+            for asset_class, gross in self.portfolio_risk.asset_class_exposure().items():
+                self.exposure_gauge.labels(asset_class).set(gross)
             
             # Log trading opportunity
-            self.logger.debug(f"Closed {closed_positions} position(s) this cycle")
+            self.logger.debug("Closed %d position(s) this cycle", closed_positions)
             
             # Look for new trading opportunities
             for symbol, data in market_data.items():
@@ -187,16 +436,15 @@ class XMTradingSystem:
                 ohlc_data = data["ohlc"]
                 
                 # Check if we can open positions
-                if not self.position_manager.can_open_position():
+                if not self.position_manager.can_open_position(self.trade_executor.pending_entries()):
                     continue
                 
                 # Determine entry signal (simplified: based on volatility)
-                volatility_metrics = self.volatility_analyzer.analyze_volatility(symbol, ohlc_data)
+                with timer("cycle.volatility"):
+                    volatility_metrics = self.volatility_analyzer.analyze_volatility(symbol, ohlc_data)
                 
                 # In demo mode, be more aggressive with entry signals
-                demo_mode = self.config.get("demo_mode", False)
-                
-                if demo_mode:
+                if self.settings.demo_mode:
                     # Demo mode: alternate BUY/SELL on each cycle/symbol for more trades
                     if (self.cycle_count + hash(symbol)) % 3 == 0:
                         order_type = "BUY"
@@ -210,16 +458,24 @@ class XMTradingSystem:
                         order_type = "SELL"
                 
                 # Try to execute trade
-                ticket = self.trade_executor.execute_trade(
-                    symbol=symbol,
-                    order_type=order_type,
-                    quote=quote,
-                    ohlc_data=ohlc_data,
-                    account_balance=balance
-                )
+                with timer("cycle.execute"):
+                    ticket = self.trade_executor.execute_trade(
+                        symbol=symbol,
+                        order_type=order_type,
+                        quote=quote,
+                        ohlc_data=ohlc_data,
+                        account_balance=balance
+                    )
+            
+            # Send coalesced limit order reprices
+            self.order_manager.flush()
         
         except Exception as e:
             self.logger.error(f"Market cycle error: {e}")
+        finally:
+            elapsed = time.perf_counter() - started
+            self.instruments.observe("cycle.total", elapsed)
+            self.cycle_latency.observe(elapsed)
     
     def _log_session_stats(self):
         """Log session statistics"""
@@ -242,26 +498,59 @@ class XMTradingSystem:
                 f"${stats['avg_profit']:.2f} avg per trade"
             )
             self.logger.info(self.profitability_filter.get_trading_stats())
+            self.logger.info(self.portfolio_risk.summary())
+            self.logger.info(self.trade_executor.pipeline.get_stats())
+            if self.execution_queue is not None:
+                self.logger.info(self.execution_queue.get_stats())
+            if self.execution_analytics is not None:
+                self.logger.info(self.execution_analytics.report("symbol"))
+            self.logger.info(self.scheduler.get_stats())
             self.logger.info("-" * 80)
         
         except Exception as e:
             self.logger.error(f"Stats logging error: {e}")
     
     def stop(self):
-        """Stop the trading system"""
+        """Stop the trading system (safe to call again, e.g. from the signal handler and then finally)"""
+        if self.stopped:
+            return
+        self.stopped = True
         self.logger.info("Stopping trading system...")
         self.running = False
+        self.scheduler.stop()
+        
+        # Let in-flight orders finish so their positions are tracked
+        if self.execution_queue is not None:
+            self.execution_queue.shutdown()
+        
+        # Cancel working entry orders, then close any open positions
+        for order in list(self.order_manager.index.values()):
+            self.order_manager.cancel(order.ticket)
         
-        # Close any open positions
         open_positions = list(self.position_manager.open_positions.keys())
         if open_positions:
             self.logger.info(f"Closing {len(open_positions)} open positions...")
             for ticket in open_positions:
                 self.api.close_trade(ticket)
         
+        # Persist closed trades and fill records still held in memory
+        self.position_manager.position_history.flush()
+        if self.execution_analytics is not None:
+            self.execution_analytics.save()
+        if self.position_manager.journal is not None:
+            self.position_manager.journal.close()
+        
         # Disconnect
         self.api.disconnect()
         
+        if self.tick_recorder is not None:
+            self.tick_recorder.stop()
+        
+        if self.event_log is not None:
+            self.event_log.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        
         # Final stats
         self._log_session_stats()
         self.logger.info("Trading system stopped")
@@ -0,0 +1,29 @@
+"""Magic Allocator - Per-order MT5 magic numbers that identify the bot's orders"""
+import itertools
+import threading
+from src.utils.clock import get_clock
+
+# Magic numbers used by builds before per-order allocation (234000 + seconds % 1000)
+LEGACY_MAGIC_RANGE = range(234000, 235000)
+
+
+class MagicAllocator:
+    """
+    Unique magic number per order: base * 1,000,000 + sequence
+    The bot's orders share the base (magic // 1,000,000), while each request
+    gets its own number so it can be found again after a timeout. The sequence
+    is seeded from the clock so a restart doesn't reuse recent numbers
+    """
+    
+    def __init__(self, base: int = 234000):
+        self.base = base
+        self._seq = itertools.count(int(get_clock().time() * 10) % 1_000_000)
+        self._lock = threading.Lock()
+    
+    def next(self) -> int:
+        with self._lock:
+            return self.base * 1_000_000 + next(self._seq) % 1_000_000
+    
+    def owns(self, magic: int) -> bool:
+        """True for the bot's orders, including positions opened by the previous magic scheme"""
+        return magic // 1_000_000 == self.base or magic in LEGACY_MAGIC_RANGE
@@ -0,0 +1,472 @@
+"""Paper Trading Connector - Simulated execution against a live quote feed"""
+import functools
+import random
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+from src.risk.trigger_index import TriggerIndex
+from src.api.magic_allocator import MagicAllocator
+
+
+def _locked(method):
+    """Serialize access to the simulated book (order workers vs. the tick feed)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class PaperConnector:
+    """
+    Drop-in replacement for XMConnector that never sends orders
+    Market data comes from a live connector (the feed); fills are simulated
+    with extra spread, random adverse slippage and latency; orders for symbols
+    without a contract spec are rejected, since P&L cannot be priced. Positions, balance,
+    equity and deals are kept in memory, and SL/TP are executed "broker side"
+    on every tick so DealReconciler sees them like real server closes.
+    Several instances can share one feed: quotes are pushed to every engine
+    through the feed's tick listeners
+    """
+
+    def __init__(self, feed, name: str = "paper", seed: Optional[int] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.clock = get_clock()
+        self.feed = feed
+        self.name = name
+        self.symbol_specs = feed.symbol_specs
+        self.currency = self.config.get("paper.currency", "USD")
+        self.balance = float(self.config.get("paper.initial_balance", 10000))
+        self.extra_spread_points = self.config.get("paper.extra_spread_points", 0)
+        self.max_slippage_points = self.config.get("paper.max_slippage_points", 2)
+        self.latency = self.config.get("paper.latency_ms", 0) / 1000
+        self.commission_per_lot = self.config.get("paper.commission_per_lot", 0.0)
+        self.max_quote_age = self.config.get("paper.max_quote_age_seconds", 1.0)
+        self.rng = random.Random(seed)
+
+        self.positions: Dict[int, Dict] = {}
+        self.deals: List[Dict] = []
+        self.triggers = TriggerIndex()
+        self.orders: Dict[int, Dict] = {}
+        self.magic_allocator = MagicAllocator()
+        self.order_results: Dict[int, Dict] = {}
+        self.order_history: List[Dict] = []
+        self._quotes: Dict[str, Dict] = {}
+        self._next_ticket = 1
+        self.connected = False
+        self._lock = threading.RLock()
+        feed.add_tick_listener(self.on_tick)
+
+    # --- Market data (delegated to the feed) ---
+
+    def connect(self) -> bool:
+        """Connect the shared feed (no-op if already connected)"""
+        self.connected = self.feed.connected or self.feed.connect()
+        if self.connected:
+            self.logger.info(f"Paper trading engine '{self.name}' ready - balance {self.balance:.2f} {self.currency}")
+        return self.connected
+
+    def disconnect(self) -> bool:
+        self.connected = False
+        return self.feed.disconnect()
+
+    def add_tick_listener(self, listener):
+        self.feed.add_tick_listener(listener)
+
+    def server_time(self) -> float:
+        """The simulated server runs on the local clock"""
+        return self.clock.time()
+
+    def get_symbol_info(self, symbol: str) -> Optional[Dict]:
+        return self.feed.get_symbol_info(symbol)
+
+    def get_ohlc(self, symbol: str, timeframe: str, bars: int = 100) -> List[Dict]:
+        return self.feed.get_ohlc(symbol, timeframe, bars)
+
+    def get_rates_range(self, symbol: str, timeframe: str, date_from: datetime, date_to: datetime):
+        return self.feed.get_rates_range(symbol, timeframe, date_from, date_to)
+
+    @_locked
+    def on_tick(self, symbol: str, tick):
+        """Feed tick listener: widen the spread, then run broker-side SL/TP"""
+        half = self.extra_spread_points * self._point(symbol) / 2
+        quote = {
+            "symbol": symbol,
+            "bid": tick.bid - half,
+            "ask": tick.ask + half,
+            "time": datetime.fromtimestamp(tick.time).isoformat(),
+            "digits": self._digits(symbol),
+            "received": self.clock.time()
+        }
+        self._quotes[symbol] = quote
+        if self.orders:
+            self._match_orders(symbol, quote["bid"], quote["ask"])
+        for ticket, reason in self.triggers.check(symbol, quote["bid"], quote["ask"]):
+            position = self.positions.get(ticket)
+            if position is None:
+                continue
+            level = position["stop_loss"] if reason == "STOP_LOSS" else position["take_profit"]
+            # Stops fill at the level or worse, limits at the level
+            price = self._slip(symbol, position["type"] == "SELL", level) if reason == "STOP_LOSS" else level
+            self._close(position, position["volume"], price, f"[{reason.lower()}]")
+
+    def _match_orders(self, symbol: str, bid: float, ask: float):
+        """Fill or expire working pending orders for a symbol"""
+        now = self.clock.time()
+        for order in [o for o in self.orders.values() if o["symbol"] == symbol]:
+            if order["expiration"] and now >= order["expiration"]:
+                self._finish_order(order, "EXPIRED")
+                continue
+            order_type, level = order["type"], order["price"]
+            if order_type == "BUY_LIMIT" and ask <= level:
+                price = ask  # at the limit or better
+            elif order_type == "SELL_LIMIT" and bid >= level:
+                price = bid
+            elif order_type == "BUY_STOP" and ask >= level:
+                price = self._slip(symbol, True, ask)
+            elif order_type == "SELL_STOP" and bid <= level:
+                price = self._slip(symbol, False, bid)
+            else:
+                continue
+            side = "BUY" if order_type.startswith("BUY") else "SELL"
+            order["position_id"] = self._open(symbol, side, order["volume"], price,
+                                              order["stop_loss"], order["take_profit"], order["comment"])
+            order["fill_price"] = price
+            self._finish_order(order, "FILLED")
+
+    def _finish_order(self, order: Dict, state: str):
+        del self.orders[order["ticket"]]
+        order["state"] = state
+        order["time_done_msc"] = int(self.clock.time() * 1000)
+        self.order_history.append(order)
+        if len(self.order_history) > 10000:
+            del self.order_history[:5000]
+
+    def get_quote(self, symbol: str) -> Optional[Dict]:
+        """Latest simulated quote, pulling from the feed if none is fresh"""
+        quote = self._quotes.get(symbol)
+        if quote is None or self.clock.time() - quote["received"] > self.max_quote_age:
+            if self.feed.get_quote(symbol) is None:
+                return None
+            quote = self._quotes.get(symbol)
+        if quote is None:
+            return None
+        return {k: v for k, v in quote.items() if k != "received"}
+
+    def _point(self, symbol: str) -> float:
+        spec = self.symbol_specs.get(symbol)
+        return spec.point if spec else 0.00001
+
+    def _digits(self, symbol: str) -> int:
+        spec = self.symbol_specs.get(symbol)
+        return spec.digits if spec else 5
+
+    def _slip(self, symbol: str, is_buy: bool, price: float) -> float:
+        """Apply random adverse slippage of up to max_slippage_points"""
+        slip = self.rng.uniform(0, self.max_slippage_points) * self._point(symbol)
+        return round(price + slip if is_buy else price - slip, self._digits(symbol))
+
+    def _profit(self, position: Dict, volume: float, close_price: float) -> float:
+        # Positions only exist for symbols with a spec (orders without one are rejected)
+        money_per_unit = self.symbol_specs.get(position["symbol"]).money_per_price_unit()
+        move = close_price - position["entry_price"]
+        if position["type"] == "SELL":
+            move = -move
+        return round(move * volume * money_per_unit, 2)
+
+    def _wait_latency(self):
+        """Simulated order round-trip (outside the lock so ticks keep flowing)"""
+        if self.latency:
+            self.clock.sleep(self.latency)
+
+    def _fill_price(self, symbol: str, is_buy: bool) -> Optional[Tuple[float, float, float]]:
+        """
+        Market fill for an order
+        Returns: (fill price with slippage, requested price, spread) or None without a quote
+        """
+        quote = self.get_quote(symbol)
+        if quote is None:
+            return None
+        requested = quote["ask"] if is_buy else quote["bid"]
+        return self._slip(symbol, is_buy, requested), requested, quote["ask"] - quote["bid"]
+
+    def _record_deal(self, position: Dict, entry: str, volume: float, price: float,
+                     profit: float, comment: str):
+        now_msc = int(self.clock.time() * 1000)
+        is_buy = position["type"] == "BUY"
+        self.deals.append({
+            "ticket": self._next_ticket,
+            "order": self._next_ticket,
+            "position_id": position["ticket"],
+            "symbol": position["symbol"],
+            "type": ("BUY" if is_buy else "SELL") if entry == "IN" else ("SELL" if is_buy else "BUY"),
+            "entry": entry,
+            "volume": volume,
+            "price": price,
+            "profit": profit,
+            "commission": -self.commission_per_lot * volume,
+            "swap": 0.0,
+            "fee": 0.0,
+            "time_msc": now_msc,
+            "reason": 0,
+            "comment": comment
+        })
+        self._next_ticket += 1
+        if len(self.deals) > 10000:
+            del self.deals[:5000]
+
+    # --- Trading ---
+
+    @_locked
+    def get_account_info(self) -> Dict:
+        """Virtual account with equity marked to the latest quotes"""
+        floating = 0.0
+        for position in self.positions.values():
+            quote = self._quotes.get(position["symbol"])
+            if quote is not None:
+                price = quote["bid"] if position["type"] == "BUY" else quote["ask"]
+                floating += self._profit(position, position["volume"], price)
+        return {
+            "login": self.name,
+            "currency": self.currency,
+            "balance": round(self.balance, 2),
+            "equity": round(self.balance + floating, 2),
+            "margin": 0.0,
+            "free_margin": round(self.balance + floating, 2),
+            "margin_level": 0.0,
+            "open_positions": len(self.positions),
+            "credit": 0.0,
+            "profit": round(floating, 2)
+        }
+
+    @_locked
+    def get_positions(self) -> List[Dict]:
+        result = []
+        for position in self.positions.values():
+            quote = self._quotes.get(position["symbol"])
+            current = position["entry_price"]
+            if quote is not None:
+                current = quote["bid"] if position["type"] == "BUY" else quote["ask"]
+            result.append(dict(position, current_price=current,
+                               profit=self._profit(position, position["volume"], current)))
+        return result
+
+    def _record_result(self, magic: Optional[int], ok: bool, ticket: int = 0, price: float = 0.0,
+                       volume: float = 0.0, comment: str = "", requested: float = 0.0, spread: float = 0.0):
+        if magic is None:
+            return
+        self.order_results[magic] = {
+            "ok": ok, "retryable": False, "timeout": False,
+            "retcode": "PAPER_DONE" if ok else "PAPER_REJECTED", "comment": comment,
+            "order": ticket, "deal": 0, "price": price, "volume": volume,
+            "requested": requested, "spread": spread, "rtt": self.latency
+        }
+
+    def pop_order_result(self, magic: int) -> Optional[Dict]:
+        return self.order_results.pop(magic, None)
+
+    @_locked
+    def find_position_by_magic(self, symbol: str, magic: int) -> Optional[int]:
+        for position in self.positions.values():
+            if position.get("magic") == magic:
+                return position["ticket"]
+        return None
+
+    def open_trade(self, symbol: str, order_type: str, volume: float,
+                   stop_loss: float, take_profit: float, comment: str = "",
+                   magic: Optional[int] = None) -> Optional[int]:
+        """Simulate a market order; returns the virtual ticket"""
+        self._wait_latency()
+        return self._open_trade(symbol, order_type, volume, stop_loss, take_profit, comment, magic)
+
+    @_locked
+    def _open_trade(self, symbol: str, order_type: str, volume: float, stop_loss: float,
+                    take_profit: float, comment: str, magic: Optional[int]) -> Optional[int]:
+        try:
+            spec = self.symbol_specs.get(symbol)
+            if spec is None:
+                self.logger.error(f"[{self.name}] No contract spec for {symbol} - order rejected")
+                self._record_result(magic, False, comment="No contract spec")
+                return None
+            volume = spec.round_volume(volume)
+            stop_loss = spec.round_price(stop_loss) if stop_loss else stop_loss
+            take_profit = spec.round_price(take_profit) if take_profit else take_profit
+
+            fill = self._fill_price(symbol, order_type == "BUY")
+            if fill is None:
+                self.logger.warning(f"[{self.name}] No quote for {symbol} - order rejected")
+                self._record_result(magic, False, comment="No quote")
+                return None
+
+            price, requested, spread = fill
+            ticket = self._open(symbol, order_type, volume, price, stop_loss, take_profit, comment, magic)
+            self._record_result(magic, True, ticket, price, volume, requested=requested, spread=spread)
+            return ticket
+        except Exception as e:
+            self.logger.error(f"[{self.name}] Failed to open paper trade: {e}")
+            return None
+
+    def _open(self, symbol: str, side: str, volume: float, price: float,
+              stop_loss: float, take_profit: float, comment: str, magic: Optional[int] = None) -> int:
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        position = {
+            "ticket": ticket,
+            "symbol": symbol,
+            "type": side,
+            "volume": volume,
+            "entry_price": price,
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+            "open_time": self.clock.now().isoformat(),
+            "comment": comment if comment else "XM Trader Bot",
+            "magic": magic or self.magic_allocator.next()
+        }
+        self.positions[ticket] = position
+        self.triggers.add(ticket, symbol, side, stop_loss, take_profit)
+        self._record_deal(position, "IN", volume, price, 0.0, position["comment"])
+        self.balance -= self.commission_per_lot * volume
+
+        self.logger.info(
+            f"[{self.name}] Paper {side} {volume} {symbol} filled @ {price} "
+            f"(SL: {stop_loss}, TP: {take_profit}) - Ticket: {ticket}"
+        )
+        return ticket
+
+    def close_trade(self, ticket: int, volume: float = 0, magic: Optional[int] = None) -> bool:
+        """Simulate closing all or part of a position at market"""
+        self._wait_latency()
+        return self._close_trade(ticket, volume, magic)
+
+    @_locked
+    def _close_trade(self, ticket: int, volume: float, magic: Optional[int]) -> bool:
+        try:
+            position = self.positions.get(ticket)
+            if position is None:
+                self.logger.warning(f"Position #{ticket} not found")
+                return False
+            fill = self._fill_price(position["symbol"], position["type"] == "SELL")
+            if fill is None:
+                self._record_result(magic, False, comment="No quote")
+                return False
+            price, requested, spread = fill
+            close_volume = volume if 0 < volume < position["volume"] else position["volume"]
+            self._close(position, close_volume, price, "Close order")
+            self._record_result(magic, True, ticket, price, close_volume, requested=requested, spread=spread)
+            return True
+        except Exception as e:
+            self.logger.error(f"[{self.name}] Failed to close paper trade: {e}")
+            return False
+
+    def _close(self, position: Dict, volume: float, price: float, comment: str):
+        profit = self._profit(position, volume, price)
+        self.balance += profit - self.commission_per_lot * volume
+        self._record_deal(position, "OUT", volume, price, profit, comment)
+
+        remaining = round(position["volume"] - volume, 8)
+        if remaining > 0:
+            position["volume"] = remaining
+        else:
+            del self.positions[position["ticket"]]
+            self.triggers.remove(position["ticket"])
+        self.logger.info(
+            f"[{self.name}] Paper close #{position['ticket']} {volume} {position['symbol']} "
+            f"@ {price} ({comment}) | Profit: {profit:.2f} | Balance: {self.balance:.2f}"
+        )
+
+    @_locked
+    def modify_trade(self, ticket: int, stop_loss: float, take_profit: float,
+                     symbol: Optional[str] = None) -> bool:
+        position = self.positions.get(ticket)
+        if position is None:
+            self.logger.warning(f"Position #{ticket} not found")
+            return False
+        position["stop_loss"] = stop_loss
+        position["take_profit"] = take_profit
+        self.triggers.update(ticket, stop_loss, take_profit)
+        return True
+
+    @_locked
+    def place_pending_order(self, symbol: str, order_type: str, volume: float, price: float,
+                            stop_loss: float, take_profit: float,
+                            expiration: Optional[datetime] = None, comment: str = "") -> Optional[int]:
+        """Rest a simulated limit/stop order; it fills on the first tick that crosses it"""
+        spec = self.symbol_specs.get(symbol)
+        if spec is None:
+            self.logger.error(f"[{self.name}] No contract spec for {symbol} - order rejected")
+            return None
+        volume = spec.round_volume(volume)
+        price = spec.round_price(price)
+        stop_loss = spec.round_price(stop_loss) if stop_loss else stop_loss
+        take_profit = spec.round_price(take_profit) if take_profit else take_profit
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        self.orders[ticket] = {
+            "ticket": ticket,
+            "symbol": symbol,
+            "type": order_type,
+            "state": "PLACED",
+            "volume": volume,
+            "price": price,
+            "fill_price": 0.0,
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+            "position_id": 0,
+            "time_setup_msc": int(self.clock.time() * 1000),
+            "time_done_msc": 0,
+            "comment": comment if comment else "XM Trader Bot",
+            "expiration": expiration.timestamp() if expiration else None
+        }
+        self.logger.info(f"[{self.name}] Paper {order_type} {volume} {symbol} @ {price} placed - Ticket: {ticket}")
+        return ticket
+
+    @_locked
+    def modify_order(self, ticket: int, price: float, stop_loss: float, take_profit: float,
+                     expiration: Optional[datetime] = None) -> bool:
+        order = self.orders.get(ticket)
+        if order is None:
+            return False
+        order.update(price=price, stop_loss=stop_loss, take_profit=take_profit,
+                     expiration=expiration.timestamp() if expiration else None)
+        return True
+
+    @_locked
+    def cancel_order(self, ticket: int) -> bool:
+        order = self.orders.get(ticket)
+        if order is None:
+            return False
+        self._finish_order(order, "CANCELED")
+        return True
+
+    @_locked
+    def get_orders(self) -> List[Dict]:
+        return [dict(order) for order in self.orders.values()]
+
+    @_locked
+    def get_order_history(self, since_msc: int) -> List[Dict]:
+        result = []
+        for order in reversed(self.order_history):
+            if order["time_done_msc"] < since_msc:
+                break
+            result.append(dict(order))
+        result.reverse()
+        return result
+
+    @_locked
+    def get_deals_since(self, since_msc: int) -> List[Dict]:
+        """Simulated deals at or after since_msc, ordered by time"""
+        result = []
+        for deal in reversed(self.deals):
+            if deal["time_msc"] < since_msc:
+                break
+            result.append(deal)
+        result.reverse()
+        return result
+
+    def get_trade_history(self, days: int = 1) -> List[Dict]:
+        since_msc = int((self.clock.time() - days * 86400) * 1000)
+        return [deal for deal in self.get_deals_since(since_msc) if deal["entry"] == "OUT"]
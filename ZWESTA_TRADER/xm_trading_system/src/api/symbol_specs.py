@@ -0,0 +1,102 @@
+"""Symbol Specs - Cached contract specifications per instrument"""
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from src.utils.logger import get_logger
+
+
+@dataclass(frozen=True, slots=True)
+class SymbolSpec:
+    """Contract fields from MT5 symbol_info used for sizing and order validation"""
+    symbol: str
+    digits: int
+    point: float
+    tick_size: float
+    tick_value: float
+    contract_size: float
+    volume_min: float
+    volume_max: float
+    volume_step: float
+
+    @classmethod
+    def from_info(cls, info: Dict) -> "SymbolSpec":
+        return cls(
+            symbol=info["symbol"],
+            digits=int(info["digits"]),
+            point=float(info["point"]),
+            tick_size=float(info["tick_size"] or info["point"]),
+            tick_value=float(info["tick_value"]),
+            contract_size=float(info["contract_size"]),
+            volume_min=float(info["volume_min"]),
+            volume_max=float(info["volume_max"]),
+            volume_step=float(info["volume_step"] or info["volume_min"]),
+        )
+
+    def money_per_price_unit(self) -> float:
+        """Account-currency P/L of 1 lot for a price move of 1.0"""
+        return self.tick_value / self.tick_size
+
+    def round_volume(self, volume: float) -> float:
+        """Floor to the volume step and clamp to the broker's min/max lots"""
+        steps = math.floor(volume / self.volume_step + 1e-9)
+        volume = min(max(steps * self.volume_step, self.volume_min), self.volume_max)
+        decimals = max(0, -math.floor(math.log10(self.volume_step)))
+        return round(volume, decimals)
+
+    def round_price(self, price: float) -> float:
+        """Round a price to the nearest valid tick"""
+        return round(round(price / self.tick_size) * self.tick_size, self.digits)
+
+
+class SymbolSpecCache:
+    """
+    Symbol specs fetched from the terminal once and then served from memory
+    Failed lookups are not cached so they are retried on the next call
+    """
+
+    def __init__(self, api_connector):
+        self.logger = get_logger()
+        self.api = api_connector
+        self._specs: Dict[str, SymbolSpec] = {}
+
+    def load(self, symbols: Iterable[str]) -> int:
+        """
+        Fetch specs for all symbols up front
+        Returns: number of symbols loaded
+        """
+        loaded = 0
+        for symbol in symbols:
+            spec = self.refresh(symbol)
+            if spec is not None:
+                loaded += 1
+                self.logger.debug(
+                    f"{symbol} spec: tick {spec.tick_size} = {spec.tick_value}, contract {spec.contract_size}, "
+                    f"lots {spec.volume_min}-{spec.volume_max} step {spec.volume_step}"
+                )
+        self.logger.info(f"Loaded contract specs for {loaded} symbols")
+        return loaded
+
+    def refresh(self, symbol: str) -> Optional[SymbolSpec]:
+        """Re-read one symbol's spec from the terminal"""
+        info = self.api.get_symbol_info(symbol)
+        if not info:
+            return None
+        try:
+            spec = SymbolSpec.from_info(info)
+        except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+            self.logger.error(f"Invalid symbol info for {symbol}: {e}")
+            return None
+        self._specs[symbol] = spec
+        return spec
+
+    def get(self, symbol: str) -> Optional[SymbolSpec]:
+        spec = self._specs.get(symbol)
+        if spec is None:
+            spec = self.refresh(symbol)
+        return spec
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._specs
+
+    def __iter__(self):
+        return iter(list(self._specs))
@@ -1,9 +1,60 @@
 """XM Global API Connector - MetaTrader5 Integration"""
+import functools
 import MetaTrader5 as mt5
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import threading
 import time
 from src.utils.logger import get_logger
+from src.utils.clock import get_clock
+from src.utils.instrumentation import get_instrumentation
+from src.api.symbol_specs import SymbolSpecCache
+from src.api.magic_allocator import MagicAllocator
+
+# Map timeframe string to MT5 constant
+TIMEFRAMES = {
+    "1m": mt5.TIMEFRAME_M1,
+    "5m": mt5.TIMEFRAME_M5,
+    "15m": mt5.TIMEFRAME_M15,
+    "30m": mt5.TIMEFRAME_M30,
+    "1h": mt5.TIMEFRAME_H1,
+    "4h": mt5.TIMEFRAME_H4,
+    "1d": mt5.TIMEFRAME_D1,
+}
+
+# Pending order types by name
+PENDING_ORDER_TYPES = {
+    "BUY_LIMIT": mt5.ORDER_TYPE_BUY_LIMIT,
+    "SELL_LIMIT": mt5.ORDER_TYPE_SELL_LIMIT,
+    "BUY_STOP": mt5.ORDER_TYPE_BUY_STOP,
+    "SELL_STOP": mt5.ORDER_TYPE_SELL_STOP,
+}
+ORDER_TYPE_NAMES = {value: name for name, value in PENDING_ORDER_TYPES.items()}
+ORDER_TYPE_NAMES.update({mt5.ORDER_TYPE_BUY: "BUY", mt5.ORDER_TYPE_SELL: "SELL"})
+
+ORDER_STATE_NAMES = {
+    mt5.ORDER_STATE_PLACED: "PLACED",
+    mt5.ORDER_STATE_CANCELED: "CANCELED",
+    mt5.ORDER_STATE_FILLED: "FILLED",
+    mt5.ORDER_STATE_EXPIRED: "EXPIRED",
+}
+
+# Retcodes after which an order can simply be sent again
+RETRYABLE_RETCODES = {
+    mt5.TRADE_RETCODE_REQUOTE,
+    mt5.TRADE_RETCODE_PRICE_CHANGED,
+    mt5.TRADE_RETCODE_PRICE_OFF,
+}
+
+
+def _locked(method):
+    """Serialize MetaTrader5 calls: the package is not thread-safe (main loop vs. order workers)"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class XMConnector:
     """
@@ -13,6 +64,8 @@ class XMConnector:
     
     def __init__(self, login: str, password: str, server: str = "XMGlobal-MT5 2"):
         self.logger = get_logger()
+        self.clock = get_clock()
+        self.instruments = get_instrumentation()
         # Login can be either numeric (account number) or text (username)
         try:
             self.login = int(login)
@@ -23,7 +76,54 @@ class XMConnector:
         self.connected = False
         self.rate_limit_delay = 0.05  # 50ms between requests
         self.last_request_time = 0
+        self.tick_listeners = []
+        self.symbol_specs = SymbolSpecCache(self)
+        self.magic_allocator = MagicAllocator()
+        self.order_results: Dict[int, Dict] = {}
+        self.server_offset: Optional[int] = None
+        self._lock = threading.RLock()
+    
+    def add_tick_listener(self, listener):
+        """Register callback(symbol, tick) invoked for every tick observed"""
+        self.tick_listeners.append(listener)
+    
+    def _publish_tick(self, symbol: str, tick):
+        """Fan a tick out to listeners (recorder, bar builder, ...)"""
+        for listener in self.tick_listeners:
+            try:
+                listener(symbol, tick)
+            except Exception as e:
+                self.logger.error(f"Tick listener error for {symbol}: {e}")
+    
+    def _observe_server_time(self, tick_time: int):
+        """Track the terminal clock's offset from ours using a fresh tick's server timestamp"""
+        # Broker time zones are whole quarter hours away from UTC; a residual
+        # of more than a minute means the tick is stale (quiet market)
+        drift = tick_time - self.clock.time()
+        offset = round(drift / 900) * 900
+        if abs(drift - offset) <= 60:
+            self.server_offset = offset
     
+    @_locked
+    def server_time(self) -> float:
+        """
+        Current broker server time as epoch seconds
+        MT5 stamps ticks, deals and order expirations in server time, not UTC
+        """
+        if self.server_offset is None and self.connected:
+            for symbol in self.symbol_specs:
+                tick = mt5.symbol_info_tick(symbol)
+                if tick is not None:
+                    self._observe_server_time(tick.time)
+                    if self.server_offset is not None:
+                        break
+        return self.clock.time() + (self.server_offset or 0)
+    
+    def _server_expiration(self, expiration: datetime) -> int:
+        """Convert a local expiration time to the server timestamp MT5 expects"""
+        return int(expiration.timestamp() - self.clock.time() + self.server_time())
+    
+    @_locked
     def connect(self) -> bool:
         """Initialize and authenticate with MetaTrader5"""
         try:
@@ -49,8 +149,7 @@ class XMConnector:
                     
                     if attempt < max_retries - 1:
                         self.logger.warning(f"Attempt {attempt + 1} failed, retrying... Error: {error}")
-                        import time
-                        time.sleep(2)
+                        self.clock.sleep(2)
                     else:
                         # Final attempt failed
                         if error_code == -6:
@@ -103,6 +202,7 @@ class XMConnector:
             self.logger.error(f"Connection failed: {e}")
             return False
     
+    @_locked
     def disconnect(self) -> bool:
         """Disconnect from MetaTrader5"""
         try:
@@ -116,19 +216,74 @@ class XMConnector:
             return False
     
     def _rate_limit(self):
-        """Apply rate limiting"""
-        elapsed = time.time() - self.last_request_time
+        """Apply rate limiting (callers hold the connector lock)"""
+        self.instruments.count("api.calls")
+        elapsed = self.clock.time() - self.last_request_time
         if elapsed < self.rate_limit_delay:
-            time.sleep(self.rate_limit_delay - elapsed)
-        self.last_request_time = time.time()
+            wait = self.rate_limit_delay - elapsed
+            self.instruments.count("api.rate_limit_waits")
+            self.instruments.observe("api.rate_limit_wait", wait)
+            self.clock.sleep(wait)
+        self.last_request_time = self.clock.time()
+    
+    def _record_result(self, magic: Optional[int], result, requested: float = 0.0,
+                       spread: float = 0.0, rtt: float = 0.0):
+        """
+        Keep the outcome of an order_send for callers that passed their own magic
+        requested/spread are the quote at send time, rtt the order_send round-trip in seconds
+        """
+        if magic is None:
+            return
+        retcode = result.retcode if result is not None else None
+        self.order_results[magic] = {
+            "ok": retcode == mt5.TRADE_RETCODE_DONE,
+            "retryable": retcode in RETRYABLE_RETCODES,
+            "timeout": retcode is None or retcode == mt5.TRADE_RETCODE_TIMEOUT,
+            "retcode": retcode,
+            "comment": result.comment if result is not None else str(mt5.last_error()),
+            "order": result.order if result is not None else 0,
+            "deal": result.deal if result is not None else 0,
+            "price": result.price if result is not None else 0.0,
+            "volume": result.volume if result is not None else 0.0,
+            "requested": requested,
+            "spread": spread,
+            "rtt": rtt
+        }
+    
+    def pop_order_result(self, magic: int) -> Optional[Dict]:
+        """Outcome of the last order sent with this magic (see open_trade/close_trade)"""
+        return self.order_results.pop(magic, None)
+    
+    @_locked
+    def find_position_by_magic(self, symbol: str, magic: int) -> Optional[int]:
+        """
+        Ticket of the position opened by an order with this magic, if any
+        Used to tell whether a timed-out order actually executed
+        """
+        try:
+            self._rate_limit()
+            for pos in mt5.positions_get(symbol=symbol) or ():
+                if pos.magic == magic:
+                    return pos.ticket
+            # It may have opened and already closed
+            now = int(self.server_time())
+            for deal in mt5.history_deals_get(now - 3600, now + 86400) or ():
+                if deal.magic == magic and deal.entry == mt5.DEAL_ENTRY_IN:
+                    return deal.position_id
+            return None
+        except Exception as e:
+            self.logger.error(f"Failed to look up order magic {magic}: {e}")
+            return None
     
+    @_locked
     def get_account_info(self) -> Dict:
         """Get account information from MT5"""
         try:
             self._rate_limit()
             self.logger.debug("Fetching account info...")
             
-            account = mt5.account_info()
+            with self.instruments.timer("mt5.account_info"):
+                account = mt5.account_info()
             if account is None:
                 self.logger.error(f"Failed to get account info: {mt5.last_error()}")
                 return {}
@@ -149,50 +304,83 @@ class XMConnector:
             self.logger.error(f"Failed to get account info: {e}")
             return {}
     
+    @_locked
+    def _symbol_tick(self, symbol: str):
+        """Last tick for a symbol; also keeps the server time offset current"""
+        self._rate_limit()
+        with self.instruments.timer("mt5.symbol_info_tick"):
+            tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            self.logger.warning(f"Failed to get quote for {symbol}: {mt5.last_error()}")
+            return None
+        self._observe_server_time(tick.time)
+        return tick
+    
     def get_quote(self, symbol: str) -> Optional[Dict]:
         """Get current price quote for symbol from MT5"""
         try:
-            self._rate_limit()
-            self.logger.debug(f"Fetching quote for {symbol}...")
-            
-            # Get symbol tick info
-            tick = mt5.symbol_info_tick(symbol)
+            self.logger.debug("Fetching quote for %s...", symbol)
+            tick = self._symbol_tick(symbol)
             if tick is None:
-                self.logger.warning(f"Failed to get quote for {symbol}: {mt5.last_error()}")
                 return None
             
+            # Listeners run outside the connector lock
+            if self.tick_listeners:
+                self._publish_tick(symbol, tick)
+            
             return {
                 "symbol": symbol,
                 "bid": tick.bid,
                 "ask": tick.ask,
                 "time": datetime.fromtimestamp(tick.time).isoformat(),
-                "digits": mt5.symbol_info(symbol).digits if mt5.symbol_info(symbol) else 5
+                "digits": self._digits(symbol)
             }
         except Exception as e:
             self.logger.error(f"Failed to get quote for {symbol}: {e}")
             return None
     
+    def _digits(self, symbol: str) -> int:
+        spec = self.symbol_specs.get(symbol)
+        return spec.digits if spec else 5
+    
+    @_locked
+    def get_symbol_info(self, symbol: str) -> Optional[Dict]:
+        """Get contract specification for a symbol from MT5"""
+        try:
+            self._rate_limit()
+            with self.instruments.timer("mt5.symbol_info"):
+                info = mt5.symbol_info(symbol)
+            if info is None:
+                self.logger.warning(f"Failed to get symbol info for {symbol}: {mt5.last_error()}")
+                return None
+            
+            return {
+                "symbol": symbol,
+                "digits": info.digits,
+                "point": info.point,
+                "tick_size": info.trade_tick_size,
+                "tick_value": info.trade_tick_value,
+                "contract_size": info.trade_contract_size,
+                "volume_min": info.volume_min,
+                "volume_max": info.volume_max,
+                "volume_step": info.volume_step
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to get symbol info for {symbol}: {e}")
+            return None
+    
+    @_locked
     def get_ohlc(self, symbol: str, timeframe: str, bars: int = 100) -> List[Dict]:
         """Get OHLC candlestick data from MT5"""
         try:
             self._rate_limit()
-            self.logger.debug(f"Fetching {timeframe} OHLC data for {symbol} ({bars} bars)...")
-            
-            # Map timeframe string to MT5 constant
-            timeframe_map = {
-                "1m": mt5.TIMEFRAME_M1,
-                "5m": mt5.TIMEFRAME_M5,
-                "15m": mt5.TIMEFRAME_M15,
-                "30m": mt5.TIMEFRAME_M30,
-                "1h": mt5.TIMEFRAME_H1,
-                "4h": mt5.TIMEFRAME_H4,
-                "1d": mt5.TIMEFRAME_D1,
-            }
+            self.logger.debug("Fetching %s OHLC data for %s (%d bars)...", timeframe, symbol, bars)
             
-            tf = timeframe_map.get(timeframe, mt5.TIMEFRAME_M5)
+            tf = TIMEFRAMES.get(timeframe, mt5.TIMEFRAME_M5)
             
             # Get rates from MT5
-            rates = mt5.copy_rates_from_pos(symbol, tf, 0, bars)
+            with self.instruments.timer("mt5.copy_rates_from_pos"):
+                rates = mt5.copy_rates_from_pos(symbol, tf, 0, bars)
             if rates is None:
                 self.logger.warning(f"Failed to get OHLC for {symbol}: {mt5.last_error()}")
                 return []
@@ -213,13 +401,36 @@ class XMConnector:
             self.logger.error(f"Failed to get OHLC for {symbol}: {e}")
             return []
     
+    @_locked
+    def get_rates_range(self, symbol: str, timeframe: str,
+                        date_from: datetime, date_to: datetime):
+        """
+        Get raw OHLC bars between two dates from MT5 (for history backfill)
+        Returns: MT5 structured rates array or None
+        """
+        try:
+            self._rate_limit()
+            self.logger.debug("Fetching %s rates for %s (%s -> %s)...", timeframe, symbol, date_from, date_to)
+            
+            tf = TIMEFRAMES.get(timeframe, mt5.TIMEFRAME_M5)
+            with self.instruments.timer("mt5.copy_rates_range"):
+                rates = mt5.copy_rates_range(symbol, tf, date_from, date_to)
+            if rates is None:
+                self.logger.warning(f"Failed to get rates range for {symbol}: {mt5.last_error()}")
+            return rates
+        except Exception as e:
+            self.logger.error(f"Failed to get rates range for {symbol}: {e}")
+            return None
+    
+    @_locked
     def get_positions(self) -> List[Dict]:
         """Get open positions from MT5"""
         try:
             self._rate_limit()
             self.logger.debug("Fetching open positions...")
             
-            positions = mt5.positions_get()
+            with self.instruments.timer("mt5.positions_get"):
+                positions = mt5.positions_get()
             if positions is None:
                 return []
             
@@ -236,7 +447,8 @@ class XMConnector:
                     "take_profit": pos.tp,
                     "profit": pos.profit,
                     "open_time": datetime.fromtimestamp(pos.time).isoformat(),
-                    "comment": pos.comment
+                    "comment": pos.comment,
+                    "magic": pos.magic
                 })
             
             return result
@@ -244,21 +456,30 @@ class XMConnector:
             self.logger.error(f"Failed to get positions: {e}")
             return []
     
+    @_locked
     def open_trade(self, symbol: str, order_type: str, volume: float, 
-                  stop_loss: float, take_profit: float, comment: str = "") -> Optional[int]:
+                  stop_loss: float, take_profit: float, comment: str = "",
+                  magic: Optional[int] = None) -> Optional[int]:
         """
         Open a new trade via MT5
         order_type: "BUY" or "SELL"
+        magic: client order ID; when given, the raw result is kept for pop_order_result()
         """
         try:
-            self._rate_limit()
-            quote = self.get_quote(symbol)
-            if not quote:
+            tick = self._symbol_tick(symbol)
+            if tick is None:
                 return None
             
             # Determine order type
             action = mt5.ORDER_TYPE_BUY if order_type == "BUY" else mt5.ORDER_TYPE_SELL
-            entry_price = quote["ask"] if order_type == "BUY" else quote["bid"]
+            entry_price = tick.ask if order_type == "BUY" else tick.bid
+            
+            # Snap to valid lot steps and ticks so the server doesn't reject the order
+            spec = self.symbol_specs.get(symbol)
+            if spec is not None:
+                volume = spec.round_volume(volume)
+                stop_loss = spec.round_price(stop_loss) if stop_loss else stop_loss
+                take_profit = spec.round_price(take_profit) if take_profit else take_profit
             
             self.logger.info(
                 f"Opening {order_type} trade: {symbol} @ {entry_price} "
@@ -275,12 +496,16 @@ class XMConnector:
                 "sl": stop_loss,
                 "tp": take_profit,
                 "deviation": 20,
-                "magic": 234000 + int(time.time()) % 1000,
+                "magic": magic or self.magic_allocator.next(),
                 "comment": comment if comment else "XM Trader Bot"
             }
             
             # Send order to MT5
-            result = mt5.order_send(request)
+            sent = time.perf_counter()
+            with self.instruments.timer("mt5.order_send"):
+                result = mt5.order_send(request)
+            self._record_result(magic, result, entry_price, tick.ask - tick.bid,
+                                time.perf_counter() - sent)
             if result is None:
                 self.logger.error(f"Failed to open trade - MT5 error: {mt5.last_error()}")
                 return None
@@ -296,14 +521,19 @@ class XMConnector:
             self.logger.error(f"Failed to open trade: {e}")
             return None
     
-    def close_trade(self, ticket: int, volume: float = 0) -> bool:
-        """Close a trade via MT5"""
+    @_locked
+    def close_trade(self, ticket: int, volume: float = 0, magic: Optional[int] = None) -> bool:
+        """
+        Close a trade via MT5
+        magic: client order ID; when given, the raw result is kept for pop_order_result()
+        """
         try:
             self._rate_limit()
             self.logger.info(f"Closing trade #{ticket} (volume: {volume if volume > 0 else 'all'})")
             
             # Get position info
-            pos = mt5.positions_get(ticket=ticket)
+            with self.instruments.timer("mt5.positions_get"):
+                pos = mt5.positions_get(ticket=ticket)
             if pos is None or len(pos) == 0:
                 self.logger.warning(f"Position #{ticket} not found")
                 return False
@@ -313,11 +543,11 @@ class XMConnector:
             close_volume = volume if volume > 0 else pos_info.volume
             
             # Get current quote
-            quote = self.get_quote(pos_info.symbol)
-            if not quote:
+            tick = self._symbol_tick(pos_info.symbol)
+            if tick is None:
                 return False
             
-            close_price = quote["bid"] if pos_info.type == 0 else quote["ask"]
+            close_price = tick.bid if pos_info.type == 0 else tick.ask
             
             # Create close order
             request = {
@@ -328,11 +558,15 @@ class XMConnector:
                 "position": ticket,
                 "price": close_price,
                 "deviation": 20,
-                "magic": 234000 + int(time.time()) % 1000,
+                "magic": magic or self.magic_allocator.next(),
                 "comment": "Close order"
             }
             
-            result = mt5.order_send(request)
+            sent = time.perf_counter()
+            with self.instruments.timer("mt5.order_send"):
+                result = mt5.order_send(request)
+            self._record_result(magic, result, close_price, tick.ask - tick.bid,
+                                time.perf_counter() - sent)
             if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
                 self.logger.error(f"Failed to close trade - Retcode: {result.retcode if result else 'None'}")
                 return False
@@ -343,29 +577,37 @@ class XMConnector:
             self.logger.error(f"Failed to close trade: {e}")
             return False
     
-    def modify_trade(self, ticket: int, stop_loss: float, take_profit: float) -> bool:
-        """Modify stop loss and take profit via MT5"""
+    @_locked
+    def modify_trade(self, ticket: int, stop_loss: float, take_profit: float,
+                     symbol: Optional[str] = None) -> bool:
+        """
+        Modify stop loss and take profit via MT5
+        Pass symbol when the caller already tracks the position to skip the lookup
+        """
         try:
             self._rate_limit()
-            self.logger.debug(f"Modifying trade #{ticket}: SL={stop_loss}, TP={take_profit}")
-            
-            # Get position info
-            pos = mt5.positions_get(ticket=ticket)
-            if pos is None or len(pos) == 0:
-                self.logger.warning(f"Position #{ticket} not found")
-                return False
-            
-            pos_info = pos[0]
-            
-            # Create modify order
+            self.logger.debug("Modifying trade #%s: SL=%s, TP=%s", ticket, stop_loss, take_profit)
+            
+            if symbol is None:
+                # Get position info
+                with self.instruments.timer("mt5.positions_get"):
+                    pos = mt5.positions_get(ticket=ticket)
+                if pos is None or len(pos) == 0:
+                    self.logger.warning(f"Position #{ticket} not found")
+                    return False
+                symbol = pos[0].symbol
+            
+            # SL/TP of an open position are changed with TRADE_ACTION_SLTP
             request = {
-                "action": mt5.TRADE_ACTION_MODIFY,
+                "action": mt5.TRADE_ACTION_SLTP,
+                "symbol": symbol,
                 "position": ticket,
                 "sl": stop_loss,
                 "tp": take_profit
             }
             
-            result = mt5.order_send(request)
+            with self.instruments.timer("mt5.order_send"):
+                result = mt5.order_send(request)
             if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
                 self.logger.error(f"Failed to modify trade - Retcode: {result.retcode if result else 'None'}")
                 return False
@@ -376,12 +618,219 @@ class XMConnector:
             self.logger.error(f"Failed to modify trade: {e}")
             return False
     
-    def get_trade_history(self, days: int = 1) -> List[Dict]:
-        """Get closed trades history"""
+    @_locked
+    def place_pending_order(self, symbol: str, order_type: str, volume: float, price: float,
+                            stop_loss: float, take_profit: float,
+                            expiration: Optional[datetime] = None, comment: str = "") -> Optional[int]:
+        """
+        Place a limit or stop order via MT5
+        order_type: "BUY_LIMIT", "SELL_LIMIT", "BUY_STOP" or "SELL_STOP"
+        Returns: order ticket or None if failed
+        """
+        try:
+            self._rate_limit()
+            spec = self.symbol_specs.get(symbol)
+            if spec is not None:
+                volume = spec.round_volume(volume)
+                price = spec.round_price(price)
+                stop_loss = spec.round_price(stop_loss) if stop_loss else stop_loss
+                take_profit = spec.round_price(take_profit) if take_profit else take_profit
+            
+            self.logger.info(
+                f"Placing {order_type}: {symbol} @ {price} vol={volume} "
+                f"(SL: {stop_loss}, TP: {take_profit}, expires: {expiration or 'GTC'})"
+            )
+            
+            request = {
+                "action": mt5.TRADE_ACTION_PENDING,
+                "symbol": symbol,
+                "volume": volume,
+                "type": PENDING_ORDER_TYPES[order_type],
+                "price": price,
+                "sl": stop_loss,
+                "tp": take_profit,
+                "magic": self.magic_allocator.next(),
+                "comment": comment if comment else "XM Trader Bot",
+                "type_time": mt5.ORDER_TIME_SPECIFIED if expiration else mt5.ORDER_TIME_GTC
+            }
+            if expiration:
+                request["expiration"] = self._server_expiration(expiration)
+            
+            with self.instruments.timer("mt5.order_send"):
+                result = mt5.order_send(request)
+            if result is None:
+                self.logger.error(f"Failed to place order - MT5 error: {mt5.last_error()}")
+                return None
+            
+            if result.retcode not in (mt5.TRADE_RETCODE_DONE, mt5.TRADE_RETCODE_PLACED):
+                self.logger.error(f"Pending order failed - Retcode: {result.retcode}, {result.comment}")
+                return None
+            
+            self.logger.info(f"Pending order placed - Ticket: {result.order}")
+            return result.order
+        except Exception as e:
+            self.logger.error(f"Failed to place pending order: {e}")
+            return None
+    
+    @_locked
+    def modify_order(self, ticket: int, price: float, stop_loss: float, take_profit: float,
+                     expiration: Optional[datetime] = None) -> bool:
+        """Move a pending order's price / SL / TP via MT5"""
+        try:
+            self._rate_limit()
+            request = {
+                "action": mt5.TRADE_ACTION_MODIFY,
+                "order": ticket,
+                "price": price,
+                "sl": stop_loss,
+                "tp": take_profit,
+                "type_time": mt5.ORDER_TIME_SPECIFIED if expiration else mt5.ORDER_TIME_GTC
+            }
+            if expiration:
+                request["expiration"] = self._server_expiration(expiration)
+            
+            with self.instruments.timer("mt5.order_send"):
+                result = mt5.order_send(request)
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                self.logger.error(f"Failed to modify order #{ticket} - Retcode: {result.retcode if result else 'None'}")
+                return False
+            
+            self.logger.debug("Order #%s moved to %s (SL: %s, TP: %s)", ticket, price, stop_loss, take_profit)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to modify order: {e}")
+            return False
+    
+    @_locked
+    def cancel_order(self, ticket: int) -> bool:
+        """Delete a pending order via MT5"""
+        try:
+            self._rate_limit()
+            with self.instruments.timer("mt5.order_send"):
+                result = mt5.order_send({"action": mt5.TRADE_ACTION_REMOVE, "order": ticket})
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                self.logger.error(f"Failed to cancel order #{ticket} - Retcode: {result.retcode if result else 'None'}")
+                return False
+            
+            self.logger.info(f"Order #{ticket} cancelled")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to cancel order: {e}")
+            return False
+    
+    @staticmethod
+    def _order_to_dict(order) -> Dict:
+        return {
+            "ticket": order.ticket,
+            "symbol": order.symbol,
+            "type": ORDER_TYPE_NAMES.get(order.type, str(order.type)),
+            "state": ORDER_STATE_NAMES.get(order.state, str(order.state)),
+            "volume": order.volume_initial,
+            "price": order.price_open,
+            "fill_price": order.price_current,
+            "stop_loss": order.sl,
+            "take_profit": order.tp,
+            "position_id": order.position_id,
+            "time_setup_msc": order.time_setup_msc,
+            "time_done_msc": getattr(order, "time_done_msc", 0),
+            "comment": order.comment
+        }
+    
+    @_locked
+    def get_orders(self) -> List[Dict]:
+        """Get working pending orders from MT5"""
+        try:
+            self._rate_limit()
+            with self.instruments.timer("mt5.orders_get"):
+                orders = mt5.orders_get()
+            if orders is None:
+                return []
+            return [self._order_to_dict(order) for order in orders]
+        except Exception as e:
+            self.logger.error(f"Failed to get orders: {e}")
+            return []
+    
+    @_locked
+    def get_order_history(self, since_msc: int) -> List[Dict]:
+        """
+        Get orders that left the order book (filled, cancelled, expired) since a timestamp
+        Returns: orders ordered by time_done_msc
+        """
+        try:
+            self._rate_limit()
+            date_to = int(self.clock.time()) + 86400
+            with self.instruments.timer("mt5.history_orders_get"):
+                orders = mt5.history_orders_get(since_msc // 1000, date_to)
+            if orders is None:
+                return []
+            result = [self._order_to_dict(order) for order in orders
+                      if getattr(order, "time_done_msc", 0) >= since_msc]
+            result.sort(key=lambda o: o["time_done_msc"])
+            return result
+        except Exception as e:
+            self.logger.error(f"Failed to get order history: {e}")
+            return []
+    
+    @_locked
+    def get_deals_since(self, since_msc: int) -> List[Dict]:
+        """
+        Get deals executed at or after a server timestamp (milliseconds)
+        Returns: deals ordered by time_msc
+        """
         try:
             self._rate_limit()
-            self.logger.debug(f"Fetching trade history ({days} day(s))...")
-            return []  # Simulated
+            self.logger.debug("Fetching deals since %s...", since_msc)
+            
+            # Server time can run ahead of local time, so look one day past now
+            date_to = int(self.clock.time()) + 86400
+            with self.instruments.timer("mt5.history_deals_get"):
+                deals = mt5.history_deals_get(since_msc // 1000, date_to)
+            if deals is None:
+                return []
+            
+            entry_names = {
+                mt5.DEAL_ENTRY_IN: "IN",
+                mt5.DEAL_ENTRY_OUT: "OUT",
+                mt5.DEAL_ENTRY_INOUT: "INOUT",
+                mt5.DEAL_ENTRY_OUT_BY: "OUT_BY",
+            }
+            result = []
+            for deal in deals:
+                if deal.time_msc < since_msc:
+                    continue
+                result.append({
+                    "ticket": deal.ticket,
+                    "order": deal.order,
+                    "position_id": deal.position_id,
+                    "symbol": deal.symbol,
+                    "type": "BUY" if deal.type == 0 else "SELL",
+                    "entry": entry_names.get(deal.entry, str(deal.entry)),
+                    "volume": deal.volume,
+                    "price": deal.price,
+                    "profit": deal.profit,
+                    "commission": deal.commission,
+                    "swap": deal.swap,
+                    "fee": getattr(deal, "fee", 0.0),
+                    "time_msc": deal.time_msc,
+                    "reason": deal.reason,
+                    "comment": deal.comment
+                })
+            
+            result.sort(key=lambda d: d["time_msc"])
+            return result
+        except Exception as e:
+            self.logger.error(f"Failed to get deals: {e}")
+            return []
+    
+    def get_trade_history(self, days: int = 1) -> List[Dict]:
+        """Get closed trades history (closing deals)"""
+        try:
+            self.logger.debug("Fetching trade history (%s day(s))...", days)
+            since_msc = int((self.server_time() - days * 86400) * 1000)
+            return [
+                deal for deal in self.get_deals_since(since_msc)
+                if deal["entry"] in ("OUT", "OUT_BY")
+            ]
         except Exception as e:
             self.logger.error(f"Failed to get trade history: {e}")
             return []
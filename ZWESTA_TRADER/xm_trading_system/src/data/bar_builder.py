@@ -0,0 +1,168 @@
+"""Bar Builder - Aggregate the tick stream into OHLC candles"""
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+
+TIMEFRAME_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+}
+
+# Bar slots: start time (epoch seconds), open, high, low, close, tick volume
+T, O, H, L, C, V = range(6)
+
+
+class BarBuilder:
+    """
+    Incrementally build candles for any timeframe from ticks
+    Bars are built on the bid price, like MT5 terminal bars
+    Closed bars are reconciled against the terminal's official bars to detect drift
+    With require_seed, ticks for a series are dropped until seed() has loaded
+    its history, so strategies never start from a handful of local bars
+    """
+
+    def __init__(self, timeframes: Iterable[str], max_bars: int = 500, require_seed: bool = True):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.timeframes = [(tf, TIMEFRAME_SECONDS[tf]) for tf in timeframes]
+        self.max_bars = max_bars
+        self.require_seed = require_seed
+        self._seeded = set()
+        self.drift_tolerance = self.config.get("market_data.drift_tolerance", 0.0002)
+        self._current = {}
+        self._closed = {}
+        self.bar_close_listeners: List[Callable] = []
+        self.late_ticks = 0
+        self.drift_stats = {}
+
+    def add_bar_close_listener(self, listener: Callable):
+        """Register callback(symbol, timeframe, candle) invoked when a bar closes"""
+        self.bar_close_listeners.append(listener)
+
+    def is_seeded(self, symbol: str, timeframe: str) -> bool:
+        return (symbol, timeframe) in self._seeded
+
+    def seed(self, symbol: str, timeframe: str, candles: List[Dict]):
+        """Initialise a series from terminal candles (last candle is the forming bar)"""
+        key = (symbol, timeframe)
+        bars = [_from_candle(c) for c in candles]
+        self._closed[key] = deque(bars[:-1], maxlen=self.max_bars)
+        self._current[key] = bars[-1] if bars else None
+        self._seeded.add(key)
+
+    def on_tick(self, symbol: str, tick):
+        """Tick listener for XMConnector / TickReplay"""
+        price = tick.bid
+        ts = tick.time_msc // 1000
+        for timeframe, seconds in self.timeframes:
+            key = (symbol, timeframe)
+            if self.require_seed and key not in self._seeded:
+                continue  # the terminal candles used to seed already contain this tick
+            closed = self._closed.get(key)
+            if closed is None:
+                closed = self._closed[key] = deque(maxlen=self.max_bars)
+
+            start = ts - ts % seconds
+            bar = self._current.get(key)
+            if bar is None or start > bar[T]:
+                if bar is not None:
+                    closed.append(bar)
+                    self._notify_close(symbol, timeframe, bar)
+                self._current[key] = [start, price, price, price, price, 1]
+            elif start == bar[T]:
+                if price > bar[H]:
+                    bar[H] = price
+                elif price < bar[L]:
+                    bar[L] = price
+                bar[C] = price
+                bar[V] += 1
+            else:
+                self.late_ticks += 1
+
+    def _notify_close(self, symbol: str, timeframe: str, bar: list):
+        if not self.bar_close_listeners:
+            return
+        candle = _to_candle(bar)
+        for listener in self.bar_close_listeners:
+            try:
+                listener(symbol, timeframe, candle)
+            except Exception as e:
+                self.logger.error(f"Bar close listener error for {symbol} {timeframe}: {e}")
+
+    def get_candles(self, symbol: str, timeframe: str, count: int = 100) -> List[Dict]:
+        """Newest candles including the forming bar, in get_ohlc() format"""
+        key = (symbol, timeframe)
+        closed = self._closed.get(key, ())
+        current = self._current.get(key)
+        take = count - 1 if current is not None else count
+        bars = list(closed)[-take:] if take > 0 else []
+        if current is not None:
+            bars.append(current)
+        return [_to_candle(bar) for bar in bars]
+
+    def reconcile(self, symbol: str, timeframe: str, official: List[Dict]) -> int:
+        """
+        Compare locally built closed bars with the terminal's bars
+        Mismatching bars are replaced by the official values
+        Returns: number of bars whose prices drifted beyond tolerance
+        """
+        key = (symbol, timeframe)
+        closed = self._closed.get(key)
+        if not closed or not official:
+            return 0
+
+        by_time = {bar[T]: i for i, bar in enumerate(closed)}
+        stats = self.drift_stats.setdefault(
+            key, {"checked": 0, "drifted": 0, "max_drift": 0.0, "volume_ratio": 1.0}
+        )
+        drifted = 0
+        for candle in official:
+            official_bar = _from_candle(candle)
+            index = by_time.get(official_bar[T])
+            if index is None:
+                continue
+
+            local = closed[index]
+            reference = abs(official_bar[C]) or 1.0
+            drift = max(abs(local[i] - official_bar[i]) for i in (O, H, L, C)) / reference
+            stats["checked"] += 1
+            stats["max_drift"] = max(stats["max_drift"], drift)
+            if official_bar[V]:
+                stats["volume_ratio"] = local[V] / official_bar[V]
+
+            if drift > self.drift_tolerance:
+                drifted += 1
+                stats["drifted"] += 1
+                self.logger.warning(
+                    f"Bar drift {symbol} {timeframe} @ {candle['time']}: "
+                    f"{drift:.5%} (local C={local[C]}, terminal C={official_bar[C]})"
+                )
+            closed[index] = official_bar
+
+        return drifted
+
+
+def _from_candle(candle: Dict) -> list:
+    return [
+        int(datetime.fromisoformat(candle["time"]).timestamp()),
+        candle["open"], candle["high"], candle["low"], candle["close"],
+        int(candle.get("volume", 0)),
+    ]
+
+
+def _to_candle(bar: list) -> Dict:
+    return {
+        "time": datetime.fromtimestamp(bar[T]).isoformat(),
+        "open": bar[O],
+        "high": bar[H],
+        "low": bar[L],
+        "close": bar[C],
+        "volume": bar[V],
+    }
@@ -0,0 +1,338 @@
+"""Event Log - Append-only trade event log with a binary time/ticket index"""
+import bisect
+import json
+import os
+import struct
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+
+EVENT_TYPES = ("signal", "order", "fill", "modify", "close")
+TYPE_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+UNKNOWN_TYPE = 0xFFFF
+
+# Sidecar index record per event: time_msc (int64), ticket (int64),
+# type code (uint32), line length (uint32), line offset (uint64)
+INDEX_RECORD = struct.Struct("<qqIIQ")
+SEGMENT_SUFFIX = ".jsonl"
+INDEX_SUFFIX = ".idx"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def _day(time_msc: int) -> str:
+    """UTC day (YYYYMMDD) of an event time"""
+    return datetime.utcfromtimestamp(time_msc / 1000).strftime("%Y%m%d")
+
+
+class EventLog:
+    """
+    Append structured trade events to segmented JSON-lines files
+    emit() only appends to a deque; encoding and file I/O run on a
+    background writer thread. Each segment has a sidecar .idx file with one
+    fixed-size record per line, so readers can seek by time, ticket or type
+    without parsing the JSON
+    Layout: <root>/<YYYYMMDD>-<seq>.jsonl + <root>/<YYYYMMDD>-<seq>.idx
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.clock = get_clock()
+        self.root = root or self.config.state_path("event_log.path", "data/events")
+        self.flush_interval = self.config.get("event_log.flush_interval", 1.0)
+        self.segment_bytes = self.config.get("event_log.segment_mb", 64) * 1024 * 1024
+        self._pending = deque()
+        self._segment = None  # (data file, index file, day, seq)
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+        self._write_lock = threading.Lock()
+        self.written = 0
+
+    def start(self):
+        """Start the background writer"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, name="EventLog", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Event log started ({self.root})")
+
+    def stop(self):
+        """Write pending events and close the segment"""
+        if self._running:
+            self._running = False
+            self._wake.set()
+            self._thread.join(timeout=5)
+        self._drain()
+        if self._segment is not None:
+            self._segment[0].close()
+            self._segment[1].close()
+            self._segment = None
+        self.logger.info(f"Event log stopped ({self.written} events written)")
+
+    def emit(self, event_type: str, ticket: Optional[int] = None, **fields):
+        """Record an event (hot path, no I/O); fields must be JSON-serialisable or datetimes"""
+        fields["type"] = event_type
+        fields["time_msc"] = int(self.clock.time() * 1000)
+        if ticket is not None:
+            fields["ticket"] = ticket
+        self._pending.append(fields)
+
+    def _writer_loop(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                self.logger.error(f"Event log write error: {e}")
+
+    def _drain(self):
+        """Encode pending events and append them with their index records"""
+        with self._write_lock:
+            pending = self._pending
+            if not pending:
+                return
+            lines = []
+            while pending:
+                event = pending.popleft()
+                line = json.dumps(event, separators=(",", ":"), default=_json_default).encode() + b"\n"
+                lines.append((event, line))
+
+            # A batch spanning midnight is split so each event lands in its own day's segment
+            start = 0
+            for i in range(1, len(lines) + 1):
+                if i == len(lines) or _day(lines[i][0]["time_msc"]) != _day(lines[start][0]["time_msc"]):
+                    self._write(lines[start:i])
+                    start = i
+
+    def _write(self, lines: List[Tuple[Dict, bytes]]):
+        """Append one same-day run of encoded events and their index records"""
+        size = sum(len(line) for _, line in lines)
+        data_file, index_file = self._segment_for(lines[0][0]["time_msc"], size)
+        offset = data_file.tell()
+        index = bytearray()
+        for event, line in lines:
+            index += INDEX_RECORD.pack(
+                event["time_msc"], int(event.get("ticket") or 0),
+                TYPE_CODES.get(event["type"], UNKNOWN_TYPE), len(line), offset
+            )
+            offset += len(line)
+        # Data before index: an index record never points past the data
+        data_file.write(b"".join(line for _, line in lines))
+        data_file.flush()
+        index_file.write(index)
+        index_file.flush()
+        self.written += len(lines)
+
+    def _segment_for(self, time_msc: int, incoming: int):
+        """Open segment, rolling over by day or size"""
+        day = _day(time_msc)
+        if self._segment is not None:
+            data_file, index_file, seg_day, seq = self._segment
+            if seg_day == day and data_file.tell() + incoming <= self.segment_bytes:
+                return data_file, index_file
+            data_file.close()
+            index_file.close()
+            seq = seq + 1 if seg_day == day else 0
+        else:
+            seq = None
+
+        os.makedirs(self.root, exist_ok=True)
+        if seq is None:
+            # Never append into a segment written by a previous run
+            seq = len([n for n in os.listdir(self.root) if n.startswith(day) and n.endswith(SEGMENT_SUFFIX)])
+        base = os.path.join(self.root, f"{day}-{seq:04d}")
+        data_file = open(base + SEGMENT_SUFFIX, "ab")
+        index_file = open(base + INDEX_SUFFIX, "ab")
+        self._segment = (data_file, index_file, day, seq)
+        return data_file, index_file
+
+
+class EventReader:
+    """
+    Query the event log through the sidecar indexes
+    Events are appended in clock order, so each segment's index is sorted by
+    time and a time range is found by binary search. Only matching lines are
+    read and parsed. Events a crash left out of the index are recovered by
+    scanning the data file past the last indexed line
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.config = get_config()
+        self.root = root or self.config.state_path("event_log.path", "data/events")
+        self._cache: Dict[str, Tuple[int, List[Tuple]]] = {}
+
+    def segments(self) -> List[str]:
+        """Segment base paths in write order"""
+        if not os.path.isdir(self.root):
+            return []
+        return [os.path.join(self.root, n[:-len(SEGMENT_SUFFIX)])
+                for n in sorted(os.listdir(self.root)) if n.endswith(SEGMENT_SUFFIX)]
+
+    def _index(self, base: str) -> List[Tuple]:
+        """Index records (time_msc, ticket, type code, length, offset) of one segment"""
+        size = os.path.getsize(base + SEGMENT_SUFFIX)
+        cached = self._cache.get(base)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        try:
+            with open(base + INDEX_SUFFIX, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        records = list(INDEX_RECORD.iter_unpack(data[:usable]))
+
+        end = records[-1][4] + records[-1][3] if records else 0
+        if end < size:
+            records.extend(self._scan(base, end))
+        self._cache[base] = (size, records)
+        return records
+
+    @staticmethod
+    def _scan(base: str, offset: int) -> List[Tuple]:
+        """Index complete lines past offset by parsing them"""
+        records = []
+        with open(base + SEGMENT_SUFFIX, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                try:
+                    event = json.loads(line)
+                    records.append((event["time_msc"], int(event.get("ticket") or 0),
+                                    TYPE_CODES.get(event["type"], UNKNOWN_TYPE), len(line), offset))
+                except (ValueError, KeyError):
+                    pass
+                offset += len(line)
+        return records
+
+    def _select(self, base: str, start_msc: Optional[int], end_msc: Optional[int],
+                types: Optional[Iterable[str]], ticket: Optional[int]) -> List[Tuple]:
+        records = self._index(base)
+        lo, hi = 0, len(records)
+        if start_msc is not None:
+            lo = bisect.bisect_left(records, (start_msc,))
+        if end_msc is not None:
+            hi = bisect.bisect_left(records, (end_msc,), lo)
+        selected = records[lo:hi]
+        if types is not None:
+            codes = {TYPE_CODES.get(t, UNKNOWN_TYPE) for t in types}
+            selected = [r for r in selected if r[2] in codes]
+        if ticket is not None:
+            selected = [r for r in selected if r[1] == ticket]
+        return selected
+
+    @staticmethod
+    def _load(base: str, records: List[Tuple]) -> Iterator[Dict]:
+        if not records:
+            return
+        with open(base + SEGMENT_SUFFIX, "rb") as f:
+            first, last = records[0], records[-1]
+            span = last[4] + last[3] - first[4]
+            if span == sum(r[3] for r in records):
+                # Contiguous lines: one read
+                f.seek(first[4])
+                for line in f.read(span).splitlines():
+                    yield json.loads(line)
+                return
+            for _, _, _, length, offset in records:
+                f.seek(offset)
+                yield json.loads(f.read(length))
+
+    def read(self, start_msc: Optional[int] = None, end_msc: Optional[int] = None,
+             types: Optional[Iterable[str]] = None, ticket: Optional[int] = None) -> Iterator[Dict]:
+        """Events in [start_msc, end_msc), optionally of some types or for one ticket, oldest first"""
+        for base in self.segments():
+            records = self._index(base)
+            if not records:
+                continue
+            if end_msc is not None and records[0][0] >= end_msc:
+                break
+            if start_msc is not None and records[-1][0] < start_msc:
+                continue
+            yield from self._load(base, self._select(base, start_msc, end_msc, types, ticket))
+
+    def last(self, n: int, types: Optional[Iterable[str]] = None) -> List[Dict]:
+        """The newest n events (oldest first)"""
+        chosen: List[Tuple[str, List[Tuple]]] = []
+        remaining = n
+        for base in reversed(self.segments()):
+            if remaining <= 0:
+                break
+            records = self._select(base, None, None, types, None)[-remaining:]
+            if records:
+                chosen.append((base, records))
+                remaining -= len(records)
+        events = []
+        for base, records in reversed(chosen):
+            events.extend(self._load(base, records))
+        return events
+
+    def for_ticket(self, ticket: int) -> List[Dict]:
+        """Every event of one position or order, oldest first"""
+        return list(self.read(ticket=ticket))
+
+
+class EventTail:
+    """
+    Follow the event log as it is written
+    poll() returns the complete lines appended since the previous call and
+    moves on to newer segments as the writer rolls over
+    """
+
+    def __init__(self, root: Optional[str] = None, from_start: bool = False):
+        self.reader = EventReader(root)
+        segments = self.reader.segments()
+        self._base = None
+        self._offset = 0
+        if segments and not from_start:
+            self._base = segments[-1]
+            self._offset = os.path.getsize(self._base + SEGMENT_SUFFIX)
+
+    def poll(self) -> List[Dict]:
+        events = []
+        while True:
+            segments = self.reader.segments()
+            if not segments:
+                return events
+            if self._base is None:
+                self._base, self._offset = segments[0], 0
+            events.extend(self._read_new())
+            later = [s for s in segments if s > self._base]
+            if not later:
+                return events
+            # The writer never returns to an older segment once a newer one exists
+            events.extend(self._read_new())
+            self._base, self._offset = later[0], 0
+
+    def _read_new(self) -> List[Dict]:
+        events = []
+        try:
+            with open(self._base + SEGMENT_SUFFIX, "rb") as f:
+                f.seek(self._offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # partial line, read it on the next poll
+                    self._offset += len(line)
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        pass
+        except FileNotFoundError:
+            pass
+        return events
@@ -0,0 +1,221 @@
+"""Historical Bar Store - Columnar on-disk OHLC history"""
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+
+# One raw little-endian file per column, all columns row-aligned
+COLUMNS = {
+    "time": np.dtype("<i8"),
+    "open": np.dtype("<f8"),
+    "high": np.dtype("<f8"),
+    "low": np.dtype("<f8"),
+    "close": np.dtype("<f8"),
+    "volume": np.dtype("<i8"),
+}
+
+
+class HistoryStore:
+    """
+    Per-symbol, per-timeframe columnar bar history
+    Layout: <root>/<symbol>/<timeframe>/<column>.bin
+    Writes are append-only (strictly increasing bar time), reads are
+    memory-mapped so range queries return views without copying
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.root = root or self.config.get("history.path", "data/history")
+        self._lock = threading.Lock()
+        self._last_time = {}
+        self._maps = {}
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol, timeframe)
+
+    def _column_path(self, symbol: str, timeframe: str, column: str) -> str:
+        return os.path.join(self._series_dir(symbol, timeframe), f"{column}.bin")
+
+    def _row_count(self, symbol: str, timeframe: str) -> int:
+        """Number of complete rows (shortest column wins after a torn write)"""
+        counts = []
+        for column, dtype in COLUMNS.items():
+            path = self._column_path(symbol, timeframe, column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // dtype.itemsize)
+        return min(counts)
+
+    def _repair(self, symbol: str, timeframe: str) -> int:
+        """Truncate all columns to the same row count"""
+        rows = self._row_count(symbol, timeframe)
+        for column, dtype in COLUMNS.items():
+            path = self._column_path(symbol, timeframe, column)
+            if os.path.exists(path) and os.path.getsize(path) != rows * dtype.itemsize:
+                self.logger.warning(f"Repairing torn history column {path} -> {rows} rows")
+                with open(path, "r+b") as f:
+                    f.truncate(rows * dtype.itemsize)
+        return rows
+
+    def last_time(self, symbol: str, timeframe: str) -> Optional[int]:
+        """Epoch seconds of the newest stored bar, or None if empty"""
+        key = (symbol, timeframe)
+        if key not in self._last_time:
+            rows = self._repair(symbol, timeframe)
+            if rows == 0:
+                self._last_time[key] = None
+            else:
+                path = self._column_path(symbol, timeframe, "time")
+                with open(path, "rb") as f:
+                    f.seek((rows - 1) * COLUMNS["time"].itemsize)
+                    self._last_time[key] = int(np.frombuffer(f.read(8), dtype=COLUMNS["time"])[0])
+        return self._last_time[key]
+
+    def append_rates(self, symbol: str, timeframe: str, rates) -> int:
+        """
+        Append closed bars from an MT5 rates array (or any mapping of columns)
+        Input is sorted by time and de-duplicated (first bar of a time wins);
+        bars at or before the last stored time are skipped
+        Returns: number of bars written
+        """
+        try:
+            times = np.asarray(rates["time"], dtype=COLUMNS["time"])
+            if len(times) == 0:
+                return 0
+
+            # Keep the series strictly increasing even if the input is not
+            unique_times, rows = np.unique(times, return_index=True)
+            with self._lock:
+                last = self.last_time(symbol, timeframe)
+                if last is not None:
+                    rows = rows[unique_times > last]
+                if len(rows) == 0:
+                    return 0
+
+                os.makedirs(self._series_dir(symbol, timeframe), exist_ok=True)
+                volume_key = "tick_volume" if _has_field(rates, "tick_volume") else "volume"
+                sources = {
+                    "time": times,
+                    "open": rates["open"],
+                    "high": rates["high"],
+                    "low": rates["low"],
+                    "close": rates["close"],
+                    "volume": rates[volume_key],
+                }
+                for column, dtype in COLUMNS.items():
+                    data = np.asarray(sources[column], dtype=dtype)[rows]
+                    with open(self._column_path(symbol, timeframe, column), "ab") as f:
+                        f.write(data.tobytes())
+
+                written = len(rows)
+                self._last_time[(symbol, timeframe)] = int(times[rows[-1]])
+                self._maps.pop((symbol, timeframe), None)
+
+            self.logger.debug(f"History: appended {written} {timeframe} bars for {symbol}")
+            return written
+        except Exception as e:
+            self.logger.error(f"History append failed for {symbol} {timeframe}: {e}")
+            return 0
+
+    def append_candles(self, symbol: str, timeframe: str, candles: List[Dict]) -> int:
+        """Append closed candles in the connector's get_ohlc() dict format"""
+        if not candles:
+            return 0
+        columns = {
+            "time": [int(datetime.fromisoformat(c["time"]).timestamp()) for c in candles],
+            "open": [c["open"] for c in candles],
+            "high": [c["high"] for c in candles],
+            "low": [c["low"] for c in candles],
+            "close": [c["close"] for c in candles],
+            "volume": [c["volume"] for c in candles],
+        }
+        return self.append_rates(symbol, timeframe, columns)
+
+    def backfill(self, api, symbol: str, timeframe: str,
+                 date_from: datetime, date_to: datetime) -> int:
+        """
+        Bulk-load bars from the terminal via copy_rates_range
+        date_from / date_to are timezone-aware UTC datetimes, as MT5 expects.
+        Resumes after the newest stored bar so repeated backfills only fetch the gap
+        """
+        last = self.last_time(symbol, timeframe)
+        if last is not None:
+            date_from = max(date_from, datetime.fromtimestamp(last + 1, tz=timezone.utc))
+        if date_from >= date_to:
+            return 0
+
+        rates = api.get_rates_range(symbol, timeframe, date_from, date_to)
+        if rates is None or len(rates) == 0:
+            return 0
+
+        written = self.append_rates(symbol, timeframe, rates)
+        self.logger.info(f"History backfill {symbol} {timeframe}: {written} bars")
+        return written
+
+    def _open(self, symbol: str, timeframe: str) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-map all columns of a series (cached until the next append)"""
+        key = (symbol, timeframe)
+        maps = self._maps.get(key)
+        if maps is not None:
+            return maps
+
+        with self._lock:
+            rows = self._repair(symbol, timeframe)
+            if rows == 0:
+                return None
+            maps = {
+                column: np.memmap(self._column_path(symbol, timeframe, column),
+                                  dtype=dtype, mode="r", shape=(rows,))
+                for column, dtype in COLUMNS.items()
+            }
+            self._maps[key] = maps
+        return maps
+
+    def read_range(self, symbol: str, timeframe: str,
+                   start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Read bars with start <= time < end (epoch seconds)
+        Returns: dict of column name -> read-only memmap slice (zero-copy)
+        """
+        maps = self._open(symbol, timeframe)
+        if maps is None:
+            return {column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+
+        times = maps["time"]
+        lo = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+        hi = len(times) if end is None else int(np.searchsorted(times, end, side="left"))
+        return {column: data[lo:hi] for column, data in maps.items()}
+
+    def read_last(self, symbol: str, timeframe: str, count: int) -> Dict[str, np.ndarray]:
+        """Read the newest `count` bars (zero-copy)"""
+        maps = self._open(symbol, timeframe)
+        if maps is None:
+            return {column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()}
+        return {column: data[-count:] for column, data in maps.items()}
+
+    def get_candles(self, symbol: str, timeframe: str, count: int = 100) -> List[Dict]:
+        """Newest bars in the connector's get_ohlc() dict format (for warm starts)"""
+        bars = self.read_last(symbol, timeframe, count)
+        return [
+            {
+                "time": datetime.fromtimestamp(int(t)).isoformat(),
+                "open": float(o),
+                "high": float(h),
+                "low": float(l),
+                "close": float(c),
+                "volume": int(v),
+            }
+            for t, o, h, l, c, v in zip(bars["time"], bars["open"], bars["high"],
+                                        bars["low"], bars["close"], bars["volume"])
+        ]
+
+
+def _has_field(rates, name: str) -> bool:
+    """Check for a column in a structured array or a dict of columns"""
+    names = getattr(getattr(rates, "dtype", None), "names", None)
+    if names is not None:
+        return name in names
+    return name in rates
@@ -0,0 +1,279 @@
+"""Tick Recorder - Compact binary tick capture and deterministic replay"""
+import dataclasses
+import heapq
+import json
+import os
+import struct
+import threading
+from collections import deque, namedtuple
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+from src.api.symbol_specs import SymbolSpecCache
+from src.data.bar_builder import BarBuilder
+
+# Fixed-size record: time_msc (int64), bid (float64), ask (float64), flags (uint32)
+RECORD = struct.Struct("<qddI")
+SEGMENT_SUFFIX = ".ticks"
+SPEC_FILE = "spec.json"
+
+
+class Tick(namedtuple("Tick", "time_msc bid ask flags")):
+    """Replayed tick, attribute-compatible with MT5 symbol_info_tick()"""
+    __slots__ = ()
+
+    @property
+    def time(self) -> int:
+        return self.time_msc // 1000
+
+
+def _day(time_msc: int) -> str:
+    """UTC day (YYYYMMDD) of a tick time"""
+    return datetime.utcfromtimestamp(time_msc / 1000).strftime("%Y%m%d")
+
+
+class TickRecorder:
+    """
+    Append every observed tick to per-symbol binary segment files
+    The hot path only appends a tuple to a deque; packing and file I/O run
+    on a background writer thread. The contract spec of each symbol is saved
+    next to its ticks so a replay can price P&L
+    Layout: <root>/<symbol>/<YYYYMMDD>-<seq>.ticks + <root>/<symbol>/spec.json
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.root = root or self.config.get("tick_recorder.path", "data/ticks")
+        self.flush_interval = self.config.get("tick_recorder.flush_interval", 1.0)
+        self.segment_bytes = self.config.get("tick_recorder.segment_mb", 64) * 1024 * 1024
+        self._pending = deque()
+        self._last = {}
+        self._files = {}
+        self._wake = threading.Event()
+        self._running = False
+        self._thread = None
+        self.recorded = 0
+        self.dropped_duplicates = 0
+
+    def start(self):
+        """Start the background writer"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, name="TickRecorder", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Tick recorder started ({self.root})")
+
+    def stop(self):
+        """Flush pending ticks and close all segments"""
+        if not self._running:
+            return
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self._drain()
+        for f, _, _ in self._files.values():
+            f.close()
+        self._files.clear()
+        self.logger.info(f"Tick recorder stopped ({self.recorded} ticks recorded)")
+
+    def save_specs(self, specs: Iterable):
+        """Write the contract specs (SymbolSpec) of the recorded symbols"""
+        for spec in specs:
+            directory = os.path.join(self.root, spec.symbol)
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, SPEC_FILE), "w", encoding="utf-8") as f:
+                json.dump(dataclasses.asdict(spec), f)
+
+    def on_tick(self, symbol: str, tick):
+        """Tick listener for XMConnector - hot path, no I/O"""
+        key = (tick.time_msc, tick.bid, tick.ask)
+        if self._last.get(symbol) == key:
+            # The same tick is seen again when quotes are polled faster than they change
+            self.dropped_duplicates += 1
+            return
+        self._last[symbol] = key
+        self._pending.append((symbol, tick.time_msc, tick.bid, tick.ask, tick.flags))
+
+    def _writer_loop(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                self.logger.error(f"Tick recorder write error: {e}")
+
+    def _drain(self):
+        """Pack pending ticks into one buffer per symbol and UTC day and write them"""
+        buffers = {}
+        pending = self._pending
+        while pending:
+            symbol, time_msc, bid, ask, flags = pending.popleft()
+            # A batch spanning midnight is split so each tick lands in its own day's segment
+            key = (symbol, _day(time_msc))
+            buf = buffers.get(key)
+            if buf is None:
+                buf = buffers[key] = [bytearray(), time_msc]
+            buf[0] += RECORD.pack(time_msc, bid, ask, flags)
+
+        for (symbol, _), (data, first_msc) in buffers.items():
+            f = self._segment_for(symbol, first_msc, len(data))
+            f.write(data)
+            f.flush()
+            self.recorded += len(data) // RECORD.size
+
+    def _segment_for(self, symbol: str, time_msc: int, incoming: int):
+        """Open file for a symbol, rolling over by day or size"""
+        day = _day(time_msc)
+        entry = self._files.get(symbol)
+        if entry is not None:
+            f, seg_day, seq = entry
+            if seg_day == day and f.tell() + incoming <= self.segment_bytes:
+                return f
+            f.close()
+            seq = seq + 1 if seg_day == day else 0
+        else:
+            seq = None
+
+        directory = os.path.join(self.root, symbol)
+        os.makedirs(directory, exist_ok=True)
+        if seq is None:
+            # Never append into a segment written by a previous run
+            existing = [n for n in os.listdir(directory) if n.startswith(day)]
+            seq = len(existing)
+        path = os.path.join(directory, f"{day}-{seq:04d}{SEGMENT_SUFFIX}")
+        f = open(path, "ab")
+        self._files[symbol] = (f, day, seq)
+        return f
+
+
+def iter_segment(path: str) -> Iterator[Tick]:
+    """Read ticks from one segment file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    for fields in RECORD.iter_unpack(data[:usable]):
+        yield Tick(*fields)
+
+
+class TickReplay:
+    """
+    Deterministic replay of recorded ticks
+    Ticks from all requested symbols are merged in time_msc order and fed to
+    the same listeners XMConnector uses, optionally paced at a speed multiple.
+    Also serves quotes and candles built from the replayed ticks, so it can
+    stand in for XMConnector as the feed of a PaperConnector
+    """
+
+    def __init__(self, symbols: Iterable[str], root: Optional[str] = None,
+                 start_msc: Optional[int] = None, end_msc: Optional[int] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.root = root or self.config.get("tick_recorder.path", "data/ticks")
+        self.symbols = list(symbols)
+        self.start_msc = start_msc
+        self.end_msc = end_msc
+        self.listeners: List[Callable] = []
+        self.last_ticks: Dict[str, Tick] = {}
+        self.connected = False
+        self.symbol_specs = SymbolSpecCache(self)
+        # Recordings carry no terminal history, so bars start from the first replayed tick
+        self.bars = BarBuilder([self.config.get("trading.timeframe", "5m")], require_seed=False)
+
+    def add_tick_listener(self, listener: Callable):
+        """Register callback(symbol, tick)"""
+        self.listeners.append(listener)
+
+    def _symbol_stream(self, symbol: str) -> Iterator[Tuple[int, str, Tick]]:
+        directory = os.path.join(self.root, symbol)
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            for tick in iter_segment(os.path.join(directory, name)):
+                if self.start_msc is not None and tick.time_msc < self.start_msc:
+                    continue
+                if self.end_msc is not None and tick.time_msc >= self.end_msc:
+                    return
+                yield tick.time_msc, symbol, tick
+
+    def ticks(self) -> Iterator[Tuple[str, Tick]]:
+        """All ticks in time order (ties broken by symbol for determinism)"""
+        streams = [self._symbol_stream(symbol) for symbol in self.symbols]
+        for _, symbol, tick in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+            yield symbol, tick
+
+    def publish(self, symbol: str, tick: Tick):
+        """Make a tick current and hand it to the listeners"""
+        self.last_ticks[symbol] = tick
+        self.bars.on_tick(symbol, tick)
+        for listener in self.listeners:
+            listener(symbol, tick)
+
+    def run(self, speed: float = 0.0, clock=None) -> int:
+        """
+        Feed ticks to listeners
+        speed: real-time multiple (1.0 = as recorded, 10.0 = 10x); 0 = as fast as possible
+        Returns: number of ticks replayed
+        """
+        clock = clock or get_clock()
+        count = 0
+        first_msc = None
+        started = clock.monotonic()
+        for symbol, tick in self.ticks():
+            if speed > 0:
+                if first_msc is None:
+                    first_msc = tick.time_msc
+                due = started + (tick.time_msc - first_msc) / 1000.0 / speed
+                delay = due - clock.monotonic()
+                if delay > 0:
+                    clock.sleep(delay)
+
+            self.publish(symbol, tick)
+            count += 1
+
+        self.logger.info(f"Tick replay finished: {count} ticks")
+        return count
+
+    def get_quote(self, symbol: str) -> Optional[Dict]:
+        """Latest replayed quote in XMConnector.get_quote() format"""
+        tick = self.last_ticks.get(symbol)
+        if tick is None:
+            return None
+        return {
+            "symbol": symbol,
+            "bid": tick.bid,
+            "ask": tick.ask,
+            "time": datetime.fromtimestamp(tick.time).isoformat(),
+            "digits": 5
+        }
+
+    # --- Feed interface used by PaperConnector ---
+
+    def connect(self) -> bool:
+        self.connected = True
+        return True
+
+    def disconnect(self) -> bool:
+        self.connected = False
+        return True
+
+    def get_symbol_info(self, symbol: str) -> Optional[Dict]:
+        """Contract spec saved with the recording (SymbolSpec.from_info format), if any"""
+        try:
+            with open(os.path.join(self.root, symbol, SPEC_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_ohlc(self, symbol: str, timeframe: str, bars: int = 100) -> List[Dict]:
+        """Candles built from the ticks replayed so far"""
+        return self.bars.get_candles(symbol, timeframe, bars)
+
+    def get_rates_range(self, symbol: str, timeframe: str, date_from: datetime, date_to: datetime) -> List[Dict]:
+        return []
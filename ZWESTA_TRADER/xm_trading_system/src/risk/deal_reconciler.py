@@ -0,0 +1,97 @@
+"""Deal Reconciler - Detect positions closed by the broker"""
+from collections import deque
+from typing import Optional
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+
+
+class DealReconciler:
+    """
+    Poll the terminal's deal history from a high-water mark and match
+    closing deals to tracked positions by position ID
+    Every close is booked here with the exact deal price and profit: closes
+    the bot sent are registered with expect_close() and keep their reason,
+    any other closing deal is a broker-side SL/TP execution
+    """
+
+    def __init__(self, api_connector, position_manager):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.clock = get_clock()
+        self.api = api_connector
+        self.position_manager = position_manager
+        self.lookback_hours = self.config.get("reconciliation.deal_lookback_hours", 24)
+        self.overlap_ms = int(self.config.get("reconciliation.overlap_seconds", 5) * 1000)
+        self.high_water_msc: Optional[int] = None
+        self._seen_order = deque()
+        self._seen = set()
+        self._partial_profit = {}
+        self._expected = {}
+        self.closed_by_broker = 0
+
+    def expect_close(self, ticket: int, reason: str):
+        """Register a close the bot sent, booked with this reason when its deal arrives"""
+        self._expected[ticket] = reason
+
+    def _mark_seen(self, deal_ticket: int) -> bool:
+        """Remember a deal ticket; returns False if it was already processed"""
+        if deal_ticket in self._seen:
+            return False
+        self._seen.add(deal_ticket)
+        self._seen_order.append(deal_ticket)
+        if len(self._seen_order) > 5000:
+            self._seen.discard(self._seen_order.popleft())
+        return True
+
+    def poll(self) -> int:
+        """
+        Process new deals since the high-water mark
+        Returns: number of tracked positions closed (by the bot or the broker)
+        """
+        book = self.position_manager.open_positions
+        closed = 0
+        try:
+            if self.high_water_msc is None:
+                # Deals are stamped in server time, which is only known once connected
+                self.high_water_msc = int((self.api.server_time() - self.lookback_hours * 3600) * 1000)
+            # Re-read a small overlap so deals stamped with the same millisecond are not missed
+            deals = self.api.get_deals_since(self.high_water_msc - self.overlap_ms)
+            for deal in deals:
+                if not self._mark_seen(deal["ticket"]):
+                    continue
+                self.high_water_msc = max(self.high_water_msc, deal["time_msc"])
+
+                if deal["entry"] not in ("OUT", "OUT_BY"):
+                    continue
+
+                ticket = deal["position_id"]
+                position = book.get(ticket)
+                if position is None:
+                    continue  # closed by us (already removed) or not ours
+
+                profit = deal["profit"] + deal["commission"] + deal["swap"] + deal["fee"]
+                if deal["volume"] + 1e-9 < position.volume:
+                    remaining = round(position.volume - deal["volume"], 8)
+                    book.resize(ticket, remaining)
+                    self._partial_profit[ticket] = self._partial_profit.get(ticket, 0.0) + profit
+                    self.logger.warning(
+                        f"Partial broker close of #{ticket}: {deal['volume']} lots closed, "
+                        f"{remaining} remaining"
+                    )
+                    continue
+
+                profit += self._partial_profit.pop(ticket, 0.0)
+                reason = self._expected.pop(ticket, None)
+                self.position_manager.remove_position(ticket, deal["price"], profit, reason or "broker")
+                closed += 1
+                if reason is None:
+                    self.closed_by_broker += 1
+                self.logger.info(
+                    f"✓ POSITION CLOSED{'' if reason else ' BY BROKER'} #{ticket}: {deal['symbol']} "
+                    f"@ {deal['price']:.5f} | Reason: {reason or 'broker'} | Profit: ${profit:.2f}"
+                )
+        except Exception as e:
+            self.logger.error(f"Deal reconciliation error: {e}")
+
+        return closed
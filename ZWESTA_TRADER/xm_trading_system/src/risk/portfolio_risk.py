@@ -0,0 +1,192 @@
+"""Portfolio Risk - Vectorized currency / asset-class exposure and VaR"""
+import math
+from statistics import NormalDist
+from typing import Dict, List, Tuple
+import numpy as np
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+
+# Instruments whose names are not <BASE><QUOTE>
+SYMBOL_ALIASES = {"GOLD": "XAUUSD", "SILVER": "XAGUSD"}
+
+
+def split_symbol(symbol: str) -> Tuple[str, str]:
+    """Base and quote currency of a symbol (e.g. USDJPY -> USD, JPY)"""
+    name = SYMBOL_ALIASES.get(symbol, symbol)
+    if len(name) == 6 and name.isalpha():
+        return name[:3], name[3:]
+    return name, "USD"
+
+
+class PortfolioRisk:
+    """
+    Portfolio-level exposure and Value-at-Risk
+    Once per cycle update() builds the return covariance matrix Σ, the signed
+    USD notional vector w and Σw. A pre-trade check then only needs the
+    candidate's row of Σw (marginal VaR), and accepted fills update w and Σw
+    in place, so checks within the cycle share one matrix-vector product
+    """
+
+    def __init__(self, position_manager, symbol_specs=None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.position_manager = position_manager
+        self.symbol_specs = symbol_specs
+        self.symbols: List[str] = self.config.get_all_symbols()
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+        self.asset_classes = list(self.config.get("trading.symbols", {}).keys())
+        contract_sizes = self.config.get("portfolio_risk.contract_sizes", {})
+        n = len(self.symbols)
+        self.contract_size = np.ones(n)
+        self.class_matrix = np.zeros((len(self.asset_classes), n))
+        for c, asset_class in enumerate(self.asset_classes):
+            for symbol in self.config.get_symbols(asset_class):
+                i = self.index[symbol]
+                self.class_matrix[c, i] = 1.0
+                self.contract_size[i] = contract_sizes.get(asset_class, 1)
+
+        pairs = [split_symbol(symbol) for symbol in self.symbols]
+        self.currencies = sorted({ccy for pair in pairs for ccy in pair})
+        self._base = np.array([self.currencies.index(b) for b, _ in pairs])
+        self._quote = np.array([self.currencies.index(q) for _, q in pairs])
+
+        self.confidence = self.config.get("portfolio_risk.confidence", 0.95)
+        self.z = NormalDist().inv_cdf(self.confidence)
+        self.horizon = math.sqrt(self.config.get("portfolio_risk.horizon_bars", 12))
+        self.lookback = self.config.get("portfolio_risk.lookback_bars", 100)
+        self.max_var_percent = self.config.get("portfolio_risk.max_var_percent", 3.0)
+        self.max_class_multiple = self.config.get("portfolio_risk.max_asset_class_exposure", 10.0)
+
+        self.usd_per_lot = np.zeros(n)
+        self.cov = np.zeros((n, n))
+        self.returns = np.zeros((0, n))
+        self.w = np.zeros(n)
+        self._cov_w = np.zeros(n)
+        self._port_var = 0.0
+        self.ready = False
+
+    def update(self, ohlc_by_symbol: Dict[str, list], quotes: Dict):
+        """Rebuild Σ, prices and the exposure vector for this cycle"""
+        try:
+            n = len(self.symbols)
+            prices = np.full(n, np.nan)
+            for symbol, quote in quotes.items():
+                i = self.index.get(symbol)
+                if i is not None:
+                    prices[i] = (quote["bid"] + quote["ask"]) / 2
+
+            # Per-bar log returns aligned on the most recent bars
+            returns = np.zeros((self.lookback, n))
+            for symbol, candles in ohlc_by_symbol.items():
+                i = self.index.get(symbol)
+                if i is None or len(candles) < 3:
+                    continue
+                closes = np.fromiter((c["close"] for c in candles[-(self.lookback + 1):]), dtype=float)
+                r = np.diff(np.log(closes))
+                returns[-len(r):, i] = r
+                if np.isnan(prices[i]):
+                    prices[i] = closes[-1]
+
+            self.returns = returns
+            if self.symbol_specs is not None:
+                # Broker contract sizes override the per-asset-class defaults
+                for symbol, i in self.index.items():
+                    spec = self.symbol_specs.get(symbol)
+                    if spec is not None:
+                        self.contract_size[i] = spec.contract_size
+            self.cov = np.cov(returns, rowvar=False) if returns.shape[0] > 1 else np.zeros((n, n))
+            self.usd_per_lot = self.contract_size * np.nan_to_num(prices) * self._quote_to_usd(prices)
+
+            book = self.position_manager.open_positions
+            net_lots = np.array([book.net(symbol) for symbol in self.symbols])
+            self.w = net_lots * self.usd_per_lot
+            self._cov_w = self.cov @ self.w
+            self._port_var = float(self.w @ self._cov_w)
+            self.ready = True
+        except Exception as e:
+            self.logger.error(f"Portfolio risk update error: {e}")
+            self.ready = False
+
+    def _quote_to_usd(self, prices: np.ndarray) -> np.ndarray:
+        """Conversion factor from each symbol's quote currency to USD"""
+        rates = {}
+        for symbol, i in self.index.items():
+            if np.isnan(prices[i]) or prices[i] <= 0:
+                continue
+            base, quote = split_symbol(symbol)
+            if quote == "USD":
+                rates[base] = prices[i]
+            elif base == "USD":
+                rates[quote] = 1 / prices[i]
+        rates["USD"] = 1.0
+        return np.array([rates.get(split_symbol(s)[1], 1.0) for s in self.symbols])
+
+    def currency_exposure(self) -> Dict[str, float]:
+        """Net USD exposure per currency (long base, short quote)"""
+        exposure = np.zeros(len(self.currencies))
+        np.add.at(exposure, self._base, self.w)
+        np.add.at(exposure, self._quote, -self.w)
+        return dict(zip(self.currencies, exposure.round(2).tolist()))
+
+    def asset_class_exposure(self) -> Dict[str, float]:
+        """Gross USD notional per asset class"""
+        gross = self.class_matrix @ np.abs(self.w)
+        return dict(zip(self.asset_classes, gross.round(2).tolist()))
+
+    def parametric_var(self) -> float:
+        """Variance-covariance VaR in account currency over the horizon"""
+        return self.z * math.sqrt(max(self._port_var, 0.0)) * self.horizon
+
+    def historical_var(self) -> float:
+        """Historical-simulation VaR over the horizon"""
+        if self.returns.shape[0] == 0:
+            return 0.0
+        pnl = self.returns @ self.w
+        return max(-float(np.quantile(pnl, 1 - self.confidence)), 0.0) * self.horizon
+
+    def check_new_position(self, symbol: str, order_type: str, volume: float,
+                           account_balance: float) -> Tuple[bool, str]:
+        """
+        Pre-trade check against VaR and asset-class limits
+        Marginal variance: (w+d)'Σ(w+d) = w'Σw + 2d(Σw)_i + d²Σ_ii
+        """
+        i = self.index.get(symbol)
+        if not self.ready or i is None or account_balance <= 0:
+            return True, "Portfolio risk not available"
+
+        d = (volume if order_type == "BUY" else -volume) * self.usd_per_lot[i]
+        new_var = self._port_var + 2 * d * self._cov_w[i] + d * d * self.cov[i, i]
+        var_after = self.z * math.sqrt(max(new_var, 0.0)) * self.horizon
+        var_limit = account_balance * self.max_var_percent / 100
+        if var_after > var_limit and var_after > self.parametric_var():
+            return False, f"Portfolio VaR ${var_after:.2f} would exceed limit ${var_limit:.2f}"
+
+        gross = self.class_matrix @ np.abs(self.w)
+        classes = np.nonzero(self.class_matrix[:, i])[0]
+        class_limit = account_balance * self.max_class_multiple
+        for c in classes:
+            if gross[c] + abs(d) > class_limit:
+                return False, (
+                    f"{self.asset_classes[c]} exposure ${gross[c] + abs(d):,.0f} would exceed "
+                    f"${class_limit:,.0f}"
+                )
+
+        return True, f"Portfolio VaR ${var_after:.2f} within ${var_limit:.2f}"
+
+    def apply_fill(self, symbol: str, order_type: str, volume: float):
+        """Fold an accepted trade into w and Σw without recomputing Σw"""
+        i = self.index.get(symbol)
+        if not self.ready or i is None:
+            return
+        d = (volume if order_type == "BUY" else -volume) * self.usd_per_lot[i]
+        self._port_var += 2 * d * self._cov_w[i] + d * d * self.cov[i, i]
+        self.w[i] += d
+        self._cov_w += d * self.cov[:, i]
+
+    def summary(self) -> str:
+        """One-line risk summary for the session log"""
+        return (
+            f"Portfolio VaR ({self.confidence:.0%}): parametric ${self.parametric_var():.2f}, "
+            f"historical ${self.historical_var():.2f} | Exposure by class: {self.asset_class_exposure()}"
+        )
@@ -0,0 +1,144 @@
+"""Position Book - Indexed open positions with incremental aggregates"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+@dataclass(slots=True)
+class Position:
+    """Open position record"""
+    ticket: int
+    symbol: str
+    type: str  # "BUY" or "SELL"
+    volume: float
+    entry_price: float
+    stop_loss: float
+    take_profit: float
+    open_time: datetime
+    entry_equity: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "ticket": self.ticket,
+            "symbol": self.symbol,
+            "type": self.type,
+            "volume": self.volume,
+            "entry_price": self.entry_price,
+            "stop_loss": self.stop_loss,
+            "take_profit": self.take_profit,
+            "open_time": self.open_time,
+            "entry_equity": self.entry_equity,
+        }
+
+
+class PositionBook:
+    """
+    Open positions keyed by ticket with secondary indexes by symbol and side
+    Exposure aggregates are maintained on add/remove so limit checks are O(1)
+    """
+
+    def __init__(self):
+        self._positions: Dict[int, Position] = {}
+        self._by_symbol: Dict[str, Dict[int, Position]] = {}
+        self._by_side: Dict[str, Dict[int, Position]] = {"BUY": {}, "SELL": {}}
+        self._volume_by_symbol: Dict[str, float] = {}
+        self._net_lots_by_symbol: Dict[str, float] = {}
+        self.total_volume = 0.0
+        self.net_lots = 0.0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, ticket: int) -> bool:
+        return ticket in self._positions
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._positions)
+
+    def get(self, ticket: int) -> Optional[Position]:
+        return self._positions.get(ticket)
+
+    def keys(self):
+        return self._positions.keys()
+
+    def values(self):
+        return self._positions.values()
+
+    def items(self):
+        return self._positions.items()
+
+    def add(self, position: Position):
+        """Insert a position (replaces an existing one with the same ticket)"""
+        if position.ticket in self._positions:
+            self.remove(position.ticket)
+
+        self._positions[position.ticket] = position
+        self._by_symbol.setdefault(position.symbol, {})[position.ticket] = position
+        self._by_side[position.type][position.ticket] = position
+        self._apply(position, 1)
+
+    def remove(self, ticket: int) -> Optional[Position]:
+        """Remove a position and update aggregates"""
+        position = self._positions.pop(ticket, None)
+        if position is None:
+            return None
+
+        symbol_positions = self._by_symbol[position.symbol]
+        del symbol_positions[ticket]
+        if not symbol_positions:
+            del self._by_symbol[position.symbol]
+        del self._by_side[position.type][ticket]
+        self._apply(position, -1)
+        return position
+
+    def resize(self, ticket: int, volume: float):
+        """Change a position's volume (e.g. after a partial close)"""
+        position = self._positions.get(ticket)
+        if position is None:
+            return
+        self._apply(position, -1)
+        position.volume = volume
+        self._apply(position, 1)
+
+    def _apply(self, position: Position, sign: int):
+        signed = position.volume if position.type == "BUY" else -position.volume
+        symbol = position.symbol
+        self._volume_by_symbol[symbol] = self._volume_by_symbol.get(symbol, 0.0) + sign * position.volume
+        self._net_lots_by_symbol[symbol] = self._net_lots_by_symbol.get(symbol, 0.0) + sign * signed
+        self.total_volume += sign * position.volume
+        self.net_lots += sign * signed
+        if symbol not in self._by_symbol:
+            # Drop float residue once a symbol has no positions
+            self._volume_by_symbol.pop(symbol, None)
+            self._net_lots_by_symbol.pop(symbol, None)
+        if not self._positions:
+            self.total_volume = 0.0
+            self.net_lots = 0.0
+
+    def by_symbol(self, symbol: str) -> List[Position]:
+        """Positions for a symbol (snapshot, safe to mutate the book while iterating)"""
+        return list(self._by_symbol.get(symbol, {}).values())
+
+    def by_side(self, side: str) -> List[Position]:
+        return list(self._by_side.get(side, {}).values())
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one open position"""
+        return list(self._by_symbol)
+
+    def count(self, symbol: Optional[str] = None) -> int:
+        if symbol is None:
+            return len(self._positions)
+        return len(self._by_symbol.get(symbol, ()))
+
+    def exposure(self, symbol: Optional[str] = None) -> float:
+        """Gross lots, overall or for one symbol"""
+        if symbol is None:
+            return self.total_volume
+        return self._volume_by_symbol.get(symbol, 0.0)
+
+    def net(self, symbol: Optional[str] = None) -> float:
+        """Net lots (BUY positive, SELL negative), overall or for one symbol"""
+        if symbol is None:
+            return self.net_lots
+        return self._net_lots_by_symbol.get(symbol, 0.0)
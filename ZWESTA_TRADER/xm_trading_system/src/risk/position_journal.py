@@ -0,0 +1,110 @@
+"""Position Journal - Append-only log of position events for crash recovery"""
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+
+
+class PositionJournal:
+    """
+    JSON-lines journal of open/modify/close events
+    Replaying the file yields the set of positions open at the last write;
+    compaction rewrites it as one "open" event per live position
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.path = path or self.config.state_path("journal.path", "data/positions.journal")
+        self.fsync = self.config.get("journal.fsync", False)
+        self.compact_every = self.config.get("journal.compact_every", 500)
+        self.events_since_compact = 0
+        self._file = None
+
+    def _write(self, event: Dict):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.events_since_compact += 1
+
+    def record_open(self, position):
+        """Journal a newly tracked position (a Position record)"""
+        event = position.to_dict()
+        event["open_time"] = position.open_time.isoformat() if position.open_time else None
+        event["e"] = "open"
+        self._write(event)
+
+    def record_modify(self, ticket: int, stop_loss: float, take_profit: float):
+        self._write({"e": "modify", "ticket": ticket, "stop_loss": stop_loss, "take_profit": take_profit})
+
+    def record_close(self, ticket: int):
+        self._write({"e": "close", "ticket": ticket})
+
+    def replay(self) -> Dict[int, Dict]:
+        """Fold the journal into the positions that are still open"""
+        positions = {}
+        if not os.path.exists(self.path):
+            return positions
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line after a crash is expected; anything else is logged
+                    self.logger.warning(f"Skipping unreadable journal line {line_no} in {self.path}")
+                    continue
+
+                kind = event.pop("e", None)
+                ticket = event.get("ticket")
+                if kind == "open":
+                    if event.get("open_time"):
+                        event["open_time"] = datetime.fromisoformat(event["open_time"])
+                    positions[ticket] = event
+                elif kind == "modify" and ticket in positions:
+                    positions[ticket]["stop_loss"] = event["stop_loss"]
+                    positions[ticket]["take_profit"] = event["take_profit"]
+                elif kind == "close":
+                    positions.pop(ticket, None)
+        return positions
+
+    def should_compact(self, open_count: int) -> bool:
+        return self.events_since_compact >= max(self.compact_every, 2 * open_count)
+
+    def compact(self, positions: Iterable):
+        """Atomically rewrite the journal as a snapshot of the given open positions"""
+        tmp_path = self.path + ".tmp"
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        count = 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for position in positions:
+                event = position.to_dict()
+                event["open_time"] = position.open_time.isoformat() if position.open_time else None
+                event["e"] = "open"
+                f.write(json.dumps(event, separators=(",", ":")) + "\n")
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(tmp_path, self.path)
+        self.events_since_compact = 0
+        self.logger.debug(f"Position journal compacted to {count} open positions")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
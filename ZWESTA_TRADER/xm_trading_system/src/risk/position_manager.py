@@ -1,8 +1,15 @@
 """Position and Risk Management"""
+import math
 from typing import Dict, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from src.utils.logger import get_logger
 from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+from src.risk.position_book import Position, PositionBook
+from src.risk.trigger_index import TriggerIndex
+from src.risk.rolling_stats import RollingWindowStats
+from src.risk.trade_history import TradeHistory
+from src.risk.position_journal import PositionJournal
 
 class PositionManager:
     """Manage positions and risk parameters"""
@@ -10,15 +17,37 @@ class PositionManager:
     def __init__(self, api_connector):
         self.logger = get_logger()
         self.config = get_config()
+        self.clock = get_clock()
         self.api = api_connector
-        self.open_positions = {}
-        self.position_history = []
+        self.settings = self.config.risk_settings()
+        self.open_positions = PositionBook()
+        self.triggers = TriggerIndex()
+        self.position_history = TradeHistory()
+        self.stats_24h = RollingWindowStats(timedelta(hours=24))
+        self.journal = PositionJournal() if self.config.get("journal.enabled", True) else None
+        self.close_listeners = []
+        self.config.add_reload_listener(self._on_config_reload)
+        
+        # Restore the 24h window from archived trades after a restart
+        since = self.clock.utcnow() - timedelta(hours=24)
+        for trade in self.position_history.query(start=since):
+            self.stats_24h.add(trade["close_time"], trade["profit"])
+    
+    def _on_config_reload(self, snapshot):
+        self.settings = snapshot.risk
+    
+    def add_close_listener(self, listener):
+        """Register callback(position: dict) invoked after a tracked position closes"""
+        self.close_listeners.append(listener)
     
     def calculate_position_size(self, symbol: str, account_balance: float, 
                                entry_price: float, stop_loss: float) -> float:
-        """Calculate position size based on risk management rules"""
+        """
+        Calculate position size based on risk management rules
+        Returns: lots, or 0 if even the minimum lot would risk more than position_size_percent
+        """
         try:
-            risk_percent = self.config.get("trading.position_size_percent", 2)
+            risk_percent = self.settings.position_size_percent
             max_loss_amount = account_balance * (risk_percent / 100)
             
             # Calculate pips at risk
@@ -26,39 +55,74 @@ class PositionManager:
             if pips_at_risk == 0:
                 return 0
             
-            # For forex/crypto, pip value varies by instrument
-            pip_value = self._get_pip_value(symbol)
-            
-            # Position size = max loss / (pips at risk * pip value)
-            position_size = max_loss_amount / (pips_at_risk * pip_value)
+            spec = self.api.symbol_specs.get(symbol)
+            if spec is not None:
+                # Loss per lot at the stop, from the broker's tick value
+                loss_per_lot = pips_at_risk * spec.money_per_price_unit()
+                raw_size = max_loss_amount / loss_per_lot
+                min_lot = spec.volume_min
+            else:
+                # No contract spec available - price the loss from the configured contract size
+                raw_size = max_loss_amount / self._fallback_loss_per_lot(symbol, entry_price, pips_at_risk)
+                min_lot = 0.01
             
-            # Limit to reasonable size
-            position_size = min(position_size, 10.0)  # Max 10 lots
-            position_size = max(position_size, 0.01)  # Min 0.01 lot
+            # Never round up to the minimum lot: that would risk more than configured
+            if raw_size < min_lot:
+                self.logger.info(
+                    f"Position size for {symbol}: {raw_size:.4f} lots is below the {min_lot} minimum "
+                    f"at {risk_percent}% risk - skipping"
+                )
+                return 0
+            if spec is not None:
+                position_size = spec.round_volume(raw_size)
+            else:
+                position_size = round(min(math.floor(raw_size * 100 + 1e-9) / 100, 10.0), 2)
             
             self.logger.debug(
-                f"Position size for {symbol}: {position_size:.2f} "
-                f"(risk: {risk_percent}%, pips: {pips_at_risk}, max loss: ${max_loss_amount:.2f})"
+                "Position size for %s: %.2f (risk: %s%%, pips: %s, max loss: $%.2f)",
+                symbol, position_size, risk_percent, pips_at_risk, max_loss_amount
             )
-            return round(position_size, 2)
+            return position_size
         except Exception as e:
             self.logger.error(f"Position size calculation error: {e}")
-            return 0.01
+            return 0
     
-    @staticmethod
-    def _get_pip_value(symbol: str) -> float:
-        """Get pip value for symbol (simplified)"""
-        gold_symbols = ["GOLD", "XAUUSD"]
-        if any(s in symbol for s in gold_symbols):
-            return 0.01  # 0.01 USD per pip for gold
-        return 0.0001  # Standard forex pip value
+    def _fallback_loss_per_lot(self, symbol: str, entry_price: float, price_distance: float) -> float:
+        """Account-currency loss per lot without a contract spec (portfolio_risk.contract_sizes)"""
+        contract_sizes = self.config.get("portfolio_risk.contract_sizes", {})
+        contract_size = 1
+        for asset_class, symbols in self.config.get("trading.symbols", {}).items():
+            if symbol in symbols:
+                contract_size = contract_sizes.get(asset_class, 1)
+                break
+        loss = price_distance * contract_size
+        if symbol.startswith("USD") and entry_price > 0:
+            loss /= entry_price  # quoted in the other currency, e.g. JPY for USDJPY
+        return loss
+    
+    def estimate_profit(self, position: Position, close_price: float) -> float:
+        """Account-currency P/L of a position closed at close_price (before commission and swap)"""
+        distance = close_price - position.entry_price
+        if position.type == "SELL":
+            distance = -distance
+        spec = self.api.symbol_specs.get(position.symbol)
+        if spec is not None:
+            per_lot = spec.money_per_price_unit()
+        else:
+            per_lot = self._fallback_loss_per_lot(position.symbol, close_price, 1.0)
+        return distance * position.volume * per_lot
+    
+    def _round_price(self, symbol: str, price: float) -> float:
+        """Round to the symbol's tick size (5 decimals if the spec is unknown)"""
+        spec = self.api.symbol_specs.get(symbol)
+        return spec.round_price(price) if spec is not None else round(price, 5)
     
     def calculate_stop_loss(self, symbol: str, entry_price: float, 
                            ohlc_data: list, order_type: str) -> float:
         """Calculate stop loss based on volatility (ATR)"""
         try:
             atr = self._calculate_atr(ohlc_data)
-            atr_multiplier = self.config.get("risk_management.stop_loss.atr_multiplier", 1.5)
+            atr_multiplier = self.settings.atr_multiplier
             
             stop_loss_distance = atr * atr_multiplier
             
@@ -68,10 +132,9 @@ class PositionManager:
                 stop_loss = entry_price + stop_loss_distance
             
             self.logger.debug(
-                f"Stop loss for {symbol}: {stop_loss:.5f} "
-                f"(ATR: {atr:.5f}, multiplier: {atr_multiplier})"
+                "Stop loss for %s: %.5f (ATR: %.5f, multiplier: %s)", symbol, stop_loss, atr, atr_multiplier
             )
-            return round(stop_loss, 5)
+            return self._round_price(symbol, stop_loss)
         except Exception as e:
             self.logger.error(f"Stop loss calculation error: {e}")
             return entry_price  # Conservative: no SL
@@ -80,9 +143,7 @@ class PositionManager:
                             order_type: str) -> float:
         """Calculate take profit for scalping"""
         try:
-            target_profit_percent = self.config.get(
-                "risk_management.take_profit.target_profit_percent", 1.0
-            )
+            target_profit_percent = self.settings.target_profit_percent
             
             target_pips = entry_price * (target_profit_percent / 100)
             
@@ -92,10 +153,9 @@ class PositionManager:
                 take_profit = entry_price - target_pips
             
             self.logger.debug(
-                f"Take profit for {symbol}: {take_profit:.5f} "
-                f"(target: {target_profit_percent}%)"
+                "Take profit for %s: %.5f (target: %s%%)", symbol, take_profit, target_profit_percent
             )
-            return round(take_profit, 5)
+            return self._round_price(symbol, take_profit)
         except Exception as e:
             self.logger.error(f"Take profit calculation error: {e}")
             return entry_price
@@ -126,27 +186,52 @@ class PositionManager:
                     volume: float, entry_price: float, stop_loss: float, 
                     take_profit: float):
         """Track an open position"""
-        self.open_positions[ticket] = {
-            "ticket": ticket,
-            "symbol": symbol,
-            "type": order_type,
-            "volume": volume,
-            "entry_price": entry_price,
-            "stop_loss": stop_loss,
-            "take_profit": take_profit,
-            "open_time": datetime.utcnow(),
-            "entry_equity": None
-        }
+        position = Position(
+            ticket=ticket,
+            symbol=symbol,
+            type=order_type,
+            volume=volume,
+            entry_price=entry_price,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            open_time=self.clock.utcnow()
+        )
+        self._track(position)
+        if self.journal is not None:
+            self.journal.record_open(position)
+            self._maybe_compact_journal()
         self.logger.info(f"Position tracked: #{ticket} {symbol} {order_type}")
     
-    def remove_position(self, ticket: int, close_price: float, profit: float):
-        """Remove closed position and log to history"""
+    def _track(self, position: Position):
+        """Index a position in the book and the SL/TP trigger index"""
+        self.open_positions.add(position)
+        self.triggers.add(position.ticket, position.symbol, position.type,
+                          position.stop_loss, position.take_profit)
+    
+    def _maybe_compact_journal(self):
+        if self.journal.should_compact(len(self.open_positions)):
+            self.journal.compact(self.open_positions.values())
+    
+    def remove_position(self, ticket: int, close_price: float, profit: float, reason: str = ""):
+        """Remove closed position and log to history (reason: e.g. "Take Profit Hit", "broker")"""
         if ticket in self.open_positions:
-            position = self.open_positions.pop(ticket)
+            self.triggers.remove(ticket)
+            position = self.open_positions.remove(ticket).to_dict()
             position["close_price"] = close_price
             position["profit"] = profit
-            position["close_time"] = datetime.utcnow()
+            position["close_time"] = self.clock.utcnow()
+            position["close_reason"] = reason
             self.position_history.append(position)
+            self.stats_24h.add(position["close_time"], profit)
+            if self.journal is not None:
+                self.journal.record_close(ticket)
+                self._maybe_compact_journal()
+            
+            for listener in self.close_listeners:
+                try:
+                    listener(position)
+                except Exception as e:
+                    self.logger.error(f"Close listener error for #{ticket}: {e}")
             
             pips_gained = abs(close_price - position["entry_price"])
             self.logger.info(
@@ -154,22 +239,118 @@ class PositionManager:
                 f"Profit: ${profit:.2f} ({pips_gained:.5f} pips)"
             )
     
+    def update_stops(self, ticket: int, stop_loss: float, take_profit: float):
+        """Record new SL/TP levels for a tracked position"""
+        position = self.open_positions.get(ticket)
+        if position is None:
+            return
+        position.stop_loss = stop_loss
+        position.take_profit = take_profit
+        self.triggers.update(ticket, stop_loss, take_profit)
+        if self.journal is not None:
+            self.journal.record_modify(ticket, stop_loss, take_profit)
+    
+    def reconcile_with_terminal(self) -> Dict:
+        """
+        Rebuild open positions after a restart
+        Replays the journal and diffs it against the terminal's open positions:
+          - in both: restored (terminal SL/TP/volume win)
+          - only at the terminal: adopted if journal.adopt_unknown is set and the
+            magic number is ours; manual trades and other EAs' positions are never touched
+          - only in the journal: closed while offline, dropped
+        Returns: counts per outcome
+        """
+        journaled = self.journal.replay() if self.journal is not None else {}
+        broker = {p["ticket"]: p for p in self.api.get_positions()}
+        
+        restored = journaled.keys() & broker.keys()
+        adopted = broker.keys() - journaled.keys()
+        vanished = journaled.keys() - broker.keys()
+        
+        for ticket in restored:
+            record, live = journaled[ticket], broker[ticket]
+            self._track(Position(
+                ticket=ticket,
+                symbol=record["symbol"],
+                type=record["type"],
+                volume=live["volume"],
+                entry_price=record["entry_price"],
+                stop_loss=live["stop_loss"],
+                take_profit=live["take_profit"],
+                open_time=record.get("open_time") or self.clock.utcnow(),
+                entry_equity=record.get("entry_equity")
+            ))
+        
+        adopt_unknown = self.config.get("journal.adopt_unknown", False)
+        owns = self.api.magic_allocator.owns
+        counts = {"adopted": 0, "ignored": 0, "foreign": 0}
+        for ticket in adopted:
+            live = broker[ticket]
+            if not owns(live.get("magic") or 0):
+                counts["foreign"] += 1
+                self.logger.info(
+                    f"Position #{ticket} {live['symbol']} {live['type']} {live['volume']} "
+                    f"(magic {live.get('magic')}) was not opened by this bot - not tracked"
+                )
+                continue
+            self.logger.warning(
+                f"Position #{ticket} {live['symbol']} {live['type']} {live['volume']} is open at the "
+                f"terminal but not in the journal - {'adopting' if adopt_unknown else 'ignoring'}"
+            )
+            counts["adopted" if adopt_unknown else "ignored"] += 1
+            if adopt_unknown:
+                self._track(Position(
+                    ticket=ticket,
+                    symbol=live["symbol"],
+                    type=live["type"],
+                    volume=live["volume"],
+                    entry_price=live["entry_price"],
+                    stop_loss=live["stop_loss"],
+                    take_profit=live["take_profit"],
+                    open_time=_utc(live["open_time"])
+                ))
+        
+        for ticket in vanished:
+            self.logger.warning(
+                f"Position #{ticket} {journaled[ticket]['symbol']} closed while offline - "
+                f"removed from tracking"
+            )
+        
+        if self.journal is not None:
+            self.journal.compact(self.open_positions.values())
+        
+        summary = {"restored": len(restored), **counts, "closed_offline": len(vanished)}
+        self.logger.info(
+            f"Position reconciliation: {summary['restored']} restored, {summary['adopted']} adopted, "
+            f"{summary['ignored']} ignored, {summary['foreign']} not ours, "
+            f"{summary['closed_offline']} closed while offline"
+        )
+        return summary
+    
     def get_open_positions_count(self) -> int:
         """Get number of open positions"""
         return len(self.open_positions)
     
     def get_total_exposure(self) -> float:
         """Calculate total market exposure"""
-        return sum(pos["volume"] for pos in self.open_positions.values())
+        return self.open_positions.exposure()
     
-    def can_open_position(self) -> bool:
-        """Check if new position can be opened based on risk limits"""
-        max_positions = self.config.get("trading.max_positions", 5)
-        current_positions = self.get_open_positions_count()
+    def get_symbol_exposure(self, symbol: str) -> float:
+        """Gross lots open on one symbol"""
+        return self.open_positions.exposure(symbol)
+    
+    def can_open_position(self, pending: int = 0) -> bool:
+        """
+        Check if new position can be opened based on risk limits
+        pending: entries sent or working but not yet tracked (queued opens, pending orders)
+        """
+        max_positions = self.settings.max_positions
+        current_positions = self.get_open_positions_count() + pending
         
         if current_positions >= max_positions:
             self.logger.warning(
                 f"Max positions reached: {current_positions}/{max_positions}"
+                + (f" ({pending} pending)" if pending else "")
             )
             return False
         
@@ -177,31 +358,13 @@ class PositionManager:
     
     def get_24h_stats(self) -> Dict:
         """Calculate 24-hour trading statistics"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=24)
-        recent_trades = [
-            trade for trade in self.position_history
-            if trade["close_time"] > cutoff_time
-        ]
-        
-        if not recent_trades:
-            return {
-                "trades": 0,
-                "wins": 0,
-                "losses": 0,
-                "win_rate": 0,
-                "total_profit": 0.0,
-                "avg_profit": 0.0
-            }
-        
-        wins = sum(1 for t in recent_trades if t["profit"] > 0)
-        losses = sum(1 for t in recent_trades if t["profit"] <= 0)
-        total_profit = sum(t["profit"] for t in recent_trades)
-        
-        return {
-            "trades": len(recent_trades),
-            "wins": wins,
-            "losses": losses,
-            "win_rate": (wins / len(recent_trades) * 100) if recent_trades else 0,
-            "total_profit": total_profit,
-            "avg_profit": total_profit / len(recent_trades) if recent_trades else 0
-        }
+        return self.stats_24h.snapshot(self.clock.utcnow())
+    
+    def get_consecutive_losses(self) -> int:
+        """Number of losing trades since the last winner"""
+        return self.stats_24h.consecutive_losses
+
+
+def _utc(timestamp: str) -> datetime:
+    """Naive UTC datetime from a connector timestamp (ISO format, local time unless it has an offset)"""
+    return datetime.fromisoformat(timestamp).astimezone(timezone.utc).replace(tzinfo=None)
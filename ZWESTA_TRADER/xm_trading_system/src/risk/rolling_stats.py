@@ -0,0 +1,75 @@
+"""Rolling Window Statistics - Incrementally maintained trade stats"""
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+
+class RollingWindowStats:
+    """
+    Time-windowed trade statistics (e.g. last 24h)
+    Each close is pushed once and evicted once, and running sums are kept,
+    so a stats query costs O(1) amortised however long the bot has run
+    """
+
+    def __init__(self, window: timedelta = timedelta(hours=24)):
+        self.window = window
+        self._trades = deque()
+        self.wins = 0
+        self.losses = 0
+        self.total_profit = 0.0
+        self.consecutive_losses = 0
+
+    def add(self, close_time: datetime, profit: float):
+        """Record a closed trade (close times are expected in order)"""
+        self._trades.append((close_time, profit))
+        if profit > 0:
+            self.wins += 1
+            self.consecutive_losses = 0
+        else:
+            self.losses += 1
+            self.consecutive_losses += 1
+        self.total_profit += profit
+
+    def evict(self, now: datetime):
+        """Drop trades that closed at or before now - window"""
+        cutoff = now - self.window
+        trades = self._trades
+        while trades and trades[0][0] <= cutoff:
+            _, profit = trades.popleft()
+            if profit > 0:
+                self.wins -= 1
+            else:
+                self.losses -= 1
+            self.total_profit -= profit
+        if not trades:
+            # Reset float residue from repeated add/subtract
+            self.total_profit = 0.0
+
+    def next_expiry(self) -> Optional[datetime]:
+        """When the oldest trade leaves the window (None if empty)"""
+        if not self._trades:
+            return None
+        return self._trades[0][0] + self.window
+
+    def snapshot(self, now: datetime) -> Dict:
+        """Stats in PositionManager.get_24h_stats() format"""
+        self.evict(now)
+        trades = len(self._trades)
+        if trades == 0:
+            return {
+                "trades": 0,
+                "wins": 0,
+                "losses": 0,
+                "win_rate": 0,
+                "total_profit": 0.0,
+                "avg_profit": 0.0
+            }
+
+        return {
+            "trades": trades,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_rate": self.wins / trades * 100,
+            "total_profit": self.total_profit,
+            "avg_profit": self.total_profit / trades
+        }
@@ -0,0 +1,126 @@
+"""Stop Manager - Trailing stop and breakeven with coalesced modifies"""
+from collections import deque
+from typing import Dict, Optional
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+
+
+class StopManager:
+    """
+    Evaluate trailing-stop and breakeven rules on every price update
+    A new stop is queued only when it improves the current one by more than
+    the minimum step; queued stops are sent at most once per coalesce interval
+    per position and within a per-symbol modify budget
+    """
+
+    def __init__(self, api_connector, position_manager, event_log=None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.clock = get_clock()
+        self.api = api_connector
+        self.position_manager = position_manager
+        self.event_log = event_log
+        self.trailing_enabled = self.config.get("risk_management.stop_loss.trailing_stop", False)
+        self.trailing_percent = self.config.get("risk_management.stop_loss.trailing_stop_percent", 1.0)
+        self.breakeven_offset = self.config.get("risk_management.take_profit.breakeven_offset", 0.0)
+        self.min_step_points = self.config.get("stop_management.min_step_points", 10)
+        self.coalesce_seconds = self.config.get("stop_management.coalesce_seconds", 1.0)
+        self.modify_budget = self.config.get("stop_management.modify_budget", 10)
+        self.budget_window = self.config.get("stop_management.budget_window_seconds", 60)
+        self._pending: Dict[int, float] = {}
+        self._last_send: Dict[int, float] = {}
+        self._sends: Dict[str, deque] = {}
+        self.modifies_sent = 0
+        self.updates_coalesced = 0
+        self.throttled = 0
+
+    def on_quotes(self, quotes: Dict):
+        """Evaluate stop rules for every symbol with open positions"""
+        if not self.trailing_enabled and not self.breakeven_offset:
+            return
+        book = self.position_manager.open_positions
+        for symbol in book.symbols():
+            quote = quotes.get(symbol)
+            if quote is None:
+                continue
+            digits = quote.get("digits", 5)
+            min_step = self.min_step_points * 10 ** -digits
+            for position in book.by_symbol(symbol):
+                self._evaluate(position, quote["bid"], quote["ask"], min_step, digits)
+
+    def _evaluate(self, position, bid: float, ask: float, min_step: float, digits: int):
+        """Queue a better stop for one position if the rules call for it"""
+        is_buy = position.type == "BUY"
+        price = bid if is_buy else ask
+        entry = position.entry_price
+        profit_pct = ((price - entry) if is_buy else (entry - price)) / entry * 100
+
+        candidate = None
+        if self.breakeven_offset and profit_pct >= self.breakeven_offset:
+            candidate = entry
+        if self.trailing_enabled and profit_pct > 0:
+            trail = price * (1 - self.trailing_percent / 100) if is_buy \
+                else price * (1 + self.trailing_percent / 100)
+            if candidate is None:
+                candidate = trail
+            else:
+                candidate = max(candidate, trail) if is_buy else min(candidate, trail)
+        if candidate is None:
+            return
+
+        pending = self._pending.get(position.ticket)
+        current = pending if pending is not None else position.stop_loss
+        if current:
+            improvement = (candidate - current) if is_buy else (current - candidate)
+            if improvement <= min_step:
+                return
+        if pending is not None:
+            self.updates_coalesced += 1
+        self._pending[position.ticket] = round(candidate, digits)
+
+    def _within_budget(self, symbol: str, now: float) -> bool:
+        sends = self._sends.setdefault(symbol, deque())
+        while sends and sends[0] <= now - self.budget_window:
+            sends.popleft()
+        return len(sends) < self.modify_budget
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """
+        Send queued stop changes that are due
+        Returns: number of modify requests sent
+        """
+        now = self.clock.time() if now is None else now
+        book = self.position_manager.open_positions
+        sent = 0
+        for ticket, stop_loss in list(self._pending.items()):
+            position = book.get(ticket)
+            if position is None:
+                del self._pending[ticket]
+                self._last_send.pop(ticket, None)
+                continue
+
+            if now - self._last_send.get(ticket, 0.0) < self.coalesce_seconds:
+                continue
+            if not self._within_budget(position.symbol, now):
+                self.throttled += 1
+                continue
+
+            del self._pending[ticket]
+            self._last_send[ticket] = now
+            self._sends[position.symbol].append(now)
+            if self.api.modify_trade(ticket, stop_loss, position.take_profit, symbol=position.symbol):
+                self.position_manager.update_stops(ticket, stop_loss, position.take_profit)
+                self.modifies_sent += 1
+                sent += 1
+                if self.event_log is not None:
+                    self.event_log.emit("modify", ticket, target="position", symbol=position.symbol,
+                                        stop_loss=stop_loss, take_profit=position.take_profit)
+                self.logger.info(
+                    f"Stop moved #{ticket} {position.symbol}: SL -> {stop_loss} "
+                    f"(entry {position.entry_price})"
+                )
+        
+        if len(self._last_send) > 2 * len(book) + 100:
+            self._last_send = {t: ts for t, ts in self._last_send.items() if t in book}
+        return sent
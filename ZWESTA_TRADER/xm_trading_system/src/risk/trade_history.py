@@ -0,0 +1,189 @@
+"""Trade History - Bounded in-memory closed-trade table with on-disk archive"""
+import math
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+
+EPOCH = datetime(1970, 1, 1)
+
+TRADE_DTYPE = np.dtype([
+    ("ticket", "<i8"),
+    ("symbol", "S16"),
+    ("type", "S4"),
+    ("volume", "<f8"),
+    ("entry_price", "<f8"),
+    ("stop_loss", "<f8"),
+    ("take_profit", "<f8"),
+    ("close_price", "<f8"),
+    ("profit", "<f8"),
+    ("entry_equity", "<f8"),
+    ("open_time", "<f8"),   # UTC epoch seconds
+    ("close_time", "<f8"),  # UTC epoch seconds
+    ("close_reason", "S24"),
+])
+
+
+def _to_ts(dt: Optional[datetime]) -> float:
+    return (dt - EPOCH).total_seconds() if dt is not None else math.nan
+
+
+def _from_ts(ts: float) -> Optional[datetime]:
+    return EPOCH + timedelta(seconds=float(ts)) if not math.isnan(ts) else None
+
+
+class TradeHistory:
+    """
+    Closed trades in two tiers sharing one query interface:
+      - hot: the newest trades in a fixed-capacity structured array
+      - archive: older trades spilled to append-only day files
+        (<root>/<YYYYMMDD>.bin, records ordered by close time)
+    The day partition plus a binary search on close_time acts as the time index
+    """
+
+    def __init__(self, root: Optional[str] = None, hot_capacity: Optional[int] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.root = root or self.config.state_path("history.trades_path", "data/trades")
+        self.hot_capacity = max(2, hot_capacity or self.config.get("history.hot_trades", 5000))
+        self._hot = np.zeros(self.hot_capacity, dtype=TRADE_DTYPE)
+        self._count = 0
+        self._archived = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.archived_count() + self._count
+
+    def append(self, trade: Dict):
+        """Add a closed trade (dict as produced by PositionManager.remove_position)"""
+        with self._lock:
+            if self._count == self.hot_capacity:
+                self._spill(self.hot_capacity // 2)
+            row = self._hot[self._count]
+            row["ticket"] = trade["ticket"]
+            row["symbol"] = trade["symbol"].encode()
+            row["type"] = trade["type"].encode()
+            row["volume"] = trade["volume"]
+            row["entry_price"] = trade["entry_price"]
+            row["stop_loss"] = trade["stop_loss"] or 0.0
+            row["take_profit"] = trade["take_profit"] or 0.0
+            row["close_price"] = trade["close_price"]
+            row["profit"] = trade["profit"]
+            equity = trade.get("entry_equity")
+            row["entry_equity"] = equity if equity is not None else math.nan
+            row["open_time"] = _to_ts(trade.get("open_time"))
+            row["close_time"] = _to_ts(trade["close_time"])
+            row["close_reason"] = (trade.get("close_reason") or "").encode()[:24]
+            self._count += 1
+
+    def _spill(self, n: int):
+        """Move the oldest n hot records to the archive"""
+        records = self._hot[:n]
+        days = (records["close_time"] // 86400).astype(np.int64)
+        os.makedirs(self.root, exist_ok=True)
+        for day in np.unique(days):
+            path = self._day_path(int(day))
+            with open(path, "ab") as f:
+                f.write(records[days == day].tobytes())
+
+        remaining = self._count - n
+        self._hot[:remaining] = self._hot[n:self._count]
+        self._count = remaining
+        if self._archived is not None:
+            self._archived += n
+        self.logger.debug(f"Trade history: archived {n} trades to {self.root}")
+
+    def flush(self):
+        """Spill every hot record to the archive (call on shutdown)"""
+        with self._lock:
+            if self._count:
+                self._spill(self._count)
+
+    def _day_path(self, day: int) -> str:
+        name = (EPOCH + timedelta(days=day)).strftime("%Y%m%d")
+        return os.path.join(self.root, f"{name}.bin")
+
+    def _day_files(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(n for n in os.listdir(self.root) if n.endswith(".bin"))
+
+    def archived_count(self) -> int:
+        if self._archived is None:
+            self._archived = sum(
+                os.path.getsize(os.path.join(self.root, n)) // TRADE_DTYPE.itemsize
+                for n in self._day_files()
+            )
+        return self._archived
+
+    def _query_archive(self, start: float, end: float) -> List[np.ndarray]:
+        first_day = EPOCH + timedelta(seconds=start) if not math.isinf(start) else None
+        last_day = EPOCH + timedelta(seconds=end) if not math.isinf(end) else None
+        chunks = []
+        for name in self._day_files():
+            day = name[:-4]
+            if first_day is not None and day < first_day.strftime("%Y%m%d"):
+                continue
+            if last_day is not None and day > last_day.strftime("%Y%m%d"):
+                break
+            path = os.path.join(self.root, name)
+            rows = os.path.getsize(path) // TRADE_DTYPE.itemsize
+            if rows == 0:
+                continue
+            records = np.memmap(path, dtype=TRADE_DTYPE, mode="r", shape=(rows,))
+            close_times = records["close_time"]
+            lo = np.searchsorted(close_times, start, side="left")
+            hi = np.searchsorted(close_times, end, side="left")
+            if hi > lo:
+                chunks.append(np.array(records[lo:hi]))
+        return chunks
+
+    def query(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+              symbol: Optional[str] = None) -> List[Dict]:
+        """Closed trades with start <= close_time < end across both tiers, oldest first"""
+        start_ts = _to_ts(start) if start is not None else -math.inf
+        end_ts = _to_ts(end) if end is not None else math.inf
+
+        with self._lock:
+            hot = self._hot[:self._count]
+            close_times = hot["close_time"]
+            lo = np.searchsorted(close_times, start_ts, side="left")
+            hi = np.searchsorted(close_times, end_ts, side="left")
+            hot_part = hot[lo:hi].copy()
+            # Archived trades all closed at or before the oldest hot trade
+            archive_end = min(end_ts, np.nextafter(close_times[0], math.inf)) if self._count else end_ts
+            chunks = self._query_archive(start_ts, archive_end) if start_ts < archive_end else []
+
+        chunks.append(hot_part)
+        records = np.concatenate(chunks)
+        if symbol is not None:
+            records = records[records["symbol"] == symbol.encode()]
+        return [self._to_dict(r) for r in records]
+
+    def recent(self, n: int) -> List[Dict]:
+        """Newest n trades from the hot tier, oldest first"""
+        with self._lock:
+            rows = self._hot[max(0, self._count - n):self._count].copy()
+        return [self._to_dict(r) for r in rows]
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        equity = float(row["entry_equity"])
+        return {
+            "ticket": int(row["ticket"]),
+            "symbol": row["symbol"].decode(),
+            "type": row["type"].decode(),
+            "volume": float(row["volume"]),
+            "entry_price": float(row["entry_price"]),
+            "stop_loss": float(row["stop_loss"]),
+            "take_profit": float(row["take_profit"]),
+            "close_price": float(row["close_price"]),
+            "profit": float(row["profit"]),
+            "entry_equity": None if math.isnan(equity) else equity,
+            "open_time": _from_ts(row["open_time"]),
+            "close_time": _from_ts(row["close_time"]),
+            "close_reason": row["close_reason"].decode(),
+        }
@@ -0,0 +1,99 @@
+"""Trigger Index - Price-level index of stop loss / take profit levels"""
+import heapq
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+# A BUY closes at the bid, a SELL at the ask
+# "up" heaps fire when price >= level, "down" heaps when price <= level
+_LEGS = {
+    "BUY": (("take_profit", "up", "TAKE_PROFIT"), ("stop_loss", "down", "STOP_LOSS")),
+    "SELL": (("take_profit", "down", "TAKE_PROFIT"), ("stop_loss", "up", "STOP_LOSS")),
+}
+
+
+class TriggerIndex:
+    """
+    Per symbol and side, keep stop and target levels in heaps ordered by the
+    price that would cross them first. A price update pops only the crossed
+    entries, so the cost is proportional to the triggers that fire
+    Removed or modified positions leave stale heap entries that are skipped
+    lazily and compacted when they outnumber live ones
+    """
+
+    def __init__(self):
+        self._heaps: Dict[Tuple[str, str, str], list] = {}
+        self._live: Dict[int, Tuple[int, str, str, int]] = {}
+        self._seq = count()
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, ticket: int) -> bool:
+        return ticket in self._live
+
+    def add(self, ticket: int, symbol: str, side: str,
+            stop_loss: Optional[float], take_profit: Optional[float]):
+        """Arm SL/TP triggers for a position (re-arming replaces old levels)"""
+        if ticket in self._live:
+            self.remove(ticket)
+
+        version = next(self._seq)
+        levels = {"stop_loss": stop_loss, "take_profit": take_profit}
+        legs = 0
+        for field, direction, reason in _LEGS[side]:
+            level = levels[field]
+            if not level:
+                continue  # 0 / None means no level set
+            key = level if direction == "up" else -level
+            heap = self._heaps.setdefault((symbol, side, direction), [])
+            heapq.heappush(heap, (key, version, ticket, reason))
+            legs += 1
+        self._live[ticket] = (version, symbol, side, legs)
+
+    def remove(self, ticket: int):
+        """Disarm a position's triggers"""
+        entry = self._live.pop(ticket, None)
+        if entry is not None:
+            self._stale += entry[3]
+            self._maybe_compact()
+
+    def update(self, ticket: int, stop_loss: Optional[float], take_profit: Optional[float]):
+        """Move a position's levels"""
+        entry = self._live.get(ticket)
+        if entry is None:
+            return
+        _, symbol, side, _ = entry
+        self.add(ticket, symbol, side, stop_loss, take_profit)
+
+    def check(self, symbol: str, bid: float, ask: float) -> List[Tuple[int, str]]:
+        """
+        Pop every position whose level was crossed by this quote
+        Returns: list of (ticket, "TAKE_PROFIT" | "STOP_LOSS"); fired tickets are disarmed
+        """
+        fired = []
+        for side, price in (("BUY", bid), ("SELL", ask)):
+            for direction, threshold in (("up", price), ("down", -price)):
+                heap = self._heaps.get((symbol, side, direction))
+                while heap and heap[0][0] <= threshold:
+                    _, version, ticket, reason = heapq.heappop(heap)
+                    live = self._live.get(ticket)
+                    if live is None or live[0] != version:
+                        self._stale -= 1
+                        continue
+                    del self._live[ticket]
+                    # The position's other leg (if any) is now stale
+                    self._stale += live[3] - 1
+                    fired.append((ticket, reason))
+        return fired
+
+    def _maybe_compact(self):
+        """Rebuild heaps without stale entries once they dominate"""
+        if self._stale <= 2 * len(self._live) + 1024:
+            return
+        live = self._live
+        for key, heap in self._heaps.items():
+            heap[:] = [e for e in heap if e[2] in live and live[e[2]][0] == e[1]]
+            heapq.heapify(heap)
+        self._heaps = {key: heap for key, heap in self._heaps.items() if heap}
+        self._stale = 0
@@ -0,0 +1,176 @@
+"""Execution Analytics - Fill quality (slippage, spread, latency) per symbol and hour"""
+import os
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+
+FILL_DTYPE = np.dtype([
+    ("time", "<f8"),       # UTC epoch seconds
+    ("symbol", "S16"),
+    ("kind", "S5"),        # "open" or "close"
+    ("side", "i1"),        # +1 buy, -1 sell (the side of this order, not of the position)
+    ("volume", "<f8"),
+    ("requested", "<f8"),  # quote price at send time
+    ("fill", "<f8"),
+    ("spread", "<f8"),     # ask - bid at send time
+    ("rtt", "<f8"),        # order_send round-trip in seconds
+    ("point", "<f8"),
+])
+
+PERCENTILES = (50, 90, 99)
+
+
+class ExecutionAnalytics:
+    """
+    Fixed-capacity ring buffer of fills in a structured array
+    Aggregates are computed over whole columns: rows are sorted by group key
+    once and the percentiles of each group are taken on contiguous slices.
+    Slippage is signed in points, positive when the fill was worse than the quote
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: Optional[int] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.clock = get_clock()
+        self.path = path or self.config.state_path("execution_analytics.path", "data/execution_fills.npy")
+        self.capacity = max(1, capacity or self.config.get("execution_analytics.capacity", 20000))
+        self._fills = np.zeros(self.capacity, dtype=FILL_DTYPE)
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, symbol: str, kind: str, order_type: str, result: Dict, point: float,
+               when: Optional[float] = None) -> bool:
+        """
+        Store one fill from an order result (see XMConnector.pop_order_result)
+        order_type is the side of the order sent: "BUY" or "SELL"
+        Returns: True if recorded (results without a fill or quote are skipped)
+        """
+        if not result or not result.get("price") or not result.get("requested"):
+            return False
+        with self._lock:
+            row = self._fills[self._next]
+            row["time"] = self.clock.time() if when is None else when
+            row["symbol"] = symbol.encode()
+            row["kind"] = kind.encode()
+            row["side"] = 1 if order_type == "BUY" else -1
+            row["volume"] = result.get("volume", 0.0)
+            row["requested"] = result["requested"]
+            row["fill"] = result["price"]
+            row["spread"] = result.get("spread", 0.0)
+            row["rtt"] = result.get("rtt", 0.0)
+            row["point"] = point or 1e-5
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+        return True
+
+    def fills(self) -> np.ndarray:
+        """Copy of the stored fills, oldest first"""
+        with self._lock:
+            if self._count < self.capacity:
+                return self._fills[:self._count].copy()
+            return np.concatenate((self._fills[self._next:], self._fills[:self._next]))
+
+    def summary(self, by: str = "symbol", since: Optional[float] = None) -> List[Dict]:
+        """
+        Percentiles of slippage and spread (points) and round-trip time (ms) per group
+        by: "symbol", "hour" (UTC hour of day) or "symbol_hour"
+        Returns: one dict per group, ordered by key
+        """
+        data = self.fills()
+        if since is not None:
+            data = data[data["time"] >= since]
+        if len(data) == 0:
+            return []
+
+        slippage = data["side"] * (data["fill"] - data["requested"]) / data["point"]
+        spread = data["spread"] / data["point"]
+        rtt = data["rtt"] * 1000
+        # Crossing the spread plus slippage, as a share of the price - compare with the profit target
+        cost_pct = (data["spread"] + data["side"] * (data["fill"] - data["requested"])) / data["fill"] * 100
+
+        hours = ((data["time"] // 3600) % 24).astype(np.int64)
+        if by == "symbol":
+            keys = data["symbol"]
+        elif by == "hour":
+            keys = hours
+        elif by == "symbol_hour":
+            keys = np.char.add(np.char.add(data["symbol"], b"@"), np.char.zfill(hours.astype("S2"), 2))
+        else:
+            raise ValueError(f"Unknown grouping: {by}")
+
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        groups, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        columns = np.vstack((slippage, spread, rtt, cost_pct))[:, order]
+
+        rows = []
+        for key, start, count in zip(groups, starts, counts):
+            block = columns[:, start:start + count]
+            pct = np.percentile(block[:3], PERCENTILES, axis=1)  # shape (len(PERCENTILES), 3)
+            rows.append({
+                "key": key.decode() if isinstance(key, bytes) else int(key),
+                "fills": int(count),
+                "slippage": dict(zip(PERCENTILES, pct[:, 0].round(2).tolist())),
+                "spread": dict(zip(PERCENTILES, pct[:, 1].round(2).tolist())),
+                "rtt_ms": dict(zip(PERCENTILES, pct[:, 2].round(1).tolist())),
+                "cost_pct": round(float(block[3].mean()), 4),
+            })
+        return rows
+
+    def report(self, by: str = "symbol") -> str:
+        """Get formatted fill-quality statistics"""
+        rows = self.summary(by)
+        if not rows:
+            return "Execution quality - no fills recorded"
+        lines = [f"Execution quality by {by} ({self._count} fills):"]
+        for row in rows:
+            lines.append(
+                f"  {row['key']}: {row['fills']} fills | "
+                f"slippage p50/p90/p99 {row['slippage'][50]}/{row['slippage'][90]}/{row['slippage'][99]} pts | "
+                f"spread p50/p90 {row['spread'][50]}/{row['spread'][90]} pts | "
+                f"rtt p50/p99 {row['rtt_ms'][50]}/{row['rtt_ms'][99]}ms | "
+                f"avg cost {row['cost_pct']:.4f}%"
+            )
+        return "\n".join(lines)
+
+    def save(self) -> bool:
+        """Write the fills to disk so analysis survives restarts"""
+        try:
+            data = self.fills()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            np.save(self.path, data)
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to save execution analytics: {e}")
+            return False
+
+    def load(self) -> int:
+        """
+        Restore fills saved by a previous run (newest kept if over capacity)
+        Returns: number of fills loaded
+        """
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            data = np.load(self.path)
+            if data.dtype != FILL_DTYPE:
+                self.logger.warning(f"Ignoring {self.path}: unexpected record layout")
+                return 0
+            data = data[-self.capacity:]
+            with self._lock:
+                self._fills[:len(data)] = data
+                self._count = len(data)
+                self._next = self._count % self.capacity
+            return len(data)
+        except Exception as e:
+            self.logger.error(f"Failed to load execution analytics: {e}")
+            return 0
@@ -0,0 +1,197 @@
+"""Execution Queue - Asynchronous, idempotent order submission"""
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+
+
+@dataclass(slots=True)
+class OrderRequest:
+    """Market order handed to the execution queue"""
+    client_id: int  # also sent as the MT5 magic number
+    kind: str  # "open" or "close"
+    symbol: str
+    params: Dict
+    callback: Optional[Callable] = None
+    submitted: float = 0.0  # clock.monotonic() at submission
+
+
+@dataclass(slots=True)
+class OrderOutcome:
+    """Result of an order request, delivered on the main thread by drain()"""
+    request: OrderRequest
+    status: str  # "filled", "unconfirmed" (executed, found after a timeout) or "failed"
+    ticket: Optional[int]
+    price: float
+    retcode: Optional[object]
+    attempts: int
+    latency: float
+    result: Dict = field(default_factory=dict)  # last order result (see pop_order_result)
+
+    @property
+    def ok(self) -> bool:
+        return self.status != "failed"
+
+
+class ExecutionQueue:
+    """
+    Order submission off the scan loop
+    Requests run on a small worker pool (bounded in-flight count) and retry
+    requotes immediately. A timeout is retried only after checking, by the
+    request's unique magic number, that the first attempt did not execute.
+    Outcomes are queued back and applied on the main thread in drain(), so
+    PositionManager is never touched from a worker
+    """
+
+    def __init__(self, api_connector):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.clock = get_clock()
+        self.api = api_connector
+        self.max_in_flight = self.config.get("execution.max_in_flight", 2)
+        self.max_attempts = self.config.get("execution.max_attempts", 3)
+        self.retry_delay = self.config.get("execution.retry_delay_ms", 100) / 1000
+        self._pool = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="order")
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._completed: "queue.Queue[OrderOutcome]" = queue.Queue()
+        self._in_flight: Dict[int, OrderRequest] = {}
+        self.latencies = deque(maxlen=1000)
+        self.retcodes: Dict[str, int] = {}
+        self.submitted = 0
+        self.rejected_busy = 0
+        self.retries = 0
+        self._closed = False
+
+    def submit_open(self, symbol: str, order_type: str, volume: float, stop_loss: float,
+                    take_profit: float, comment: str = "",
+                    callback: Optional[Callable] = None) -> Optional[int]:
+        """Queue a market entry; returns the client order ID or None if the queue is full"""
+        return self._submit("open", symbol, {
+            "symbol": symbol, "order_type": order_type, "volume": volume,
+            "stop_loss": stop_loss, "take_profit": take_profit, "comment": comment
+        }, callback)
+
+    def submit_close(self, ticket: int, symbol: str,
+                     callback: Optional[Callable] = None) -> Optional[int]:
+        """Queue a full close of a position; returns the client order ID or None if the queue is full"""
+        return self._submit("close", symbol, {"ticket": ticket}, callback)
+
+    def _submit(self, kind: str, symbol: str, params: Dict, callback) -> Optional[int]:
+        if self._closed:
+            self.logger.warning(f"Execution queue shut down - {kind} {symbol} skipped")
+            return None
+        # Never block the caller: a full pipeline is reported back instead
+        if not self._slots.acquire(blocking=False):
+            self.rejected_busy += 1
+            self.logger.warning(f"Execution queue busy ({self.max_in_flight} in flight) - {kind} {symbol} skipped")
+            return None
+        request = OrderRequest(self.api.magic_allocator.next(), kind, symbol, params, callback,
+                               self.clock.monotonic())
+        self._in_flight[request.client_id] = request
+        try:
+            self._pool.submit(self._run, request)
+        except RuntimeError:
+            # Shut down between the check above and here
+            del self._in_flight[request.client_id]
+            self._slots.release()
+            return None
+        self.submitted += 1
+        return request.client_id
+
+    def has_in_flight(self, symbol: str, kind: Optional[str] = None) -> bool:
+        return any(r.symbol == symbol and (kind is None or r.kind == kind)
+                   for r in list(self._in_flight.values()))
+
+    def in_flight_count(self, kind: Optional[str] = None) -> int:
+        if kind is None:
+            return len(self._in_flight)
+        return sum(1 for r in list(self._in_flight.values()) if r.kind == kind)
+
+    def _send(self, request: OrderRequest) -> Optional[int]:
+        if request.kind == "open":
+            return self.api.open_trade(magic=request.client_id, **request.params)
+        closed = self.api.close_trade(request.params["ticket"], magic=request.client_id)
+        return request.params["ticket"] if closed else None
+
+    def _already_executed(self, request: OrderRequest) -> Optional[int]:
+        """After a timeout: did the order go through anyway?"""
+        if request.kind == "open":
+            return self.api.find_position_by_magic(request.symbol, request.client_id)
+        ticket = request.params["ticket"]
+        open_tickets = {p["ticket"] for p in self.api.get_positions()}
+        return ticket if ticket not in open_tickets else None
+
+    def _run(self, request: OrderRequest):
+        """Worker: send with retries, then post the outcome"""
+        status, ticket, result, attempts = "failed", None, None, 0
+        try:
+            while attempts < self.max_attempts:
+                attempts += 1
+                ticket = self._send(request)
+                result = self.api.pop_order_result(request.client_id) or {}
+                if ticket is not None:
+                    status = "filled"
+                    break
+                if result.get("timeout"):
+                    ticket = self._already_executed(request)
+                    if ticket is not None:
+                        status = "unconfirmed"
+                        break
+                elif not result.get("retryable"):
+                    break
+                self.retries += 1
+                self.clock.sleep(self.retry_delay)
+        except Exception as e:
+            self.logger.error(f"Order worker error ({request.kind} {request.symbol}): {e}")
+        finally:
+            latency = self.clock.monotonic() - request.submitted
+            self._completed.put(OrderOutcome(
+                request, status, ticket, (result or {}).get("price", 0.0),
+                (result or {}).get("retcode"), attempts, latency, result or {}
+            ))
+            self._slots.release()
+
+    def drain(self) -> List[OrderOutcome]:
+        """Apply finished orders on the calling (main) thread and run their callbacks"""
+        outcomes = []
+        while True:
+            try:
+                outcome = self._completed.get_nowait()
+            except queue.Empty:
+                break
+            self._in_flight.pop(outcome.request.client_id, None)
+            self.latencies.append(outcome.latency)
+            key = str(outcome.retcode)
+            self.retcodes[key] = self.retcodes.get(key, 0) + 1
+            if outcome.request.callback is not None:
+                try:
+                    outcome.request.callback(outcome)
+                except Exception as e:
+                    self.logger.error(f"Order callback error for {outcome.request.symbol}: {e}")
+            outcomes.append(outcome)
+        return outcomes
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work, wait for in-flight orders and apply their outcomes"""
+        self._closed = True
+        self._pool.shutdown(wait=wait)
+        self.drain()
+
+    def get_stats(self) -> str:
+        """Get formatted latency and retcode statistics"""
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            p50 = ordered[len(ordered) // 2] * 1000
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000
+            latency = f"p50 {p50:.0f}ms, p95 {p95:.0f}ms, max {ordered[-1] * 1000:.0f}ms"
+        else:
+            latency = "no orders yet"
+        return (
+            f"Execution - {self.submitted} submitted, {self.retries} retries, "
+            f"{self.rejected_busy} skipped (busy) | Latency: {latency} | Retcodes: {self.retcodes}"
+        )
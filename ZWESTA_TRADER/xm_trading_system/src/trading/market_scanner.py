@@ -1,7 +1,11 @@
 """Market Scanner - Monitor multiple symbols"""
 from typing import Dict, List
+from datetime import timedelta, timezone
 from src.utils.logger import get_logger
 from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+from src.data.history_store import HistoryStore
+from src.data.bar_builder import BarBuilder
 
 class MarketScanner:
     """Scan multiple markets for trading opportunities"""
@@ -9,10 +13,46 @@ class MarketScanner:
     def __init__(self, api_connector):
         self.logger = get_logger()
         self.config = get_config()
+        self.clock = get_clock()
         self.api = api_connector
         self.symbols = self.config.get_all_symbols()
+        self.timeframe = self.config.get("trading.timeframe", "5m")
         self.quotes_cache = {}
         self.ohlc_cache = {}
+        self.history = HistoryStore() if self.config.get("history.enabled", True) else None
+        
+        # Build candles locally from ticks instead of polling rates every scan
+        self.bar_builder = None
+        self._pending_reconcile = {}
+        if self.config.get("market_data.bar_source", "terminal") == "ticks":
+            self.bar_builder = BarBuilder([self.timeframe])
+            self.bar_builder.add_bar_close_listener(self._on_bar_close)
+            self.api.add_tick_listener(self.bar_builder.on_tick)
+    
+    def _on_bar_close(self, symbol: str, timeframe: str, candle: Dict):
+        """Queue a closed local bar for reconciliation with the terminal"""
+        self._pending_reconcile.setdefault(symbol, []).append(candle["time"])
+    
+    def warm_start(self):
+        """Backfill the local history store and seed the OHLC cache from it"""
+        if self.history is None:
+            return
+        
+        backfill_days = self.config.get("history.backfill_days", 7)
+        now = self.clock.utcnow().replace(tzinfo=timezone.utc)
+        for symbol in self.symbols:
+            try:
+                self.history.backfill(
+                    self.api, symbol, self.timeframe,
+                    now - timedelta(days=backfill_days), now
+                )
+                candles = self.history.get_candles(symbol, self.timeframe, 100)
+                if candles:
+                    self.ohlc_cache[symbol] = candles
+            except Exception as e:
+                self.logger.error(f"History warm start failed for {symbol}: {e}")
+        
+        self.logger.info(f"History warm start complete for {len(self.ohlc_cache)} symbols")
     
     def scan_all_markets(self) -> Dict:
         """
@@ -28,12 +68,7 @@ class MarketScanner:
                 if not quote:
                     continue
                 
-                ohlc_data = self.api.get_ohlc(
-                    symbol,
-                    timeframe=self.config.get("trading.timeframe", "5m"),
-                    bars=100
-                )
-                
+                ohlc_data = self._get_ohlc(symbol)
                 if not ohlc_data:
                     continue
                 
@@ -45,13 +80,42 @@ class MarketScanner:
                 self.quotes_cache[symbol] = quote
                 self.ohlc_cache[symbol] = ohlc_data
             
-            self.logger.debug(f"Scanned {len(results)} symbols successfully")
+            self.logger.debug("Scanned %d symbols successfully", len(results))
             return results
         
         except Exception as e:
             self.logger.error(f"Market scan error: {e}")
             return {}
     
+    def _get_ohlc(self, symbol: str) -> List[Dict]:
+        """Candles for a symbol, from the bar builder when available"""
+        if self.bar_builder is None or not self.bar_builder.is_seeded(symbol, self.timeframe):
+            ohlc_data = self.api.get_ohlc(symbol, timeframe=self.timeframe, bars=100)
+            if ohlc_data:
+                if self.bar_builder is not None:
+                    self.bar_builder.seed(symbol, self.timeframe, ohlc_data)
+                self._persist(symbol, ohlc_data[:-1])
+            return ohlc_data
+        
+        pending = self._pending_reconcile.get(symbol)
+        if pending:
+            # Only fetch official bars when a local bar has closed
+            official = self.api.get_ohlc(symbol, timeframe=self.timeframe, bars=len(pending) + 2)
+            if official:
+                closed = official[:-1]
+                self.bar_builder.reconcile(symbol, self.timeframe, closed)
+                self._persist(symbol, closed)
+                # Keep bars the terminal has not closed yet for the next scan
+                forming_time = official[-1]["time"]
+                self._pending_reconcile[symbol] = [t for t in pending if t >= forming_time]
+        
+        return self.bar_builder.get_candles(symbol, self.timeframe, 100)
+    
+    def _persist(self, symbol: str, closed_candles: List[Dict]):
+        """Append closed bars to the history store"""
+        if self.history is not None and closed_candles:
+            self.history.append_candles(symbol, self.timeframe, closed_candles)
+    
     def get_current_quotes(self) -> Dict:
         """Get latest quotes for all symbols"""
         return self.quotes_cache.copy()
@@ -0,0 +1,256 @@
+"""Order Book - Local index of working pending orders"""
+import bisect
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
+
+
+@dataclass(slots=True)
+class PendingOrder:
+    """Working limit/stop order"""
+    ticket: int
+    symbol: str
+    type: str  # "BUY_LIMIT", "SELL_LIMIT", "BUY_STOP" or "SELL_STOP"
+    volume: float
+    price: float
+    stop_loss: float
+    take_profit: float
+    expiration: Optional[datetime] = None  # local time; connectors convert to server time
+
+    @property
+    def side(self) -> str:
+        return "BUY" if self.type.startswith("BUY") else "SELL"
+
+
+class OrderIndex:
+    """
+    Pending orders by ticket, by symbol sorted on price, and by expiry
+    Price lookups use bisect on a per-symbol sorted list; expiries sit in a
+    heap with lazy deletion, so the next expiry is O(1) to peek
+    """
+
+    def __init__(self):
+        self._orders: Dict[int, PendingOrder] = {}
+        self._by_price: Dict[str, List[Tuple[float, int]]] = {}
+        self._expiry: List[Tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, ticket: int) -> bool:
+        return ticket in self._orders
+
+    def get(self, ticket: int) -> Optional[PendingOrder]:
+        return self._orders.get(ticket)
+
+    def values(self):
+        return self._orders.values()
+
+    def add(self, order: PendingOrder):
+        if order.ticket in self._orders:
+            self.remove(order.ticket)
+        self._orders[order.ticket] = order
+        bisect.insort(self._by_price.setdefault(order.symbol, []), (order.price, order.ticket))
+        if order.expiration is not None:
+            heapq.heappush(self._expiry, (order.expiration.timestamp(), order.ticket))
+
+    def remove(self, ticket: int) -> Optional[PendingOrder]:
+        order = self._orders.pop(ticket, None)
+        if order is None:
+            return None
+        levels = self._by_price[order.symbol]
+        i = bisect.bisect_left(levels, (order.price, ticket))
+        if i < len(levels) and levels[i] == (order.price, ticket):
+            del levels[i]
+        if not levels:
+            del self._by_price[order.symbol]
+        return order
+
+    def reprice(self, ticket: int, price: float):
+        """Move an order to a new price level"""
+        order = self._orders.get(ticket)
+        if order is None or order.price == price:
+            return
+        self.remove(ticket)
+        order.price = price
+        self.add(order)
+
+    def by_symbol(self, symbol: str) -> List[PendingOrder]:
+        """Orders for a symbol in ascending price order"""
+        return [self._orders[t] for _, t in self._by_price.get(symbol, [])]
+
+    def between(self, symbol: str, low: float, high: float) -> List[PendingOrder]:
+        """Orders for a symbol priced within [low, high]"""
+        levels = self._by_price.get(symbol, [])
+        lo = bisect.bisect_left(levels, (low, -1))
+        hi = bisect.bisect_right(levels, (high, float("inf")))
+        return [self._orders[t] for _, t in levels[lo:hi]]
+
+    def pop_expired(self, now: datetime) -> List[PendingOrder]:
+        """Remove and return orders whose expiration has passed"""
+        cutoff = now.timestamp()
+        expired = []
+        while self._expiry and self._expiry[0][0] <= cutoff:
+            ts, ticket = heapq.heappop(self._expiry)
+            order = self._orders.get(ticket)
+            # Skip heap entries left behind by removed or re-added orders
+            if order is not None and order.expiration is not None and order.expiration.timestamp() == ts:
+                expired.append(self.remove(ticket))
+        return expired
+
+
+class OrderManager:
+    """
+    Place, reprice, expire and track pending orders
+    Reprices are queued and coalesced so only the latest price per order is
+    sent on flush(); fills are read from the order history and handed to the
+    PositionManager
+    """
+
+    def __init__(self, api_connector, position_manager, event_log=None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.clock = get_clock()
+        self.api = api_connector
+        self.position_manager = position_manager
+        self.event_log = event_log
+        self.index = OrderIndex()
+        self.default_ttl = self.config.get("execution.pending_ttl_seconds", 300)
+        self.min_reprice_points = self.config.get("execution.min_reprice_points", 2)
+        self._replace: Dict[int, float] = {}
+        self.high_water_msc: Optional[int] = None
+        self.fills = 0
+        self.replaces_sent = 0
+        self.replaces_coalesced = 0
+
+    def place(self, symbol: str, order_type: str, volume: float, price: float,
+              stop_loss: float, take_profit: float, ttl_seconds: Optional[float] = None,
+              comment: str = "") -> Optional[int]:
+        """Place a pending order and index it; returns the order ticket"""
+        ttl = self.default_ttl if ttl_seconds is None else ttl_seconds
+        expiration = self.clock.now() + timedelta(seconds=ttl) if ttl else None
+        self._seed_high_water()  # before sending, so an immediate fill is not missed
+        ticket = self.api.place_pending_order(
+            symbol, order_type, volume, price, stop_loss, take_profit, expiration, comment
+        )
+        if ticket is None:
+            return None
+        self.index.add(PendingOrder(ticket, symbol, order_type, volume, price,
+                                    stop_loss, take_profit, expiration))
+        return ticket
+
+    def _seed_high_water(self):
+        """Start reading order history from now (server time, only known once connected)"""
+        if self.high_water_msc is None:
+            self.high_water_msc = int(self.api.server_time() * 1000)
+
+    def replace(self, ticket: int, price: float):
+        """Queue a new price for a working order (latest call wins)"""
+        if ticket not in self.index:
+            return
+        if ticket in self._replace:
+            self.replaces_coalesced += 1
+        self._replace[ticket] = price
+
+    def cancel(self, ticket: int) -> bool:
+        self._replace.pop(ticket, None)
+        if self.api.cancel_order(ticket):
+            self.index.remove(ticket)
+            return True
+        return False
+
+    def flush(self) -> int:
+        """
+        Send queued reprices, shifting SL/TP by the same distance
+        Returns: number of modify requests sent
+        """
+        sent = 0
+        for ticket, price in list(self._replace.items()):
+            del self._replace[ticket]
+            order = self.index.get(ticket)
+            if order is None:
+                continue
+            spec = self.api.symbol_specs.get(order.symbol)
+            if spec is not None:
+                price = spec.round_price(price)
+                if abs(price - order.price) < self.min_reprice_points * spec.point:
+                    continue
+            shift = price - order.price
+            stop_loss = order.stop_loss + shift if order.stop_loss else order.stop_loss
+            take_profit = order.take_profit + shift if order.take_profit else order.take_profit
+            if spec is not None:
+                stop_loss = spec.round_price(stop_loss) if stop_loss else stop_loss
+                take_profit = spec.round_price(take_profit) if take_profit else take_profit
+            if self.api.modify_order(ticket, price, stop_loss, take_profit, order.expiration):
+                self.index.reprice(ticket, price)
+                order.stop_loss = stop_loss
+                order.take_profit = take_profit
+                sent += 1
+                if self.event_log is not None:
+                    self.event_log.emit("modify", ticket, target="order", symbol=order.symbol, price=price,
+                                        stop_loss=stop_loss, take_profit=take_profit)
+        self.replaces_sent += sent
+        return sent
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Cancel orders past their local expiration (the server normally expires them first)"""
+        expired = self.index.pop_expired(now or self.clock.now())
+        if not expired:
+            return 0
+        working = {o["ticket"] for o in self.api.get_orders()}
+        for order in expired:
+            self._replace.pop(order.ticket, None)
+            if order.ticket in working:
+                self.api.cancel_order(order.ticket)
+            self.logger.debug("Pending order #%s %s expired", order.ticket, order.symbol)
+        return len(expired)
+
+    def poll_fills(self) -> int:
+        """
+        Move filled orders into the PositionManager and drop cancelled/expired ones
+        Returns: number of fills
+        """
+        filled = 0
+        try:
+            self._seed_high_water()
+            for record in self.api.get_order_history(self.high_water_msc):
+                self.high_water_msc = max(self.high_water_msc, record["time_done_msc"])
+                order = self.index.remove(record["ticket"])
+                if order is None:
+                    continue
+                self._replace.pop(order.ticket, None)
+
+                if record["state"] != "FILLED":
+                    self.logger.info(f"Pending order #{order.ticket} {order.symbol} {record['state'].lower()}")
+                    if self.event_log is not None:
+                        self.event_log.emit("order", order.ticket, kind="pending", symbol=order.symbol,
+                                            side=order.type, status=record["state"].lower())
+                    continue
+
+                self.position_manager.add_position(
+                    ticket=record["position_id"] or order.ticket,
+                    symbol=order.symbol,
+                    order_type=order.side,
+                    volume=record["volume"],
+                    entry_price=record["fill_price"] or order.price,
+                    stop_loss=record["stop_loss"],
+                    take_profit=record["take_profit"]
+                )
+                filled += 1
+                if self.event_log is not None:
+                    self.event_log.emit("fill", record["position_id"] or order.ticket, kind="pending",
+                                        symbol=order.symbol, side=order.side, order=order.ticket,
+                                        price=record["fill_price"] or order.price, volume=record["volume"],
+                                        requested=order.price)
+                self.logger.info(
+                    f"✓ PENDING ORDER FILLED #{order.ticket}: {order.type} {record['volume']} "
+                    f"{order.symbol} @ {record['fill_price'] or order.price}"
+                )
+        except Exception as e:
+            self.logger.error(f"Order fill polling error: {e}")
+        self.fills += filled
+        return filled
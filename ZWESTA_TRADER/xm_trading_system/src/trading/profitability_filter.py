@@ -1,36 +1,84 @@
 """Profitability Filter - Only trade if conditions are met"""
-from datetime import datetime, timedelta
 from src.utils.logger import get_logger
 from src.utils.config_loader import get_config
+from src.utils.clock import get_clock
 
 class ProfitabilityFilter:
-    """Filter trades based on profitability criteria"""
+    """
+    Filter trades based on profitability criteria
+    The decision only changes when a position closes or the oldest trade
+    leaves the 24h window, so it is cached until one of those happens
+    """
     
     def __init__(self, position_manager):
         self.logger = get_logger()
         self.config = get_config()
+        self.clock = get_clock()
         self.position_manager = position_manager
+        self.settings = self.config.risk_settings()
+        self.decision_listeners = []
+        self.recomputations = 0
+        self.recomputations_avoided = 0
+        self._decision = None
+        self._valid_until = None
+        self._stale = True
+        position_manager.add_close_listener(self._on_position_closed)
+        self.config.add_reload_listener(self._on_config_reload)
+    
+    def add_decision_listener(self, listener):
+        """Register callback(should_trade: bool, reason: str) invoked when the decision changes"""
+        self.decision_listeners.append(listener)
+    
+    def _on_position_closed(self, position: dict):
+        self._stale = True
+    
+    def _on_config_reload(self, snapshot):
+        # New thresholds change the decision, so re-evaluate on the next check
+        self.settings = snapshot.risk
+        self._stale = True
     
     def can_trade(self, account_balance: float) -> tuple:
         """
         Check if trading should proceed based on profitability criteria
         Returns: (should_trade: bool, reason: str)
         """
+        if not self._stale and (self._valid_until is None or self.clock.utcnow() < self._valid_until):
+            self.recomputations_avoided += 1
+            return self._decision
+        
+        self._stale = False
+        decision = self._evaluate()
+        self.recomputations += 1
+        # _evaluate() may not read the stats (demo mode, check disabled), so evict here;
+        # otherwise an expired trade keeps next_expiry() in the past and defeats the cache
+        stats_24h = self.position_manager.stats_24h
+        stats_24h.evict(self.clock.utcnow())
+        self._valid_until = stats_24h.next_expiry()
+        
+        if self._decision is None or decision[0] != self._decision[0]:
+            for listener in self.decision_listeners:
+                try:
+                    listener(*decision)
+                except Exception as e:
+                    self.logger.error(f"Decision listener error: {e}")
+        self._decision = decision
+        return decision
+    
+    def _evaluate(self) -> tuple:
+        """Recompute the decision from the 24h statistics"""
         try:
             # In demo mode, allow more trades
-            demo_mode = self.config.get("demo_mode", False)
-            
-            if demo_mode:
+            if self.settings.demo_mode:
                 self.logger.debug("Demo mode enabled - relaxed trading filters")
                 return True, "Demo mode - trading enabled"
             
             # Check 24-hour profitability (production mode)
-            if self.config.get("profitability.check_24h_profit", True):
+            if self.settings.check_24h_profit:
                 stats = self.position_manager.get_24h_stats()
                 
                 if stats["trades"] > 0:
                     # Check minimum win rate
-                    min_win_rate = self.config.get("profitability.min_win_rate", 50)
+                    min_win_rate = self.settings.min_win_rate
                     if stats["win_rate"] < min_win_rate:
                         message = (
                             f"Win rate {stats['win_rate']:.1f}% below minimum {min_win_rate}%"
@@ -39,7 +87,7 @@ class ProfitabilityFilter:
                         return False, message
                     
                     # Check consecutive losses
-                    max_consecutive = self.config.get("profitability.max_consecutive_losses", 3)
+                    max_consecutive = self.settings.max_consecutive_losses
                     consecutive_losses = self._count_consecutive_losses()
                     if consecutive_losses >= max_consecutive:
                         message = (
@@ -49,7 +97,7 @@ class ProfitabilityFilter:
                         return False, message
                     
                     # Check 24h profit requirement
-                    min_profit_pct = self.config.get("profitability.min_24h_profit_percent", 0)
+                    min_profit_pct = self.settings.min_24h_profit_percent
                     if stats["total_profit"] < 0 and min_profit_pct > 0:
                         message = (
                             f"24h profit ${stats['total_profit']:.2f} is negative "
@@ -68,18 +116,13 @@ class ProfitabilityFilter:
             return True, "Trade conditions met"
         
         except Exception as e:
+            self._stale = True  # not cached, retried on the next call
             self.logger.error(f"Error in profitability check: {e}")
             return False, f"Profitability check error: {str(e)}"
     
     def _count_consecutive_losses(self) -> int:
         """Count consecutive losses from recent trades"""
-        consecutive = 0
-        for position in reversed(self.position_manager.position_history[-10:]):
-            if position.get("profit", 0) <= 0:
-                consecutive += 1
-            else:
-                break
-        return consecutive
+        return self.position_manager.get_consecutive_losses()
     
     def get_trading_stats(self) -> str:
         """Get formatted trading statistics"""
@@ -90,5 +133,6 @@ class ProfitabilityFilter:
             f"Wins: {stats['wins']}, Losses: {stats['losses']}, "
             f"Win Rate: {stats['win_rate']:.1f}%, "
             f"Total Profit: ${stats['total_profit']:.2f}, "
-            f"Avg Profit per Trade: ${stats['avg_profit']:.2f}"
+            f"Avg Profit per Trade: ${stats['avg_profit']:.2f}, "
+            f"Filter recomputations: {self.recomputations} ({self.recomputations_avoided} avoided)"
         )
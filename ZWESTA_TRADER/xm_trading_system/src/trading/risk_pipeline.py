@@ -0,0 +1,205 @@
+"""Risk Pipeline - Pre-trade checks run in order, cheapest first"""
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from src.utils.logger import get_logger
+from src.utils.instrumentation import get_instrumentation
+from src.utils.metrics import get_metrics
+
+
+@dataclass(slots=True)
+class TradeContext:
+    """State handed from one pre-trade check to the next"""
+    symbol: str
+    order_type: str
+    quote: dict
+    ohlc_data: list
+    account_balance: float
+    entry_price: float = 0.0
+    stop_loss: float = 0.0
+    take_profit: float = 0.0
+    rr_ratio: float = 0.0
+    position_size: float = 0.0
+    volatility_metrics: Dict = field(default_factory=dict)
+
+
+class RiskCheck(ABC):
+    """Base pre-trade check; run() may fill in the context"""
+    name = "check"
+
+    def __init__(self):
+        self.logger = get_logger()
+
+    @abstractmethod
+    def run(self, ctx: TradeContext) -> Tuple[bool, str]:
+        """Returns: (passed: bool, reason: str)"""
+
+
+class PositionLimitCheck(RiskCheck):
+    name = "position_limit"
+
+    def __init__(self, position_manager, pending: Optional[Callable[[], int]] = None):
+        super().__init__()
+        self.position_manager = position_manager
+        self.pending = pending
+
+    def run(self, ctx: TradeContext) -> Tuple[bool, str]:
+        pending = self.pending() if self.pending is not None else 0
+        if not self.position_manager.can_open_position(pending):
+            self.logger.warning("Cannot open new position - limit reached")
+            return False, "Position limit reached"
+        return True, "Position limit ok"
+
+
+class ProfitabilityGate(RiskCheck):
+    name = "profitability"
+
+    def __init__(self, profitability_filter):
+        super().__init__()
+        self.profitability_filter = profitability_filter
+
+    def run(self, ctx: TradeContext) -> Tuple[bool, str]:
+        can_trade, reason = self.profitability_filter.can_trade(ctx.account_balance)
+        if not can_trade:
+            self.logger.warning(f"Trade blocked for {ctx.symbol}: {reason}")
+        return can_trade, reason
+
+
+class VolatilityGate(RiskCheck):
+    name = "volatility"
+
+    def __init__(self, volatility_analyzer):
+        super().__init__()
+        self.volatility_analyzer = volatility_analyzer
+
+    def run(self, ctx: TradeContext) -> Tuple[bool, str]:
+        ctx.volatility_metrics = self.volatility_analyzer.analyze_volatility(ctx.symbol, ctx.ohlc_data)
+        should_enter, reason = self.volatility_analyzer.should_enter_trade(ctx.volatility_metrics)
+        if not should_enter:
+            self.logger.debug("Market conditions unfavorable for %s: %s", ctx.symbol, reason)
+        return should_enter, reason
+
+
+class RewardRiskCheck(RiskCheck):
+    """Price the entry, volatility-based SL and scalping TP, then check RR"""
+    name = "reward_risk"
+
+    def __init__(self, position_manager, settings):
+        super().__init__()
+        self.position_manager = position_manager
+        self.settings = settings
+
+    def run(self, ctx: TradeContext) -> Tuple[bool, str]:
+        ctx.entry_price = ctx.quote["ask"] if ctx.order_type == "BUY" else ctx.quote["bid"]
+        ctx.stop_loss = self.position_manager.calculate_stop_loss(
+            ctx.symbol, ctx.entry_price, ctx.ohlc_data, ctx.order_type
+        )
+        ctx.take_profit = self.position_manager.calculate_take_profit(
+            ctx.symbol, ctx.entry_price, ctx.order_type
+        )
+        ctx.rr_ratio = reward_risk_ratio(ctx.entry_price, ctx.stop_loss, ctx.take_profit, ctx.order_type)
+
+        if ctx.rr_ratio < self.settings.min_rr_ratio:
+            self.logger.warning(
+                f"Poor risk/reward ratio for {ctx.symbol}: {ctx.rr_ratio:.2f} "
+                f"(entry: {ctx.entry_price}, SL: {ctx.stop_loss}, TP: {ctx.take_profit})"
+            )
+            if not self.settings.demo_mode:
+                return False, f"RR {ctx.rr_ratio:.2f} below {self.settings.min_rr_ratio}"
+            self.logger.info("Demo mode: allowing trade despite low RR ratio")
+        return True, f"RR {ctx.rr_ratio:.2f}"
+
+
+class SizingCheck(RiskCheck):
+    name = "sizing"
+
+    def __init__(self, position_manager):
+        super().__init__()
+        self.position_manager = position_manager
+
+    def run(self, ctx: TradeContext) -> Tuple[bool, str]:
+        ctx.position_size = self.position_manager.calculate_position_size(
+            ctx.symbol, ctx.account_balance, ctx.entry_price, ctx.stop_loss
+        )
+        if ctx.position_size <= 0:
+            return False, "Size below minimum lot at configured risk"
+        return True, f"Size {ctx.position_size}"
+
+
+class PortfolioRiskCheck(RiskCheck):
+    name = "portfolio_risk"
+
+    def __init__(self, portfolio_risk):
+        super().__init__()
+        self.portfolio_risk = portfolio_risk
+
+    def run(self, ctx: TradeContext) -> Tuple[bool, str]:
+        within_limits, reason = self.portfolio_risk.check_new_position(
+            ctx.symbol, ctx.order_type, ctx.position_size, ctx.account_balance
+        )
+        if not within_limits:
+            self.logger.warning(f"Trade blocked for {ctx.symbol}: {reason}")
+        return within_limits, reason
+
+
+def reward_risk_ratio(entry: float, stop_loss: float, take_profit: float, order_type: str) -> float:
+    """Calculate reward-to-risk ratio"""
+    if order_type == "BUY":
+        risk = entry - stop_loss
+        reward = take_profit - entry
+    else:  # SELL
+        risk = stop_loss - entry
+        reward = entry - take_profit
+
+    if risk == 0:
+        return 0.0
+
+    return reward / risk if reward > 0 else 0.0
+
+
+class RiskPipeline:
+    """
+    Ordered list of checks built once at startup
+    Stops at the first rejection and keeps per-stage call, reject and time counters
+    """
+
+    def __init__(self, checks: List[RiskCheck]):
+        self.logger = get_logger()
+        self.instruments = get_instrumentation()
+        self.checks = checks
+        self._timer_names = {check.name: f"risk.{check.name}" for check in checks}
+        rejects = get_metrics().counter("xm_risk_rejects_total", "Trades rejected by pre-trade risk check", ("check",))
+        self._rejects = {check.name: rejects.labels(check.name) for check in checks}
+        self.stats = {check.name: {"calls": 0, "rejects": 0, "seconds": 0.0} for check in checks}
+
+    def evaluate(self, ctx: TradeContext) -> Tuple[bool, str]:
+        """
+        Run checks until one rejects
+        Returns: (passed: bool, reason: str)
+        """
+        for check in self.checks:
+            stat = self.stats[check.name]
+            start = time.perf_counter()
+            try:
+                passed, reason = check.run(ctx)
+            except Exception as e:
+                self.logger.error(f"Risk check {check.name} error for {ctx.symbol}: {e}")
+                passed, reason = False, f"error: {e}"
+            elapsed = time.perf_counter() - start
+            stat["calls"] += 1
+            stat["seconds"] += elapsed
+            self.instruments.observe(self._timer_names[check.name], elapsed)
+            if not passed:
+                stat["rejects"] += 1
+                self._rejects[check.name].inc()
+                return False, f"{check.name}: {reason}"
+        return True, "All checks passed"
+
+    def get_stats(self) -> str:
+        """Get formatted per-stage statistics"""
+        parts = []
+        for name, stat in self.stats.items():
+            avg_us = stat["seconds"] / stat["calls"] * 1e6 if stat["calls"] else 0.0
+            parts.append(f"{name} {stat['rejects']}/{stat['calls']} rejected, {avg_us:.0f}us avg")
+        return "Risk pipeline - " + " | ".join(parts)
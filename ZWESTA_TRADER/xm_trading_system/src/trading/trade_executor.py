@@ -1,186 +1,338 @@
 """Trade Execution Engine"""
+import time
+from functools import partial
 from typing import Optional
 from datetime import datetime
 from src.utils.logger import get_logger
 from src.utils.config_loader import get_config
+from src.utils.metrics import get_metrics
+from src.trading.risk_pipeline import (
+    TradeContext, RiskPipeline, PositionLimitCheck, ProfitabilityGate, VolatilityGate,
+    RewardRiskCheck, SizingCheck, PortfolioRiskCheck
+)
 
 class TradeExecutor:
     """Execute trades and manage trade lifecycle"""
     
-    def __init__(self, api_connector, position_manager, volatility_analyzer, profitability_filter):
+    def __init__(self, api_connector, position_manager, volatility_analyzer, profitability_filter,
+                 portfolio_risk=None, order_manager=None, execution_queue=None,
+                 execution_analytics=None, event_log=None, deal_reconciler=None):
         self.logger = get_logger()
         self.config = get_config()
         self.api = api_connector
         self.position_manager = position_manager
         self.volatility_analyzer = volatility_analyzer
         self.profitability_filter = profitability_filter
+        self.portfolio_risk = portfolio_risk
+        self.order_manager = order_manager
+        self.execution_queue = execution_queue
+        self.execution_analytics = execution_analytics
+        self.event_log = event_log
+        self.deal_reconciler = deal_reconciler
+        self.entry_mode = self.config.get("execution.entry_mode", "market")
+        self.limit_offset_points = self.config.get("execution.limit_offset_points", 0)
+        metrics = get_metrics()
+        self.orders_total = metrics.counter("xm_orders_total", "Market orders by kind and outcome", ("kind", "status"))
+        self.order_latency = metrics.histogram("xm_order_latency_seconds", "Market order send-to-result time", ("kind",))
+        
+        # Cheapest checks first so most rejections cost the least
+        self.reward_risk = RewardRiskCheck(position_manager, self.config.risk_settings())
+        checks = [
+            PositionLimitCheck(position_manager, self.pending_entries),
+            ProfitabilityGate(profitability_filter),
+            VolatilityGate(volatility_analyzer),
+            self.reward_risk,
+            SizingCheck(position_manager),
+        ]
+        if portfolio_risk is not None:
+            checks.append(PortfolioRiskCheck(portfolio_risk))
+        self.pipeline = RiskPipeline(checks)
+        self.config.add_reload_listener(self._on_config_reload)
+    
+    def pending_entries(self) -> int:
+        """Entries that will become positions but are not tracked yet: queued opens and working orders"""
+        count = 0
+        if self.execution_queue is not None:
+            count += self.execution_queue.in_flight_count("open")
+        if self.order_manager is not None:
+            count += len(self.order_manager.index)
+        return count
+    
+    def _on_config_reload(self, snapshot):
+        self.reward_risk.settings = snapshot.risk
     
     def execute_trade(self, symbol: str, order_type: str, quote: dict, 
                      ohlc_data: list, account_balance: float) -> Optional[int]:
         """
         Execute a trade with full risk management
-        Returns: ticket number or None if failed
+        With an execution queue the order is sent in the background and
+        tracked when its outcome is drained
+        Returns: ticket number (client order ID when queued) or None if failed
         """
         try:
-            # 1. Check profitability conditions
-            can_trade, trade_reason = self.profitability_filter.can_trade(account_balance)
-            if not can_trade:
-                self.logger.warning(f"Trade blocked for {symbol}: {trade_reason}")
+            if self.execution_queue is not None and self.execution_queue.has_in_flight(symbol, "open"):
                 return None
             
-            # 2. Check position limits
-            if not self.position_manager.can_open_position():
-                self.logger.warning(f"Cannot open new position - limit reached")
+            ctx = TradeContext(symbol, order_type, quote, ohlc_data, account_balance)
+            passed, reason = self.pipeline.evaluate(ctx)
+            if not passed:
                 return None
-            
-            # 3. Analyze volatility
-            volatility_metrics = self.volatility_analyzer.analyze_volatility(symbol, ohlc_data)
-            should_enter, vol_reason = self.volatility_analyzer.should_enter_trade(volatility_metrics)
-            
-            if not should_enter:
-                self.logger.debug(f"Market conditions unfavorable for {symbol}: {vol_reason}")
-                return None
-            
-            # 4. Get entry price
-            entry_price = quote["ask"] if order_type == "BUY" else quote["bid"]
-            
-            # 5. Calculate stop loss (volatility-based)
-            stop_loss = self.position_manager.calculate_stop_loss(
-                symbol, entry_price, ohlc_data, order_type
-            )
-            
-            # 6. Calculate take profit (scalping target)
-            take_profit = self.position_manager.calculate_take_profit(
-                symbol, entry_price, order_type
+            self._emit(
+                "signal", symbol=symbol, side=order_type, entry_price=ctx.entry_price,
+                stop_loss=ctx.stop_loss, take_profit=ctx.take_profit, volume=ctx.position_size,
+                rr_ratio=ctx.rr_ratio, volatility=ctx.volatility_metrics.get("volatility_level")
             )
             
-            # 7. Verify profitability projection
-            projected_rr_ratio = self._calculate_reward_risk_ratio(
-                entry_price, stop_loss, take_profit, order_type
-            )
-            
-            # In demo mode, allow more flexible RR ratios
-            demo_mode = self.config.get("demo_mode", False)
-            min_rr_ratio = 0.5 if demo_mode else 1.0
+            if self.entry_mode == "limit" and self.order_manager is not None:
+                return self._place_limit_entry(ctx)
             
-            if projected_rr_ratio < min_rr_ratio:
-                self.logger.warning(
-                    f"Poor risk/reward ratio for {symbol}: {projected_rr_ratio:.2f} "
-                    f"(entry: {entry_price}, SL: {stop_loss}, TP: {take_profit})"
+            comment = f"Scalp {symbol} via volatility analyzer"
+            if self.execution_queue is not None:
+                client_id = self.execution_queue.submit_open(
+                    symbol, order_type, ctx.position_size, ctx.stop_loss, ctx.take_profit, comment,
+                    callback=partial(self._on_entry_done, ctx)
                 )
-                if not demo_mode:
-                    return None
-                else:
-                    self.logger.info(f"Demo mode: allowing trade despite low RR ratio")
+                if client_id is not None:
+                    self._emit_order("open", symbol, order_type, ctx.position_size, client_id)
+                return client_id
             
-            # 8. Calculate position size
-            position_size = self.position_manager.calculate_position_size(
-                symbol, account_balance, entry_price, stop_loss
-            )
-            
-            if position_size <= 0:
-                self.logger.error(f"Invalid position size for {symbol}: {position_size}")
-                return None
-            
-            # 9. Execute trade via API
+            # Execute trade via API
+            magic = self.api.magic_allocator.next()
+            self._emit_order("open", symbol, order_type, ctx.position_size, magic)
+            sent = time.perf_counter()
             ticket = self.api.open_trade(
                 symbol=symbol,
                 order_type=order_type,
-                volume=position_size,
-                stop_loss=stop_loss,
-                take_profit=take_profit,
-                comment=f"Scalp {symbol} via volatility analyzer"
+                volume=ctx.position_size,
+                stop_loss=ctx.stop_loss,
+                take_profit=ctx.take_profit,
+                comment=comment,
+                magic=magic
             )
+            result = self.api.pop_order_result(magic) or {}
+            self._observe_order("open", "filled" if ticket is not None else "failed", time.perf_counter() - sent)
+            self._emit_outcome("open", symbol, order_type, ticket, magic, result)
             
             if ticket is None:
                 self.logger.error(f"Failed to open trade for {symbol}")
                 return None
             
-            # 10. Track position
-            self.position_manager.add_position(
-                ticket=ticket,
-                symbol=symbol,
-                order_type=order_type,
-                volume=position_size,
-                entry_price=entry_price,
-                stop_loss=stop_loss,
-                take_profit=take_profit
-            )
-            
-            self.logger.info(
-                f"✓ TRADE EXECUTED #{ticket}: {order_type} {position_size} {symbol} "
-                f"@ {entry_price:.5f} | SL: {stop_loss:.5f} | TP: {take_profit:.5f} | "
-                f"RR: {projected_rr_ratio:.2f} | {volatility_metrics.get('volatility_level', 'N/A')}"
-            )
-            
+            self._record_fill(symbol, "open", order_type, result)
+            self._track_entry(ctx, ticket, result.get("price") or ctx.entry_price)
             return ticket
         
         except Exception as e:
             self.logger.error(f"Trade execution error for {symbol}: {e}")
             return None
     
+    def _on_entry_done(self, ctx: TradeContext, outcome):
+        """Execution queue callback for a market entry (main thread)"""
+        self._observe_order("open", outcome.status, outcome.latency)
+        self._emit_outcome("open", ctx.symbol, ctx.order_type, outcome.ticket if outcome.ok else None,
+                           outcome.request.client_id, outcome.result, outcome.price)
+        if not outcome.ok:
+            self.logger.error(
+                f"Failed to open trade for {ctx.symbol} after {outcome.attempts} attempt(s) "
+                f"- Retcode: {outcome.retcode}"
+            )
+            return
+        self._record_fill(ctx.symbol, "open", ctx.order_type, outcome.result)
+        self._track_entry(ctx, outcome.ticket, outcome.price or ctx.entry_price)
+    
+    def _observe_order(self, kind: str, status: str, latency: float):
+        self.orders_total.labels(kind, status).inc()
+        self.order_latency.labels(kind).observe(latency)
+    
+    def _emit(self, event_type: str, ticket: Optional[int] = None, **fields):
+        if self.event_log is not None:
+            self.event_log.emit(event_type, ticket, **fields)
+    
+    def _emit_order(self, kind: str, symbol: str, side: str, volume: float, client_id: int,
+                    ticket: Optional[int] = None):
+        """Event for a market order as it is sent (side is the side of the order)"""
+        self._emit("order", ticket, kind=kind, symbol=symbol, side=side, volume=volume,
+                   client_id=client_id, status="sent")
+    
+    def _emit_outcome(self, kind: str, symbol: str, side: str, ticket: Optional[int], client_id: int,
+                      result: dict, price: float = 0.0):
+        """Fill event for an executed order, or a failed order event (ticket None)"""
+        if self.event_log is None:
+            return
+        result = result or {}
+        if ticket is None:
+            self._emit("order", None, kind=kind, symbol=symbol, side=side, client_id=client_id,
+                       status="failed", retcode=result.get("retcode"))
+            return
+        self._emit("fill", ticket, kind=kind, symbol=symbol, side=side, client_id=client_id,
+                   price=result.get("price") or price, volume=result.get("volume"),
+                   requested=result.get("requested"), spread=result.get("spread"))
+    
+    def _record_fill(self, symbol: str, kind: str, order_type: str, result: dict):
+        """Feed an order result to the execution analytics (order_type is the side sent)"""
+        if self.execution_analytics is None or not result:
+            return
+        spec = self.api.symbol_specs.get(symbol)
+        self.execution_analytics.record(symbol, kind, order_type, result, spec.point if spec else 0.0)
+    
+    def _track_entry(self, ctx: TradeContext, ticket: int, entry_price: float):
+        """Track a filled entry"""
+        self.position_manager.add_position(
+            ticket=ticket,
+            symbol=ctx.symbol,
+            order_type=ctx.order_type,
+            volume=ctx.position_size,
+            entry_price=entry_price,
+            stop_loss=ctx.stop_loss,
+            take_profit=ctx.take_profit
+        )
+        if self.portfolio_risk is not None:
+            self.portfolio_risk.apply_fill(ctx.symbol, ctx.order_type, ctx.position_size)
+        
+        self.logger.info(
+            f"✓ TRADE EXECUTED #{ticket}: {ctx.order_type} {ctx.position_size} {ctx.symbol} "
+            f"@ {entry_price:.5f} | SL: {ctx.stop_loss:.5f} | TP: {ctx.take_profit:.5f} | "
+            f"RR: {ctx.rr_ratio:.2f} | {ctx.volatility_metrics.get('volatility_level', 'N/A')}"
+        )
+    
+    def _place_limit_entry(self, ctx: TradeContext) -> Optional[int]:
+        """
+        Rest a limit order at the near side of the book instead of crossing the spread
+        An order already working on the same side is repriced rather than stacked
+        Returns: pending order ticket or None if failed
+        """
+        spec = self.api.symbol_specs.get(ctx.symbol)
+        offset = self.limit_offset_points * (spec.point if spec else 0.00001)
+        if ctx.order_type == "BUY":
+            order_type, price = "BUY_LIMIT", ctx.quote["bid"] - offset
+        else:
+            order_type, price = "SELL_LIMIT", ctx.quote["ask"] + offset
+        
+        for order in self.order_manager.index.by_symbol(ctx.symbol):
+            if order.type == order_type:
+                self.order_manager.replace(order.ticket, price)
+                return order.ticket
+        
+        # Keep the SL/TP distances computed for the market entry
+        shift = price - ctx.entry_price
+        ticket = self.order_manager.place(
+            ctx.symbol, order_type, ctx.position_size, price,
+            ctx.stop_loss + shift, ctx.take_profit + shift,
+            comment=f"Scalp {ctx.symbol} limit entry"
+        )
+        if ticket is None:
+            self.logger.error(f"Failed to place limit entry for {ctx.symbol}")
+            return None
+        self._emit("order", ticket, kind="pending", symbol=ctx.symbol, side=order_type,
+                   volume=ctx.position_size, price=price, stop_loss=ctx.stop_loss + shift,
+                   take_profit=ctx.take_profit + shift, status="placed")
+        
+        self.logger.info(
+            f"✓ LIMIT ENTRY PLACED #{ticket}: {order_type} {ctx.position_size} {ctx.symbol} "
+            f"@ {price:.5f} | RR: {ctx.rr_ratio:.2f}"
+        )
+        return ticket
+    
     def check_and_close_positions(self, current_quotes: dict) -> int:
         """
         Check open positions and close if TP/SL is hit
-        Returns: number of positions closed
+        Returns: number of positions closed (queued closes are counted when drained)
         """
         closed_count = 0
         
         try:
-            positions_to_check = list(self.position_manager.open_positions.items())
+            book = self.position_manager.open_positions
+            triggers = self.position_manager.triggers
             
-            for ticket, position in positions_to_check:
-                symbol = position["symbol"]
-                
-                if symbol not in current_quotes:
+            # Only symbols with open positions need checking
+            for symbol in book.symbols():
+                quote = current_quotes.get(symbol)
+                if quote is None:
                     continue
                 
-                current_price = current_quotes[symbol]["bid"] if position["type"] == "BUY" else current_quotes[symbol]["ask"]
-                entry_price = position["entry_price"]
-                take_profit = position["take_profit"]
-                stop_loss = position["stop_loss"]
-                
-                # Calculate profit/loss
-                if position["type"] == "BUY":
-                    profit = (current_price - entry_price) * position["volume"] * 100  # Simplified
-                    is_tp_hit = current_price >= take_profit
-                    is_sl_hit = current_price <= stop_loss
-                else:  # SELL
-                    profit = (entry_price - current_price) * position["volume"] * 100
-                    is_tp_hit = current_price <= take_profit
-                    is_sl_hit = current_price >= stop_loss
-                
-                # Close position if TP or SL hit
-                if is_tp_hit or is_sl_hit:
-                    close_reason = "TAKE_PROFIT" if is_tp_hit else "STOP_LOSS"
+                # Only positions whose SL/TP level was crossed come back
+                for ticket, close_reason in triggers.check(symbol, quote["bid"], quote["ask"]):
+                    position = book.get(ticket)
+                    if position is None:
+                        continue
                     
-                    if self.api.close_trade(ticket):
-                        self.position_manager.remove_position(ticket, current_price, profit)
-                        closed_count += 1
-                        
-                        self.logger.info(
-                            f"✓ POSITION CLOSED #{ticket}: {symbol} "
-                            f"@ {current_price:.5f} | Reason: {close_reason} | "
-                            f"Profit: ${profit:.2f}"
+                    current_price = quote["bid"] if position.type == "BUY" else quote["ask"]
+                    side = "SELL" if position.type == "BUY" else "BUY"
+                    
+                    if self.execution_queue is not None:
+                        client_id = self.execution_queue.submit_close(
+                            ticket, symbol,
+                            callback=partial(self._on_close_done, position, close_reason, current_price)
                         )
+                        if client_id is None:
+                            triggers.add(ticket, symbol, position.type,
+                                         position.stop_loss, position.take_profit)
+                        else:
+                            self._emit_order("close", symbol, side, position.volume, client_id, ticket)
+                        continue
+                    
+                    magic = self.api.magic_allocator.next()
+                    self._emit_order("close", symbol, side, position.volume, magic, ticket)
+                    sent = time.perf_counter()
+                    closed = self.api.close_trade(ticket, magic=magic)
+                    result = self.api.pop_order_result(magic) or {}
+                    self._observe_order("close", "filled" if closed else "failed", time.perf_counter() - sent)
+                    self._emit_outcome("close", symbol, side, ticket if closed else None, magic, result)
+                    if closed:
+                        self._record_fill(symbol, "close", side, result)
+                        self._record_close(position, result.get("price") or current_price, close_reason)
+                        closed_count += 1
+                    else:
+                        # Re-arm so the close is retried on the next quote
+                        triggers.add(ticket, symbol, position.type,
+                                     position.stop_loss, position.take_profit)
         
         except Exception as e:
             self.logger.error(f"Error checking positions: {e}")
         
         return closed_count
     
-    @staticmethod
-    def _calculate_reward_risk_ratio(entry: float, stop_loss: float, 
-                                    take_profit: float, order_type: str) -> float:
-        """Calculate reward-to-risk ratio"""
-        if order_type == "BUY":
-            risk = entry - stop_loss
-            reward = take_profit - entry
-        else:  # SELL
-            risk = stop_loss - entry
-            reward = entry - take_profit
-        
-        if risk == 0:
-            return 0.0
+    def _on_close_done(self, position, close_reason: str, quoted_price: float, outcome):
+        """Execution queue callback for a close (main thread)"""
+        self._observe_order("close", outcome.status, outcome.latency)
+        self._emit_outcome("close", position.symbol, "SELL" if position.type == "BUY" else "BUY",
+                           position.ticket if outcome.ok else None, outcome.request.client_id,
+                           outcome.result, outcome.price)
+        if outcome.status == "filled":
+            self._record_fill(position.symbol, "close", "SELL" if position.type == "BUY" else "BUY",
+                              outcome.result)
+            if position.ticket not in self.position_manager.open_positions:
+                return  # already booked from the broker's deal
+            self._record_close(position, outcome.price or quoted_price, close_reason)
+        elif outcome.status == "unconfirmed":
+            # Closed, but without a fill price - the deal reconciler books it from the deal
+            if self.deal_reconciler is not None:
+                self.deal_reconciler.expect_close(position.ticket, close_reason)
+            self.logger.warning(f"Close of #{position.ticket} timed out but executed - awaiting deal")
+        elif position.ticket in self.position_manager.open_positions:
+            self.logger.error(f"Failed to close #{position.ticket} - Retcode: {outcome.retcode}")
+            self.position_manager.triggers.add(position.ticket, position.symbol, position.type,
+                                               position.stop_loss, position.take_profit)
+    
+    def _record_close(self, position, close_price: float, close_reason: str):
+        """
+        Remove a closed position from tracking
+        With a deal reconciler the close is booked from the closing deal (real
+        profit including commission and swap), now if the deal is already in
+        the history, otherwise on the next poll
+        """
+        if self.deal_reconciler is not None:
+            self.deal_reconciler.expect_close(position.ticket, close_reason)
+            self.deal_reconciler.poll()
+            if position.ticket in self.position_manager.open_positions:
+                self.logger.info(
+                    f"Close of #{position.ticket} filled @ {close_price:.5f} - booking when its deal arrives"
+                )
+            return
         
-        return reward / risk if reward > 0 else 0.0
+        profit = self.position_manager.estimate_profit(position, close_price)
+        self.position_manager.remove_position(position.ticket, close_price, profit, close_reason)
+        self.logger.info(
+            f"✓ POSITION CLOSED #{position.ticket}: {position.symbol} "
+            f"@ {close_price:.5f} | Reason: {close_reason} | "
+            f"Profit: ${profit:.2f}"
+        )
@@ -9,6 +9,11 @@ class VolatilityAnalyzer:
     def __init__(self):
         self.logger = get_logger()
         self.config = get_config()
+        self.settings = self.config.risk_settings()
+        self.config.add_reload_listener(self._on_config_reload)
+    
+    def _on_config_reload(self, snapshot):
+        self.settings = snapshot.risk
     
     def analyze_volatility(self, symbol: str, ohlc_data: list) -> Dict:
         """
@@ -45,8 +50,7 @@ class VolatilityAnalyzer:
         """
         try:
             # In demo mode, allow more entry opportunities
-            demo_mode = self.config.get("demo_mode", False)
-            if demo_mode:
+            if self.settings.demo_mode:
                 return True, "Demo mode - entry allowed"
             
             vol_level = volatility_metrics["volatility_level"]
@@ -61,7 +65,7 @@ class VolatilityAnalyzer:
                 return False, "Volatility too low - insufficient movement for scalping"
             
             # Check volatility threshold from config
-            threshold = self.config.get("volatility.volatility_threshold", 0.5)
+            threshold = self.settings.volatility_threshold
             if atr_pct < threshold and vol_level in ["LOW", "VERY_LOW"]:
                 return False, f"ATR% ({atr_pct:.2f}%) below threshold ({threshold}%)"
             
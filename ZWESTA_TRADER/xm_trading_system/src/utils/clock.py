@@ -0,0 +1,92 @@
+"""Clock - Injectable time source shared by all components"""
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class RealClock:
+    """System wall clock"""
+
+    def time(self) -> float:
+        """Epoch seconds"""
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def utcnow(self) -> datetime:
+        """Naive UTC datetime, like datetime.utcnow()"""
+        return datetime.utcnow()
+
+    def now(self) -> datetime:
+        """Naive local datetime, like datetime.now()"""
+        return datetime.now()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def wait(self, condition: threading.Condition, timeout) -> bool:
+        """Wait on a held condition for up to timeout seconds (None = until notified)"""
+        return condition.wait(timeout)
+
+
+class VirtualClock(RealClock):
+    """
+    Simulated time that only moves when advanced
+    sleep() and timed waits advance the clock instantly instead of blocking,
+    so a scheduler driven by this clock jumps straight to its next due job.
+    monotonic() and time() share the same virtual timeline
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def utcnow(self) -> datetime:
+        return datetime.fromtimestamp(self._now, timezone.utc).replace(tzinfo=None)
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._now)
+
+    def advance(self, seconds: float):
+        with self._lock:
+            self._now += max(0.0, seconds)
+
+    def advance_to(self, timestamp: float):
+        """Move to an absolute epoch time (never backwards)"""
+        with self._lock:
+            self._now = max(self._now, float(timestamp))
+
+    def sleep(self, seconds: float):
+        self.advance(seconds)
+
+    def wait(self, condition: threading.Condition, timeout) -> bool:
+        if timeout is None:
+            return condition.wait()
+        self.advance(timeout)
+        return False
+
+
+_clock = RealClock()
+
+
+def get_clock():
+    """Get the process-wide clock"""
+    return _clock
+
+
+def set_clock(clock):
+    """
+    Replace the process-wide clock (e.g. with a VirtualClock for simulation)
+    Components read the clock when constructed, so set it before building them
+    """
+    global _clock
+    _clock = clock
+    return clock
@@ -1,14 +1,137 @@
 """Configuration loader"""
 import yaml
 import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
 from dotenv import load_dotenv
+from src.utils.logger import get_logger
+
+
+@dataclass(frozen=True)
+class RiskSettings:
+    """Typed snapshot of the values read on every pre-trade check"""
+    demo_mode: bool
+    max_positions: int
+    position_size_percent: float
+    atr_multiplier: float
+    target_profit_percent: float
+    min_rr_ratio: float
+    volatility_threshold: float
+    check_24h_profit: bool
+    min_win_rate: float
+    max_consecutive_losses: int
+    min_24h_profit_percent: float
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One parsed and validated settings file; replaced as a whole on reload"""
+    version: int
+    data: Mapping
+    risk: RiskSettings
+    mtime: float
+
+
+def _freeze(value):
+    """Deep read-only copy: dicts become mapping proxies, lists become tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _lookup(data, key: str, default=None):
+    value = data
+    for k in key.split("."):
+        if isinstance(value, Mapping):
+            value = value.get(k)
+        else:
+            return default
+    return value if value is not None else default
+
+
+def _flatten(data, prefix: str = "") -> Dict:
+    flat = {}
+    for k, v in data.items():
+        path = f"{prefix}{k}"
+        if isinstance(v, Mapping):
+            flat.update(_flatten(v, path + "."))
+        else:
+            flat[path] = v
+    return flat
+
+
+def _build_risk_settings(data, demo_mode: bool) -> RiskSettings:
+    return RiskSettings(
+        demo_mode=demo_mode,
+        max_positions=int(_lookup(data, "trading.max_positions", 5)),
+        position_size_percent=float(_lookup(data, "trading.position_size_percent", 2)),
+        atr_multiplier=float(_lookup(data, "risk_management.stop_loss.atr_multiplier", 1.5)),
+        target_profit_percent=float(_lookup(data, "risk_management.take_profit.target_profit_percent", 1.0)),
+        min_rr_ratio=0.5 if demo_mode else 1.0,  # demo mode allows more flexible RR ratios
+        volatility_threshold=float(_lookup(data, "volatility.volatility_threshold", 0.5)),
+        check_24h_profit=bool(_lookup(data, "profitability.check_24h_profit", True)),
+        min_win_rate=float(_lookup(data, "profitability.min_win_rate", 50)),
+        max_consecutive_losses=int(_lookup(data, "profitability.max_consecutive_losses", 3)),
+        min_24h_profit_percent=float(_lookup(data, "profitability.min_24h_profit_percent", 0)),
+    )
+
+
+def validate_settings(data, risk: RiskSettings) -> List[str]:
+    """
+    Sanity checks applied before a file is accepted
+    Returns: list of problems (empty if valid)
+    """
+    errors = []
+    if not 1 <= risk.max_positions <= 100:
+        errors.append(f"trading.max_positions must be 1-100 (got {risk.max_positions})")
+    if not 0 < risk.position_size_percent <= 10:
+        errors.append(f"trading.position_size_percent must be in (0, 10] (got {risk.position_size_percent})")
+    if risk.atr_multiplier <= 0:
+        errors.append(f"risk_management.stop_loss.atr_multiplier must be positive (got {risk.atr_multiplier})")
+    if risk.target_profit_percent <= 0:
+        errors.append(
+            f"risk_management.take_profit.target_profit_percent must be positive (got {risk.target_profit_percent})"
+        )
+    if not 0 <= risk.min_win_rate <= 100:
+        errors.append(f"profitability.min_win_rate must be 0-100 (got {risk.min_win_rate})")
+    if risk.max_consecutive_losses < 1:
+        errors.append(f"profitability.max_consecutive_losses must be at least 1 (got {risk.max_consecutive_losses})")
+
+    symbols = _lookup(data, "trading.symbols")
+    if not isinstance(symbols, Mapping) or not any(symbols.values()):
+        errors.append("trading.symbols must list at least one symbol")
+    for key in ("scheduler.scan_interval", "scheduler.reconcile_interval", "scheduler.stats_interval"):
+        value = _lookup(data, key)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            errors.append(f"{key} must be a positive number (got {value!r})")
+    return errors
+
 
 class ConfigLoader:
+    """
+    Settings file parsed once into an immutable snapshot
+    reload() parses and validates a new file and swaps the snapshot in one
+    assignment, so readers see either the old or the new file, never a mix.
+    Values read in constructors apply at the next start; the risk settings
+    reach their users through reload listeners
+    """
+
     def __init__(self, config_path="config/settings.yaml", env_path=".env"):
+        self.logger = get_logger()
         load_dotenv(env_path)
-        self.config = self._load_yaml(config_path)
+        self.config_path = config_path
         self._load_env_vars()
-    
+        self.reload_listeners: List[Callable] = []
+        self._reload_lock = threading.Lock()
+        self._snapshot = self._parse(version=1)
+        errors = validate_settings(self._snapshot.data, self._snapshot.risk)
+        for error in errors:
+            self.logger.warning(f"Config: {error}")
+
     @staticmethod
     def _load_yaml(path):
         """Load YAML configuration file"""
@@ -19,7 +142,12 @@ class ConfigLoader:
             raise Exception(f"Configuration file not found: {path}")
         except yaml.YAMLError as e:
             raise Exception(f"Error parsing YAML: {e}")
-    
+
+    def _parse(self, version: int) -> ConfigSnapshot:
+        mtime = os.path.getmtime(self.config_path) if os.path.exists(self.config_path) else 0.0
+        data = _freeze(self._load_yaml(self.config_path) or {})
+        return ConfigSnapshot(version, data, _build_risk_settings(data, self.demo_mode), mtime)
+
     def _load_env_vars(self):
         """Load environment variables"""
         self.xm_login = os.getenv("XM_LOGIN")
@@ -27,39 +155,121 @@ class ConfigLoader:
         self.xm_server = os.getenv("XM_SERVER", "demo.trader.xm.com")
         self.trading_mode = os.getenv("TRADING_MODE", "paper")
         self.risk_per_trade = float(os.getenv("RISK_PER_TRADE", "2"))
-        
+
         # Load demo mode from environment
         demo_mode_str = os.getenv("DEMO_MODE", "false").lower()
         self.demo_mode = demo_mode_str in ["true", "1", "yes", "on"]
-    
+
+    @property
+    def config(self) -> Mapping:
+        """Current settings (read-only)"""
+        return self._snapshot.data
+
+    def snapshot(self) -> ConfigSnapshot:
+        return self._snapshot
+
     def get(self, key, default=None):
         """Get configuration value by key (dot notation supported)"""
         # Check for special environment-based settings first
         if key == "demo_mode":
             return self.demo_mode
-        
+
         # Then check YAML config
-        keys = key.split(".")
-        value = self.config
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-            else:
-                return default
-        return value if value is not None else default
-    
+        return _lookup(self._snapshot.data, key, default)
+
+    def risk_settings(self) -> RiskSettings:
+        """Risk-related keys of the current snapshot"""
+        return self._snapshot.risk
+
+    def add_reload_listener(self, listener: Callable):
+        """Register callback(snapshot: ConfigSnapshot) invoked after a new file is applied"""
+        self.reload_listeners.append(listener)
+
+    def check_for_changes(self) -> bool:
+        """
+        Reload if the file's modification time changed (called periodically)
+        Returns: True if a new snapshot was applied
+        """
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            return False
+        if mtime == self._snapshot.mtime:
+            return False
+        return self.reload()
+
+    def reload(self) -> bool:
+        """
+        Parse, validate and apply the settings file
+        Returns: True if applied; an invalid file is rejected and the current snapshot kept
+        """
+        with self._reload_lock:
+            old = self._snapshot
+            try:
+                new = self._parse(version=old.version + 1)
+            except Exception as e:
+                self.logger.error(f"Config reload rejected: {e}")
+                self._snapshot = ConfigSnapshot(old.version, old.data, old.risk, self._mtime_or(old.mtime))
+                return False
+
+            errors = validate_settings(new.data, new.risk)
+            if errors:
+                self.logger.error(f"Config reload rejected: {'; '.join(errors)}")
+                # Remember the bad file's mtime so it is not re-parsed until edited again
+                self._snapshot = ConfigSnapshot(old.version, old.data, old.risk, new.mtime)
+                return False
+
+            before, after = _flatten(old.data), _flatten(new.data)
+            changed = sorted(k for k in before.keys() | after.keys() if before.get(k) != after.get(k))
+            self._snapshot = new
+
+        self.logger.info(f"Config reloaded (v{new.version}): {', '.join(changed) or 'no value changes'}")
+        for listener in self.reload_listeners:
+            try:
+                listener(new)
+            except Exception as e:
+                self.logger.error(f"Config reload listener error: {e}")
+        return True
+
+    def _mtime_or(self, default: float) -> float:
+        try:
+            return os.path.getmtime(self.config_path)
+        except OSError:
+            return default
+
+    def state_path(self, key, default):
+        """
+        Path of a persistent state file or directory (journal, trade archive, fills, events)
+        Paper runs keep their state under paper.data_root so they never read or
+        rewrite the files of a live account
+        """
+        path = self.get(key, default)
+        if self.trading_mode != "paper":
+            return path
+        return os.path.join(self.get("paper.data_root", "data/paper"), os.path.basename(os.path.normpath(path)))
+
     def get_symbols(self, asset_class):
         """Get symbols for a specific asset class"""
-        return self.config.get("trading", {}).get("symbols", {}).get(asset_class, [])
-    
+        return list(self.get(f"trading.symbols.{asset_class}", ()))
+
     def get_all_symbols(self):
         """Get all trading symbols"""
         symbols = []
-        symbol_config = self.config.get("trading", {}).get("symbols", {})
+        symbol_config = self.get("trading.symbols", {})
         for asset_class, symbol_list in symbol_config.items():
             symbols.extend(symbol_list)
         return symbols
 
+
+_config: Optional[ConfigLoader] = None
+_config_lock = threading.Lock()
+
+
 def get_config():
-    """Get global config instance"""
-    return ConfigLoader()
+    """Get global config instance (parsed once per process)"""
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = ConfigLoader()
+    return _config
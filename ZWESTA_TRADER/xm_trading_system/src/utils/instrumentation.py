@@ -0,0 +1,283 @@
+"""Instrumentation - Stage timers, latency histograms, counters and a sampling profiler"""
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from src.utils.logger import get_logger
+from src.utils.config_loader import get_config
+
+# Histogram layout: values below LINEAR_MAX microseconds get one bucket each;
+# above that every power of two is split into SUB_BUCKETS buckets (~3% resolution)
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS
+LINEAR_MAX = SUB_BUCKETS * 2
+MAX_SHIFT = 30  # up to ~2^36 us (19 hours)
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of durations with fixed memory and O(1) record
+    Percentiles are exact to the bucket width (about 3% of the value)
+    """
+
+    def __init__(self):
+        self.counts = [0] * (LINEAR_MAX + MAX_SHIFT * SUB_BUCKETS)
+        self.total = 0
+        self.sum_us = 0
+        self.max_us = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(us: int) -> int:
+        if us < LINEAR_MAX:
+            return us
+        shift = min(us.bit_length() - SUB_BITS - 1, MAX_SHIFT)
+        return LINEAR_MAX + (shift - 1) * SUB_BUCKETS + min((us >> shift) - SUB_BUCKETS, SUB_BUCKETS - 1)
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """Midpoint of a bucket in microseconds"""
+        if index < LINEAR_MAX:
+            return index
+        shift = (index - LINEAR_MAX) // SUB_BUCKETS + 1
+        mantissa = (index - LINEAR_MAX) % SUB_BUCKETS + SUB_BUCKETS
+        return (mantissa << shift) + (1 << (shift - 1))
+
+    def record(self, seconds: float):
+        us = max(0, int(seconds * 1e6))
+        index = self._index(us)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum_us += us
+            if us > self.max_us:
+                self.max_us = us
+
+    def percentiles(self, ps: Tuple[float, ...] = (50, 90, 99)) -> List[float]:
+        """Values in milliseconds for each percentile"""
+        with self._lock:
+            counts, total = list(self.counts), self.total
+        if total == 0:
+            return [0.0] * len(ps)
+        targets = [max(1, int(total * p / 100 + 0.5)) for p in ps]
+        results, seen, t = [0.0] * len(ps), 0, 0
+        order = sorted(range(len(ps)), key=lambda i: targets[i])
+        for index, count in enumerate(counts):
+            if not count:
+                continue
+            seen += count
+            while t < len(order) and seen >= targets[order[t]]:
+                results[order[t]] = min(self._value(index), self.max_us) / 1000
+                t += 1
+            if t == len(order):
+                break
+        return results
+
+    def mean_ms(self) -> float:
+        return self.sum_us / self.total / 1000 if self.total else 0.0
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.total = self.sum_us = self.max_us = 0
+
+
+class _Timer:
+    """Context manager recording its elapsed time into a histogram"""
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: LatencyHistogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    """Shared no-op timer handed out while instrumentation is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a daemon thread samples one thread's stack at a
+    fixed interval and counts functions by self (leaf) and inclusive time
+    The sampled thread runs at full speed; cost is one stack walk per sample
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.main_thread().ident
+        self.samples = 0
+        self.leaf: Counter = Counter()
+        self.inclusive: Counter = Counter()
+        self._running = False
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def reset(self):
+        self.samples = 0
+        self.leaf.clear()
+        self.inclusive.clear()
+
+    def _loop(self):
+        me = threading.get_ident()
+        while self._running:
+            time.sleep(self.interval)
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self.thread_id == me:
+                continue
+            self.leaf[self._label(frame)] += 1
+            seen = set()
+            while frame is not None:
+                label = self._label(frame)
+                if label not in seen:
+                    seen.add(label)
+                    self.inclusive[label] += 1
+                frame = frame.f_back
+            self.samples += 1
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        path = code.co_filename.replace("\\", "/")
+        if "/src/" in path:
+            path = "src/" + path.split("/src/", 1)[1]
+        else:
+            path = path.rsplit("/", 1)[-1]
+        return f"{path}:{code.co_name}"
+
+    def report(self, top: int = 10) -> str:
+        if not self.samples:
+            return "Profiler - no samples"
+        lines = [f"Profiler - {self.samples} samples every {self.interval * 1000:.0f}ms (self% / total%):"]
+        for label, count in self.leaf.most_common(top):
+            lines.append(
+                f"  {count / self.samples * 100:5.1f}% / {self.inclusive[label] / self.samples * 100:5.1f}%  {label}"
+            )
+        return "\n".join(lines)
+
+
+class Instrumentation:
+    """
+    Registry of named timers and counters
+    Disabled, timer() returns a shared no-op context manager and count()
+    returns immediately, so instrumented code pays about one attribute check
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.logger = get_logger()
+        self.config = get_config()
+        self.enabled = self.config.get("instrumentation.enabled", False) if enabled is None else enabled
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.profiler = SamplingProfiler(self.config.get("instrumentation.profiler_interval_ms", 5) / 1000)
+        self._lock = threading.Lock()
+        self.since = time.time()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def timer(self, name: str):
+        """with instruments.timer("cycle.scan"): ..."""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self.histogram(name))
+
+    def observe(self, name: str, seconds: float):
+        """Record a duration measured elsewhere"""
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    def count(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_profiling(self, on: bool):
+        """Start or stop the sampling profiler"""
+        if on:
+            self.profiler.reset()
+            self.profiler.start()
+        else:
+            self.profiler.stop()
+
+    def report(self, reset: bool = False) -> str:
+        """Get formatted timers, counters and profiler output"""
+        if not self.enabled:
+            return "Instrumentation disabled"
+        elapsed = time.time() - self.since
+        lines = [f"Instrumentation - last {elapsed:.0f}s (ms: p50 / p90 / p99 / max, mean):"]
+        for name in sorted(self.histograms):
+            h = self.histograms[name]
+            if not h.total:
+                continue
+            p50, p90, p99 = h.percentiles()
+            lines.append(
+                f"  {name:<28} n={h.total:<7} {p50:8.3f} / {p90:8.3f} / {p99:8.3f} / {h.max_us / 1000:8.3f}, "
+                f"{h.mean_ms():.3f}"
+            )
+        if self.counters:
+            lines.append("  counters: " + ", ".join(f"{k}={v}" for k, v in sorted(self.counters.items())))
+        if self.profiler.running or self.profiler.samples:
+            lines.append(self.profiler.report(self.config.get("instrumentation.profiler_top", 15)))
+        if reset:
+            self.reset()
+        return "\n".join(lines)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+        with self._lock:
+            self.counters.clear()
+        self.profiler.reset()
+        self.since = time.time()
+
+
+_instrumentation: Optional[Instrumentation] = None
+
+
+def get_instrumentation() -> Instrumentation:
+    """Get the process-wide instrumentation registry"""
+    global _instrumentation
+    if _instrumentation is None:
+        _instrumentation = Instrumentation()
+        if _instrumentation.enabled and _instrumentation.config.get("instrumentation.profiler", False):
+            _instrumentation.set_profiling(True)
+    return _instrumentation
@@ -1,32 +1,104 @@
 """Logging configuration for trading system"""
+import atexit
 import logging
 import os
-from datetime import datetime
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import yaml
 
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let each call site log at most burst records per interval seconds
+    Records at or above exempt_level always pass. The next record let through
+    after a suppressed run reports how many were dropped
+    """
+
+    def __init__(self, interval: float = 60.0, burst: int = 20, exempt_level: int = logging.ERROR):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.exempt_level = exempt_level
+        self._sites = {}  # (pathname, lineno) -> [window_start, count, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        site = self._sites.get(key)
+        if site is None:
+            self._sites[key] = [now, 1, 0]
+            return True
+        if now - site[0] >= self.interval:
+            suppressed = site[2]
+            site[0], site[1], site[2] = now, 1, 0
+            if suppressed:
+                record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+            return True
+        if site[1] < self.burst:
+            site[1] += 1
+            return True
+        site[2] += 1
+        return False
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks: records are dropped (and counted) when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _QueueListener(QueueListener):
+    """QueueListener whose stop() waits for room in a full queue instead of raising"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
 class TradingLogger:
+    """
+    Configures the XM_TRADER logger once per process
+    Callers only format the message and put the record on a queue; a
+    QueueListener thread does the console and file I/O, so a slow disk
+    never stalls the trading thread
+    """
+
     def __init__(self, config_path="config/settings.yaml"):
         self.config = self._load_config(config_path)
+        self.listener = None
+        self.queue_handler = None
         self.logger = self._setup_logger()
-    
+
     @staticmethod
     def _load_config(config_path):
         try:
             with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
+                return yaml.safe_load(f) or {}
         except FileNotFoundError:
             return {"logging": {"level": "INFO", "file": "logs/trading.log"}}
-    
+
     def _setup_logger(self):
+        settings = self.config.get("logging", {})
         logger = logging.getLogger('XM_TRADER')
-        log_level = getattr(logging, self.config.get("logging", {}).get("level", "INFO"))
+        log_level = getattr(logging, settings.get("level", "INFO"))
         logger.setLevel(log_level)
-        
+        logger.propagate = False
+
         # Only add handlers if they don't already exist
         if logger.hasHandlers():
             return logger
-        
+
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setLevel(log_level)
@@ -34,12 +106,12 @@ class TradingLogger:
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
         console_handler.setFormatter(console_format)
-        logger.addHandler(console_handler)
-        
+        handlers = [console_handler]
+
         # File handler
-        log_file = self.config.get("logging", {}).get("file", "logs/trading.log")
+        log_file = settings.get("file", "logs/trading.log")
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        
+
         file_handler = RotatingFileHandler(
             log_file,
             maxBytes=10485760,  # 10MB
@@ -50,13 +122,53 @@ class TradingLogger:
             '%(asctime)s - %(name)s - %(levelname)s - [%(funcName)s:%(lineno)d] - %(message)s'
         )
         file_handler.setFormatter(file_format)
-        logger.addHandler(file_handler)
-        
+        handlers.append(file_handler)
+
+        rate_limit = settings.get("rate_limit", {})
+        if rate_limit.get("enabled", True):
+            logger.addFilter(RateLimitFilter(rate_limit.get("interval", 60), rate_limit.get("burst", 20)))
+
+        if not settings.get("async", True):
+            for handler in handlers:
+                logger.addHandler(handler)
+            return logger
+
+        self.queue_handler = _DroppingQueueHandler(queue.Queue(settings.get("queue_size", 10000)))
+        logger.addHandler(self.queue_handler)
+        self.listener = _QueueListener(self.queue_handler.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.shutdown)
         return logger
-    
+
+    def shutdown(self):
+        """Flush queued records and stop the writer thread"""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        if self.queue_handler.dropped:
+            # Written straight to the handlers: the queue is drained and this record must not be dropped too
+            record = self.logger.makeRecord(
+                self.logger.name, logging.WARNING, __file__, 0,
+                f"Logging: {self.queue_handler.dropped} records dropped because the log queue was full", None, None,
+                func="shutdown"
+            )
+            for handler in self.listener.handlers:
+                handler.handle(record)
+        self.listener = None
+
     def get_logger(self):
         return self.logger
 
+
+_trading_logger = None
+_setup_lock = threading.Lock()
+
+
 def get_logger():
-    """Get logger instance"""
-    return TradingLogger().get_logger()
+    """Get logger instance (configured on first call)"""
+    global _trading_logger
+    if _trading_logger is None:
+        with _setup_lock:
+            if _trading_logger is None:
+                _trading_logger = TradingLogger()
+    return _trading_logger.logger
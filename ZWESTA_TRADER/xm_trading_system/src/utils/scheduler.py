@@ -0,0 +1,237 @@
+"""Scheduler - Single-threaded heap scheduler for periodic and event-driven jobs"""
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from src.utils.logger import get_logger
+from src.utils.clock import get_clock
+
+
+@dataclass(slots=True)
+class Job:
+    """A scheduled callable with its timing statistics"""
+    name: str
+    func: Callable
+    interval: Optional[float]  # None for jobs that only run when notified
+    align: bool = False  # run on wall-clock multiples of the interval (bar closes)
+    offset: float = 0.0
+    due: float = 0.0  # monotonic time of the next run
+    runs: int = 0
+    overruns: int = 0  # runs that took longer than the interval
+    skipped: int = 0  # slots dropped because the job was more than one interval late
+    lateness_total: float = 0.0
+    lateness_max: float = 0.0
+    duration_last: float = 0.0
+    duration_max: float = 0.0
+    errors: int = 0
+
+    def stats(self) -> Dict:
+        return {
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "jitter_avg_ms": self.lateness_total / self.runs * 1000 if self.runs else 0.0,
+            "jitter_max_ms": self.lateness_max * 1000,
+            "duration_last_ms": self.duration_last * 1000,
+            "duration_max_ms": self.duration_max * 1000,
+        }
+
+
+class Scheduler:
+    """
+    Runs all jobs on the calling thread from one heap ordered by due time
+    Between jobs the loop blocks on a condition until the earliest due time,
+    so an idle system does not wake at all. notify() may be called from any
+    thread (e.g. a tick listener) to run an event job as soon as possible.
+    Periodic jobs keep a fixed rate: a late run does not shift later slots,
+    and slots missed entirely are skipped rather than run back to back
+    """
+
+    def __init__(self, clock=None):
+        self.logger = get_logger()
+        self.clock = clock or get_clock()
+        self.jobs: Dict[str, Job] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._notified: Dict[str, None] = {}  # ordered set of event jobs to run
+        self._cond = threading.Condition()
+        self._running = False
+        self.wakeups = 0
+
+    def every(self, name: str, interval: float, func: Callable, first_delay: float = 0.0,
+              align: bool = False, offset: float = 0.0) -> Job:
+        """
+        Run func every interval seconds
+        With align the job runs at wall-clock multiples of interval plus offset,
+        e.g. interval=300, offset=1 runs one second after every 5-minute bar close
+        """
+        if interval <= 0:
+            raise ValueError(f"Job {name}: interval must be positive")
+        job = Job(name, func, interval, align, offset)
+        job.due = self._next_aligned(job) if align else self.clock.monotonic() + first_delay
+        self._add(job)
+        return job
+
+    def on_event(self, name: str, func: Callable) -> Job:
+        """Register a job that only runs when notify(name) is called"""
+        job = Job(name, func, None)
+        self._add(job)
+        return job
+
+    def _add(self, job: Job):
+        with self._cond:
+            if job.name in self.jobs:
+                raise ValueError(f"Job {job.name} already scheduled")
+            self.jobs[job.name] = job
+            if job.interval is not None:
+                heapq.heappush(self._heap, (job.due, next(self._seq), job.name))
+            self._cond.notify()
+
+    def cancel(self, name: str):
+        """Remove a job (its heap entry is dropped lazily)"""
+        with self._cond:
+            self.jobs.pop(name, None)
+            self._notified.pop(name, None)
+
+    def _next_aligned(self, job: Job) -> float:
+        wall = self.clock.time()
+        boundary = (wall - job.offset) // job.interval * job.interval + job.interval + job.offset
+        return self.clock.monotonic() + (boundary - wall)
+
+    def notify(self, name: str):
+        """Mark an event job (or any job) to run as soon as the loop is free - thread-safe"""
+        with self._cond:
+            if name in self.jobs and name not in self._notified:
+                self._notified[name] = None
+                self._cond.notify()
+
+    def run_soon(self, name: str):
+        """Run a periodic job now instead of at its next slot (the schedule then continues from now)"""
+        with self._cond:
+            job = self.jobs.get(name)
+            if job is None or job.interval is None:
+                return
+            job.due = self.clock.monotonic()
+            heapq.heappush(self._heap, (job.due, next(self._seq), name))
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    def run(self):
+        """Run jobs until stop() is called"""
+        self._running = True
+        while self._running:
+            job, scheduled = self._next_job()
+            if job is not None:
+                self._execute(job, scheduled)
+
+    def run_pending(self) -> int:
+        """
+        Run everything that is due now without blocking (for tests and replays)
+        Returns: number of jobs run
+        """
+        ran = 0
+        while True:
+            job, scheduled = self._pop_ready()
+            if job is None:
+                return ran
+            self._execute(job, scheduled)
+            ran += 1
+
+    def run_until(self, timestamp: float) -> int:
+        """
+        Run every job due up to an epoch time on a VirtualClock, advancing the
+        clock to each job's due time so it runs exactly on schedule
+        Returns: number of jobs run
+        """
+        ran = self.run_pending()
+        while True:
+            with self._cond:
+                if not self._heap:
+                    break
+                due = self._heap[0][0] - self.clock.monotonic() + self.clock.time()
+            if due > timestamp:
+                break
+            self.clock.advance_to(due)
+            ran += self.run_pending()
+        self.clock.advance_to(timestamp)
+        return ran + self.run_pending()
+
+    def _next_job(self) -> Tuple[Optional[Job], float]:
+        """Block until a job is due (or stop() is called)"""
+        with self._cond:
+            while self._running:
+                job, scheduled = self._pop_ready()
+                if job is not None:
+                    return job, scheduled
+                timeout = self._heap[0][0] - self.clock.monotonic() if self._heap else None
+                self.clock.wait(self._cond, timeout)
+                self.wakeups += 1
+        return None, 0.0
+
+    def _pop_ready(self) -> Tuple[Optional[Job], float]:
+        with self._cond:
+            if self._notified:
+                name = next(iter(self._notified))
+                del self._notified[name]
+                job = self.jobs.get(name)
+                if job is not None:
+                    return job, self.clock.monotonic()
+            now = self.clock.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, name = heapq.heappop(self._heap)
+                job = self.jobs.get(name)
+                # Skip entries left behind by cancel() or run_soon()
+                if job is None or due != job.due:
+                    continue
+                return job, due
+        return None, 0.0
+
+    def _execute(self, job: Job, scheduled: float):
+        start = self.clock.monotonic()
+        lateness = max(0.0, start - scheduled)
+        try:
+            job.func()
+        except Exception as e:
+            job.errors += 1
+            self.logger.error(f"Scheduled job {job.name} failed: {e}")
+        duration = self.clock.monotonic() - start
+
+        job.runs += 1
+        job.lateness_total += lateness
+        job.lateness_max = max(job.lateness_max, lateness)
+        job.duration_last = duration
+        job.duration_max = max(job.duration_max, duration)
+
+        if job.interval is None or job.name not in self.jobs:
+            return
+        if duration > job.interval:
+            job.overruns += 1
+        # Next slot on the original grid; drop slots already in the past
+        due = scheduled + job.interval
+        now = self.clock.monotonic()
+        if job.align:
+            due = self._next_aligned(job)  # re-read the wall clock so bar jobs never drift
+        elif due <= now:
+            missed = int((now - due) // job.interval) + 1
+            job.skipped += missed
+            due += missed * job.interval
+        job.due = due
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), job.name))
+
+    def get_stats(self) -> str:
+        """Get formatted per-job timing statistics"""
+        parts = []
+        for name, job in self.jobs.items():
+            s = job.stats()
+            parts.append(
+                f"{name}: {s['runs']} runs, jitter avg {s['jitter_avg_ms']:.1f}ms / max {s['jitter_max_ms']:.1f}ms, "
+                f"duration max {s['duration_max_ms']:.0f}ms, {s['overruns']} overruns, {s['skipped']} skipped"
+            )
+        return f"Scheduler ({self.wakeups} wakeups) - " + " | ".join(parts)
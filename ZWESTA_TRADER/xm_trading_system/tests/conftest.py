@@ -0,0 +1,28 @@
+"""Shared test setup: run from the project root so config/settings.yaml is found"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def project_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def make_position_manager(tmp_path):
+    """Build a PositionManager whose trade archive and journal live in tmp_path"""
+    from src.risk.position_journal import PositionJournal
+    from src.risk.position_manager import PositionManager
+    from src.risk.trade_history import TradeHistory
+
+    def build(api):
+        manager = PositionManager(api)
+        manager.position_history = TradeHistory(root=str(tmp_path / "trades"))
+        manager.journal = PositionJournal(path=str(tmp_path / "positions.journal"))
+        return manager
+    return build
@@ -0,0 +1,70 @@
+"""Tests for building candles from ticks"""
+from datetime import datetime
+
+from src.data.bar_builder import BarBuilder
+from src.data.tick_recorder import Tick
+
+
+def _tick(seconds, bid):
+    return Tick(int(seconds * 1000), bid, bid + 0.0002, 0)
+
+
+def _candle(seconds, o, h, l, c, volume=10):
+    return {"time": datetime.fromtimestamp(seconds).isoformat(),
+            "open": o, "high": h, "low": l, "close": c, "volume": volume}
+
+
+def test_ticks_are_dropped_until_seeded():
+    builder = BarBuilder(["1m"])
+    builder.on_tick("EURUSD", _tick(60, 1.1))
+    assert not builder.is_seeded("EURUSD", "1m")
+    assert builder.get_candles("EURUSD", "1m") == []
+
+    builder.seed("EURUSD", "1m", [_candle(0, 1.0, 1.2, 0.9, 1.1), _candle(60, 1.1, 1.1, 1.1, 1.1, 1)])
+    assert builder.is_seeded("EURUSD", "1m")
+    builder.on_tick("EURUSD", _tick(70, 1.15))
+
+    candles = builder.get_candles("EURUSD", "1m")
+    assert [c["close"] for c in candles] == [1.1, 1.15]
+    assert candles[-1]["high"] == 1.15 and candles[-1]["volume"] == 2
+
+
+def test_bars_aggregate_and_close_on_boundary():
+    builder = BarBuilder(["1m", "5m"], require_seed=False)
+    closed = []
+    builder.add_bar_close_listener(lambda symbol, tf, candle: closed.append((tf, candle)))
+
+    for seconds, bid in [(0, 1.10), (20, 1.12), (40, 1.09), (59, 1.11), (61, 1.13)]:
+        builder.on_tick("EURUSD", _tick(seconds, bid))
+
+    assert len(closed) == 1
+    timeframe, candle = closed[0]
+    assert timeframe == "1m"
+    assert (candle["open"], candle["high"], candle["low"], candle["close"], candle["volume"]) == \
+        (1.10, 1.12, 1.09, 1.11, 4)
+    five_minute = builder.get_candles("EURUSD", "5m")
+    assert len(five_minute) == 1 and five_minute[0]["volume"] == 5
+
+
+def test_late_ticks_are_counted_not_applied():
+    builder = BarBuilder(["1m"], require_seed=False)
+    builder.on_tick("EURUSD", _tick(120, 1.1))
+    builder.on_tick("EURUSD", _tick(30, 1.5))
+
+    assert builder.late_ticks == 1
+    assert builder.get_candles("EURUSD", "1m")[-1]["high"] == 1.1
+
+
+def test_reconcile_replaces_drifted_bars():
+    builder = BarBuilder(["1m"], require_seed=False)
+    builder.drift_tolerance = 0.001
+    for seconds, bid in [(0, 1.1), (60, 1.2), (120, 1.3)]:
+        builder.on_tick("EURUSD", _tick(seconds, bid))
+
+    official = [_candle(0, 1.1, 1.1, 1.1, 1.1, 2), _candle(60, 1.2, 1.25, 1.2, 1.22, 4)]
+    assert builder.reconcile("EURUSD", "1m", official) == 1
+
+    candles = builder.get_candles("EURUSD", "1m")
+    assert candles[1]["close"] == 1.22 and candles[1]["high"] == 1.25
+    stats = builder.drift_stats[("EURUSD", "1m")]
+    assert stats["checked"] == 2 and stats["drifted"] == 1
@@ -0,0 +1,105 @@
+"""Tests for settings validation and hot reload"""
+import os
+
+import pytest
+
+from src.utils.config_loader import ConfigLoader
+
+SETTINGS = """\
+trading:
+  max_positions: {max_positions}
+  position_size_percent: 2
+  symbols:
+    forex: [EURUSD, GBPUSD]
+scheduler:
+  scan_interval: {scan_interval}
+"""
+
+
+def _write(path, mtime, max_positions=5, scan_interval=60):
+    path.write_text(SETTINGS.format(max_positions=max_positions, scan_interval=scan_interval))
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def loader(tmp_path, monkeypatch):
+    monkeypatch.delenv("DEMO_MODE", raising=False)
+    monkeypatch.delenv("TRADING_MODE", raising=False)
+    path = tmp_path / "settings.yaml"
+    _write(path, 1000)
+    config = ConfigLoader(config_path=str(path), env_path=str(tmp_path / ".env"))
+    applied = []
+    config.add_reload_listener(applied.append)
+    return config, path, applied
+
+
+def test_snapshot_is_read_only(loader):
+    config, _, _ = loader
+
+    assert config.get("trading.max_positions") == 5
+    assert config.get_symbols("forex") == ["EURUSD", "GBPUSD"]
+    assert config.risk_settings().max_positions == 5
+    with pytest.raises(TypeError):
+        config.config["trading"]["max_positions"] = 9
+
+
+def test_unchanged_file_is_not_reparsed(loader):
+    config, _, applied = loader
+
+    assert not config.check_for_changes()
+    assert config.snapshot().version == 1 and applied == []
+
+
+def test_valid_edit_applies_a_new_snapshot(loader):
+    config, path, applied = loader
+    _write(path, 2000, max_positions=8)
+
+    assert config.check_for_changes()
+    snapshot = config.snapshot()
+    assert snapshot.version == 2 and snapshot.risk.max_positions == 8
+    assert applied == [snapshot]
+    assert config.get("trading.max_positions") == 8
+
+
+@pytest.mark.parametrize("edit", [{"max_positions": 0}, {"scan_interval": -5}, {"scan_interval": "'fast'"}])
+def test_invalid_edit_keeps_the_current_snapshot(loader, edit):
+    config, path, applied = loader
+    _write(path, 2000, **edit)
+
+    assert not config.check_for_changes()
+    assert config.snapshot().version == 1 and applied == []
+    assert config.get("trading.max_positions") == 5
+    assert config.get("scheduler.scan_interval") == 60
+    assert not config.check_for_changes()  # the rejected file is not re-parsed until edited again
+
+    _write(path, 3000, max_positions=7)
+    assert config.check_for_changes()
+    assert config.snapshot().version == 2 and config.risk_settings().max_positions == 7
+
+
+def test_unparseable_file_is_rejected(loader):
+    config, path, applied = loader
+    path.write_text("trading: [unclosed\n")
+    os.utime(path, (2000, 2000))
+
+    assert not config.check_for_changes()
+    assert config.snapshot().version == 1 and applied == []
+    assert not config.check_for_changes()
+
+
+def test_failing_listener_does_not_block_the_others(loader):
+    config, path, applied = loader
+    config.reload_listeners.insert(0, lambda snapshot: 1 / 0)
+    _write(path, 2000, max_positions=6)
+
+    assert config.check_for_changes()
+    assert [s.risk.max_positions for s in applied] == [6]
+
+
+def test_paper_state_lives_under_the_data_root(loader):
+    config, _, _ = loader
+
+    assert config.trading_mode == "paper"
+    assert config.state_path("journal.path", "data/positions.json") == os.path.join("data/paper", "positions.json")
+    config.trading_mode = "live"
+    assert config.state_path("journal.path", "data/positions.json") == "data/positions.json"
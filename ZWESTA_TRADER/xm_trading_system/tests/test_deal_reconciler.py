@@ -0,0 +1,130 @@
+"""Tests for booking closes from the broker's deals"""
+import itertools
+
+import pytest
+
+from src.api.symbol_specs import SymbolSpec
+from src.risk.deal_reconciler import DealReconciler
+from src.trading.trade_executor import TradeExecutor
+from src.utils.clock import get_clock
+
+EURUSD = SymbolSpec("EURUSD", digits=5, point=0.00001, tick_size=0.00001, tick_value=1.0,
+                    contract_size=100000, volume_min=0.01, volume_max=100, volume_step=0.01)
+
+
+class _Allocator:
+    def __init__(self):
+        self._next = itertools.count(234001)
+
+    def next(self):
+        return next(self._next)
+
+    @staticmethod
+    def owns(magic):
+        return True
+
+
+class _Terminal:
+    """Connector stub with a deal history; close_trade books an OUT deal"""
+
+    def __init__(self, deal_on_close=True):
+        self.symbol_specs = {"EURUSD": EURUSD}
+        self.magic_allocator = _Allocator()
+        self.deals = []
+        self.deal_on_close = deal_on_close
+        self._deal_ticket = itertools.count(900)
+
+    def add_deal(self, position_id, volume, price, profit, commission=0.0, entry="OUT"):
+        self.deals.append({
+            "ticket": next(self._deal_ticket), "position_id": position_id, "symbol": "EURUSD",
+            "entry": entry, "volume": volume, "price": price, "profit": profit,
+            "commission": commission, "swap": 0.0, "fee": 0.0,
+            "time_msc": int(get_clock().time() * 1000) + len(self.deals),
+        })
+
+    @staticmethod
+    def server_time():
+        return get_clock().time()
+
+    def get_deals_since(self, since_msc):
+        return [d for d in self.deals if d["time_msc"] >= since_msc]
+
+    def close_trade(self, ticket, volume=0, magic=None):
+        if self.deal_on_close:
+            self.add_deal(ticket, 0.1, 1.0950, profit=-50.0, commission=-0.7)
+        return True
+
+    def pop_order_result(self, magic):
+        return {"price": 1.0950}
+
+
+@pytest.fixture
+def book(make_position_manager):
+    def build(api):
+        manager = make_position_manager(api)
+        manager.add_position(1, "EURUSD", "BUY", 0.1, 1.1000, 1.0950, 1.1100)
+        return manager, DealReconciler(api, manager)
+    return build
+
+
+def test_broker_close_is_booked_from_deal(book):
+    api = _Terminal()
+    manager, reconciler = book(api)
+    api.add_deal(1, 0.1, 1.1100, profit=100.0, commission=-0.7)
+    api.add_deal(77, 0.1, 1.2, profit=5.0)  # not ours
+
+    assert reconciler.poll() == 1
+    (trade,) = manager.position_history.query()
+    assert trade["profit"] == pytest.approx(99.3)
+    assert trade["close_reason"] == "broker"
+    assert reconciler.closed_by_broker == 1
+    assert reconciler.poll() == 0  # deals are processed once
+
+
+def test_partial_closes_accumulate_profit(book):
+    api = _Terminal()
+    manager, reconciler = book(api)
+    api.add_deal(1, 0.04, 1.1050, profit=20.0)
+    assert reconciler.poll() == 0
+    assert manager.open_positions.get(1).volume == pytest.approx(0.06)
+
+    api.add_deal(1, 0.06, 1.1100, profit=60.0)
+    assert reconciler.poll() == 1
+    assert manager.position_history.query()[0]["profit"] == pytest.approx(80.0)
+
+
+def test_bot_close_is_booked_from_deal_with_its_reason(book):
+    api = _Terminal()
+    manager, reconciler = book(api)
+    executor = TradeExecutor(api, manager, None, None, deal_reconciler=reconciler)
+
+    assert executor.check_and_close_positions({"EURUSD": {"bid": 1.0949, "ask": 1.0951}}) == 1
+
+    (trade,) = manager.position_history.query()
+    assert trade["profit"] == pytest.approx(-50.7)  # the deal's profit, not an estimate
+    assert trade["close_reason"] == "STOP_LOSS"
+    assert reconciler.closed_by_broker == 0
+
+
+def test_bot_close_waits_for_late_deal(book):
+    api = _Terminal(deal_on_close=False)
+    manager, reconciler = book(api)
+    executor = TradeExecutor(api, manager, None, None, deal_reconciler=reconciler)
+
+    executor.check_and_close_positions({"EURUSD": {"bid": 1.1101, "ask": 1.1103}})
+    assert 1 in manager.open_positions
+
+    api.add_deal(1, 0.1, 1.1101, profit=101.0)
+    assert reconciler.poll() == 1
+    assert manager.position_history.query()[0]["close_reason"] == "TAKE_PROFIT"
+
+
+def test_close_without_reconciler_uses_contract_spec(book):
+    api = _Terminal()
+    manager, _ = book(api)
+    executor = TradeExecutor(api, manager, None, None)
+
+    executor.check_and_close_positions({"EURUSD": {"bid": 1.0949, "ask": 1.0951}})
+
+    # 500 points on 0.1 lot at $1 per point per lot
+    assert manager.position_history.query()[0]["profit"] == pytest.approx(-50.0)
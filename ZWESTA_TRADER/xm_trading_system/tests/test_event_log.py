@@ -0,0 +1,117 @@
+"""Tests for the event log writer, reader and tail"""
+import os
+
+import pytest
+
+from src.data.event_log import (
+    EventLog, EventReader, EventTail, INDEX_RECORD, INDEX_SUFFIX, SEGMENT_SUFFIX,
+)
+from src.utils.clock import VirtualClock, get_clock, set_clock
+
+# 2026-10-17 23:59:58 UTC
+START = 1792281598.0
+
+
+@pytest.fixture
+def clock():
+    previous = get_clock()
+    yield set_clock(VirtualClock(START))
+    set_clock(previous)
+
+
+@pytest.fixture
+def log(tmp_path, clock):
+    event_log = EventLog(root=str(tmp_path))
+    yield event_log
+    event_log.stop()
+
+
+def _emit(log, clock, events):
+    """Emit (event_type, ticket) pairs one second apart and write them as one batch"""
+    for event_type, ticket in events:
+        log.emit(event_type, ticket=ticket, price=1.1)
+        clock.advance(1)
+    log._drain()
+
+
+def _names(root):
+    return sorted(os.listdir(root))
+
+
+def test_batch_across_midnight_is_split_by_day(tmp_path, log, clock):
+    _emit(log, clock, [("signal", 1), ("order", 1), ("fill", 1), ("close", 1)])
+
+    assert _names(tmp_path) == [
+        "20261017-0000.idx", "20261017-0000.jsonl", "20261018-0000.idx", "20261018-0000.jsonl",
+    ]
+    reader = EventReader(str(tmp_path))
+    first, second = reader.segments()
+    assert [r[0] for r in reader._index(first)] == [1792281598000, 1792281599000]
+    assert [r[0] for r in reader._index(second)] == [1792281600000, 1792281601000]
+
+
+def test_read_by_time_type_and_ticket(tmp_path, log, clock):
+    _emit(log, clock, [("signal", 1), ("order", 1), ("signal", 2), ("fill", 1), ("order", 2), ("close", 1)])
+    reader = EventReader(str(tmp_path))
+
+    assert [e["type"] for e in reader.read()] == ["signal", "order", "signal", "fill", "order", "close"]
+    in_range = list(reader.read(start_msc=1792281599000, end_msc=1792281602000))
+    assert [e["time_msc"] for e in in_range] == [1792281599000, 1792281600000, 1792281601000]
+    assert [e["ticket"] for e in reader.read(types=["order"])] == [1, 2]
+    assert [e["type"] for e in reader.for_ticket(2)] == ["signal", "order"]
+    assert [e["type"] for e in reader.last(2)] == ["order", "close"]
+
+
+def test_contiguous_and_scattered_loads_match(tmp_path, log, clock):
+    _emit(log, clock, [("signal", 1), ("order", 2), ("fill", 1), ("fill", 2)])
+    reader = EventReader(str(tmp_path))
+    base = reader.segments()[-1]
+    records = reader._index(base)
+
+    contiguous = list(reader._load(base, records))
+    scattered = list(reader._load(base, records[::2]))
+    assert [e["ticket"] for e in contiguous] == [1, 2]
+    assert [e["ticket"] for e in scattered] == [1]
+
+
+def test_truncated_last_line_is_ignored(tmp_path, log, clock):
+    clock.advance(10)  # stay within one day
+    _emit(log, clock, [("signal", 1), ("order", 1)])
+    base = EventReader(str(tmp_path)).segments()[-1]
+    with open(base + SEGMENT_SUFFIX, "ab") as f:
+        f.write(b'{"type":"fill","ticket":1,"time_')
+
+    reader = EventReader(str(tmp_path))
+    assert [e["type"] for e in reader.read()] == ["signal", "order"]
+    tail = EventTail(str(tmp_path), from_start=True)
+    assert [e["type"] for e in tail.poll()] == ["signal", "order"]
+
+
+def test_lines_missing_from_index_are_recovered(tmp_path, log, clock):
+    clock.advance(10)
+    _emit(log, clock, [("signal", 1), ("order", 1), ("fill", 1)])
+    base = EventReader(str(tmp_path)).segments()[-1]
+    # Simulate a crash between the data write and the index write
+    with open(base + INDEX_SUFFIX, "r+b") as f:
+        f.truncate(INDEX_RECORD.size + 5)
+
+    reader = EventReader(str(tmp_path))
+    assert [e["type"] for e in reader.read()] == ["signal", "order", "fill"]
+    assert [e["type"] for e in reader.read(types=["fill"])] == ["fill"]
+
+
+def test_tail_follows_rollover(tmp_path, log, clock):
+    tail = EventTail(str(tmp_path))
+    assert tail.poll() == []
+
+    log.emit("signal", ticket=1)
+    log._drain()
+    assert [e["ticket"] for e in tail.poll()] == [1]
+
+    clock.advance(5)  # past midnight: the next write opens a new day's segment
+    log.emit("order", ticket=1)
+    log.emit("fill", ticket=1)
+    log._drain()
+    assert [e["type"] for e in tail.poll()] == ["order", "fill"]
+    assert tail.poll() == []
+    assert len(EventReader(str(tmp_path)).segments()) == 2
@@ -0,0 +1,69 @@
+"""Tests for fill-quality analytics"""
+import numpy as np
+import pytest
+
+from src.trading.execution_analytics import ExecutionAnalytics
+
+HOUR = 3600.0
+DAY = 1792195200.0  # 2026-10-17 00:00 UTC
+
+
+def _result(requested, fill, spread=0.0002, rtt=0.05):
+    return {"price": fill, "requested": requested, "volume": 0.1, "spread": spread, "rtt": rtt}
+
+
+def test_slippage_is_signed_against_the_trader(tmp_path):
+    analytics = ExecutionAnalytics(path=str(tmp_path / "fills.npy"), capacity=10)
+    analytics.record("EURUSD", "open", "BUY", _result(1.10000, 1.10003), 0.00001, when=DAY)
+    analytics.record("EURUSD", "close", "SELL", _result(1.10000, 1.10001), 0.00001, when=DAY)
+
+    (row,) = analytics.summary()
+    assert row["key"] == "EURUSD" and row["fills"] == 2
+    assert row["slippage"][50] == pytest.approx(1.0)  # +3 (worse buy) and -1 (better sell)
+    assert row["spread"][90] == pytest.approx(20.0)
+    assert row["rtt_ms"][99] == pytest.approx(50.0)
+
+
+def test_results_without_a_fill_are_skipped(tmp_path):
+    analytics = ExecutionAnalytics(path=str(tmp_path / "fills.npy"), capacity=10)
+
+    assert not analytics.record("EURUSD", "open", "BUY", {}, 0.00001)
+    assert not analytics.record("EURUSD", "open", "BUY", _result(0.0, 1.1), 0.00001)
+    assert len(analytics) == 0 and analytics.summary() == []
+
+
+def test_grouping_by_hour_and_symbol_hour(tmp_path):
+    analytics = ExecutionAnalytics(path=str(tmp_path / "fills.npy"), capacity=10)
+    for when, symbol in ((DAY + 1, "GOLD"), (DAY + 9 * HOUR, "GOLD"), (DAY + 9 * HOUR + 5, "EURUSD")):
+        analytics.record(symbol, "open", "BUY", _result(1.0, 1.0), 0.01, when=when)
+
+    assert [(r["key"], r["fills"]) for r in analytics.summary("hour")] == [(0, 1), (9, 2)]
+    assert [r["key"] for r in analytics.summary("symbol_hour")] == ["EURUSD@09", "GOLD@00", "GOLD@09"]
+    assert [r["key"] for r in analytics.summary("symbol", since=DAY + HOUR)] == ["EURUSD", "GOLD"]
+    with pytest.raises(ValueError):
+        analytics.summary("weekday")
+
+
+def test_ring_buffer_keeps_the_newest_fills(tmp_path):
+    analytics = ExecutionAnalytics(path=str(tmp_path / "fills.npy"), capacity=3)
+    for i in range(5):
+        analytics.record("EURUSD", "open", "BUY", _result(1.0, 1.0 + i * 1e-5), 1e-5, when=DAY + i)
+
+    fills = analytics.fills()
+    assert len(analytics) == 3
+    assert fills["time"].tolist() == [DAY + 2, DAY + 3, DAY + 4]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "sub" / "fills.npy")
+    analytics = ExecutionAnalytics(path=path, capacity=4)
+    for i in range(6):
+        analytics.record("EURUSD", "open", "SELL", _result(1.0, 1.0), 1e-5, when=DAY + i)
+    assert analytics.save()
+
+    restored = ExecutionAnalytics(path=path, capacity=2)
+    assert restored.load() == 2
+    assert restored.fills()["time"].tolist() == [DAY + 4, DAY + 5]
+
+    np.save(path, np.zeros(3, dtype=[("time", "<f8")]))
+    assert ExecutionAnalytics(path=path).load() == 0  # foreign layout is ignored
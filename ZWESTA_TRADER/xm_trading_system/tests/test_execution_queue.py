@@ -0,0 +1,119 @@
+"""Tests for asynchronous order submission"""
+import itertools
+import threading
+
+import pytest
+
+from src.trading.execution_queue import ExecutionQueue
+from src.utils.clock import VirtualClock, get_clock, set_clock
+
+
+class _Allocator:
+    def __init__(self):
+        self._next = itertools.count(234001)
+
+    def next(self):
+        return next(self._next)
+
+
+class _Terminal:
+    """Connector stub answering each open_trade with the next scripted result"""
+
+    def __init__(self, script=(), executed=None):
+        self.magic_allocator = _Allocator()
+        self.script = list(script)
+        self.executed = executed
+        self.sent = []
+        self.results = {}
+        self.release = threading.Event()
+        self.release.set()
+
+    def open_trade(self, magic=None, **params):
+        self.release.wait(5)
+        self.sent.append(magic)
+        result = self.script.pop(0) if self.script else {"ok": True}
+        self.results[magic] = dict(result, price=1.1)
+        return 42 if result.get("ok") else None
+
+    def pop_order_result(self, magic):
+        return self.results.pop(magic, None)
+
+    def find_position_by_magic(self, symbol, magic):
+        return self.executed
+
+
+@pytest.fixture(autouse=True)
+def virtual_clock():
+    previous = get_clock()
+    set_clock(VirtualClock(1792230000.0))
+    yield
+    set_clock(previous)
+
+
+def _open(queue, callback=None):
+    return queue.submit_open("EURUSD", "BUY", 0.1, 1.09, 1.12, callback=callback)
+
+
+def test_requote_is_retried_on_the_injected_clock():
+    api = _Terminal([{"retryable": True}, {"ok": True}])
+    queue = ExecutionQueue(api)
+    outcomes = []
+
+    client_id = _open(queue, outcomes.append)
+    queue.shutdown()
+
+    (outcome,) = outcomes
+    assert outcome.status == "filled" and outcome.ticket == 42
+    assert outcome.attempts == 2 and queue.retries == 1
+    assert api.sent == [client_id, client_id]
+    assert outcome.latency == pytest.approx(queue.retry_delay)  # virtual time slept between attempts
+
+
+def test_timeout_is_not_resent_when_the_order_executed():
+    api = _Terminal([{"timeout": True}], executed=77)
+    queue = ExecutionQueue(api)
+    outcomes = []
+
+    _open(queue, outcomes.append)
+    queue.shutdown()
+
+    assert [(o.status, o.ticket) for o in outcomes] == [("unconfirmed", 77)]
+    assert len(api.sent) == 1
+    assert queue.in_flight_count() == 0
+
+
+def test_rejection_is_not_retried():
+    api = _Terminal([{"retcode": 10019}])
+    queue = ExecutionQueue(api)
+    outcomes = []
+
+    _open(queue, outcomes.append)
+    queue.shutdown()
+
+    assert outcomes[0].status == "failed" and not outcomes[0].ok
+    assert outcomes[0].attempts == 1
+
+
+def test_full_queue_rejects_without_blocking():
+    api = _Terminal()
+    api.release.clear()
+    queue = ExecutionQueue(api)
+
+    assert _open(queue) is not None and _open(queue) is not None
+    assert _open(queue) is None
+    assert queue.rejected_busy == 1 and queue.in_flight_count("open") == 2
+    assert queue.has_in_flight("EURUSD", "open")
+
+    api.release.set()
+    queue.shutdown()
+    assert queue.in_flight_count() == 0
+
+
+def test_submit_after_shutdown_keeps_every_slot():
+    queue = ExecutionQueue(_Terminal())
+    queue.shutdown()
+
+    for _ in range(3):
+        assert _open(queue) is None
+    assert all(queue._slots.acquire(blocking=False) for _ in range(queue.max_in_flight))
+    assert queue.submitted == 0
@@ -0,0 +1,93 @@
+"""Tests for the columnar bar history store"""
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.data.history_store import COLUMNS, HistoryStore
+
+
+def _rates(times, start_price=1.0):
+    n = len(times)
+    prices = start_price + np.arange(n) * 0.01
+    return {
+        "time": np.asarray(times),
+        "open": prices,
+        "high": prices + 0.005,
+        "low": prices - 0.005,
+        "close": prices + 0.002,
+        "tick_volume": np.arange(n) + 10,
+    }
+
+
+def test_append_and_read_range(tmp_path):
+    store = HistoryStore(root=str(tmp_path))
+    assert store.append_rates("EURUSD", "5m", _rates([0, 300, 600, 900])) == 4
+
+    bars = store.read_range("EURUSD", "5m", start=300, end=900)
+    assert bars["time"].tolist() == [300, 600]
+    assert bars["volume"].tolist() == [11, 12]
+    assert store.read_last("EURUSD", "5m", 2)["time"].tolist() == [600, 900]
+    assert store.last_time("EURUSD", "5m") == 900
+
+
+def test_unsorted_and_duplicate_input_stays_strictly_increasing(tmp_path):
+    store = HistoryStore(root=str(tmp_path))
+    store.append_rates("EURUSD", "5m", _rates([300, 600]))
+
+    # 900 appears twice (not adjacent), 0 and 600 are at or before the stored tail
+    written = store.append_rates("EURUSD", "5m", _rates([900, 1500, 0, 1200, 900, 600]))
+
+    times = store.read_range("EURUSD", "5m")["time"]
+    assert written == 3
+    assert times.tolist() == [300, 600, 900, 1200, 1500]
+    # The first row of a duplicated time is the one kept
+    assert store.read_range("EURUSD", "5m", start=900, end=901)["open"].tolist() == [1.0]
+
+
+def test_reopened_store_resumes_after_tail(tmp_path):
+    HistoryStore(root=str(tmp_path)).append_rates("GOLD", "1h", _rates([3600, 7200]))
+
+    store = HistoryStore(root=str(tmp_path))
+    assert store.last_time("GOLD", "1h") == 7200
+    assert store.append_rates("GOLD", "1h", _rates([3600, 7200, 10800])) == 1
+    assert store.read_range("GOLD", "1h")["time"].tolist() == [3600, 7200, 10800]
+
+
+def test_torn_write_is_repaired_to_shortest_column(tmp_path):
+    store = HistoryStore(root=str(tmp_path))
+    store.append_rates("EURUSD", "5m", _rates([0, 300, 600]))
+    close_path = os.path.join(str(tmp_path), "EURUSD", "5m", "close.bin")
+    with open(close_path, "r+b") as f:
+        f.truncate(2 * COLUMNS["close"].itemsize)
+
+    reopened = HistoryStore(root=str(tmp_path))
+    assert reopened.last_time("EURUSD", "5m") == 300
+    assert reopened.read_range("EURUSD", "5m")["time"].tolist() == [0, 300]
+    assert os.path.getsize(close_path) == 2 * COLUMNS["close"].itemsize
+
+
+def test_backfill_resumes_from_tail_in_utc(tmp_path):
+    class Api:
+        def __init__(self):
+            self.calls = []
+
+        def get_rates_range(self, symbol, timeframe, date_from, date_to):
+            self.calls.append((date_from, date_to))
+            return _rates([7200, 7500])
+
+    store = HistoryStore(root=str(tmp_path))
+    store.append_rates("EURUSD", "5m", _rates([6600, 6900]))
+    api = Api()
+    date_from = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    date_to = datetime(1970, 1, 1, 3, tzinfo=timezone.utc)
+
+    assert store.backfill(api, "EURUSD", "5m", date_from, date_to) == 2
+    assert api.calls == [(datetime(1970, 1, 1, 1, 55, 1, tzinfo=timezone.utc), date_to)]
+
+
+def test_empty_series_reads_empty(tmp_path):
+    store = HistoryStore(root=str(tmp_path))
+    assert store.last_time("EURUSD", "5m") is None
+    assert len(store.read_range("EURUSD", "5m")["time"]) == 0
+    assert store.get_candles("EURUSD", "5m") == []
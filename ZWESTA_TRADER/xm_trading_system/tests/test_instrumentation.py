@@ -0,0 +1,56 @@
+"""Tests for the latency histograms and instrumentation registry"""
+import random
+
+import numpy as np
+import pytest
+
+from src.utils.instrumentation import NULL_TIMER, Instrumentation, LatencyHistogram
+
+
+def test_bucket_midpoints_are_within_resolution():
+    for us in list(range(0, 200)) + [random.Random(1).randrange(10 ** 9) for _ in range(2000)]:
+        index = LatencyHistogram._index(us)
+        assert abs(LatencyHistogram._value(index) - us) <= max(1, us / 32)
+        assert LatencyHistogram._index(us + 1) >= index
+
+
+def test_percentiles_match_exact_values():
+    rng = np.random.default_rng(2)
+    samples = rng.lognormal(mean=-6, sigma=1.2, size=20000)  # ~2.5ms median
+    histogram = LatencyHistogram()
+    for seconds in samples:
+        histogram.record(float(seconds))
+
+    exact = np.percentile(samples * 1000, (50, 90, 99))
+    for approx, value in zip(histogram.percentiles(), exact):
+        assert approx == pytest.approx(value, rel=0.04)
+    assert histogram.mean_ms() == pytest.approx(samples.mean() * 1000, rel=0.001)
+    assert histogram.percentiles((100,))[0] == pytest.approx(samples.max() * 1000, abs=0.001)
+
+    histogram.reset()
+    assert histogram.percentiles() == [0.0, 0.0, 0.0]
+
+
+def test_disabled_registry_records_nothing():
+    instruments = Instrumentation(enabled=False)
+
+    assert instruments.timer("cycle.scan") is NULL_TIMER
+    with instruments.timer("cycle.scan"):
+        pass
+    instruments.observe("cycle.total", 0.1)
+    instruments.count("api.calls")
+    assert instruments.histograms == {} and instruments.counters == {}
+    assert instruments.report() == "Instrumentation disabled"
+
+
+def test_timers_counters_and_report():
+    instruments = Instrumentation(enabled=True)
+    with instruments.timer("cycle.scan"):
+        pass
+    instruments.observe("cycle.total", 0.004)
+    instruments.count("api.calls", 3)
+
+    assert instruments.histogram("cycle.scan").total == 1
+    report = instruments.report(reset=True)
+    assert "cycle.total" in report and "api.calls=3" in report
+    assert instruments.counters == {} and instruments.histogram("cycle.total").total == 0
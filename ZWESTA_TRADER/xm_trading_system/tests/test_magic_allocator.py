@@ -0,0 +1,35 @@
+"""Tests for per-order magic numbers"""
+from src.api.magic_allocator import MagicAllocator
+from src.utils.clock import VirtualClock, get_clock, set_clock
+
+
+def test_numbers_are_unique_and_owned():
+    allocator = MagicAllocator()
+    numbers = [allocator.next() for _ in range(1000)]
+
+    assert len(set(numbers)) == 1000
+    assert all(allocator.owns(n) for n in numbers)
+    assert all(n // 1_000_000 == 234000 for n in numbers)
+
+
+def test_previous_magic_scheme_is_owned():
+    allocator = MagicAllocator()
+
+    assert allocator.owns(234000) and allocator.owns(234999)
+    assert not allocator.owns(235000)
+    assert not allocator.owns(0)  # manual trades
+    assert not allocator.owns(123456789)  # other EAs
+
+
+def test_sequence_is_seeded_from_the_injected_clock():
+    previous = get_clock()
+    try:
+        set_clock(VirtualClock(1792230000.0))
+        first = MagicAllocator().next()
+        get_clock().advance(1)
+        later = MagicAllocator().next()
+    finally:
+        set_clock(previous)
+
+    assert first == 234000 * 1_000_000 + 17922300000 % 1_000_000
+    assert later - first == 10  # a restart a second later starts past the numbers already used
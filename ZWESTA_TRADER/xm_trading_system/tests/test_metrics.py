@@ -0,0 +1,76 @@
+"""Tests for the Prometheus metrics registry and endpoint"""
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry, MetricsServer
+
+
+def test_counter_and_gauge_exposition():
+    registry = MetricsRegistry()
+    orders = registry.counter("xm_orders_total", "Orders by outcome", ("kind", "status"))
+    orders.labels("open", "filled").inc()
+    orders.labels(kind="open", status="filled").inc(2)
+    registry.gauge("xm_balance", "Account balance").set(10250.5)
+    registry.gauge("xm_broken", "Scrape-time value").set_function(lambda: 1 / 0)
+
+    assert registry.render().splitlines() == [
+        "# HELP xm_orders_total Orders by outcome",
+        "# TYPE xm_orders_total counter",
+        'xm_orders_total{kind="open",status="filled"} 3.0',
+        "# HELP xm_balance Account balance",
+        "# TYPE xm_balance gauge",
+        "xm_balance 10250.5",
+        "# HELP xm_broken Scrape-time value",
+        "# TYPE xm_broken gauge",
+        "xm_broken NaN",
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("xm_cycle_seconds", "Cycle latency", buckets=(0.1, 0.5))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'xm_cycle_seconds_bucket{le="0.1"} 2',
+        'xm_cycle_seconds_bucket{le="0.5"} 3',
+        'xm_cycle_seconds_bucket{le="+Inf"} 4',
+        "xm_cycle_seconds_sum 2.45",
+        "xm_cycle_seconds_count 4",
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("xm_errors_total", "Errors", ("reason",)).labels('bad "quote"\n').inc()
+
+    assert 'xm_errors_total{reason="bad \\"quote\\"\\n"} 1.0' in registry.render()
+
+
+def test_same_name_returns_the_same_family():
+    registry = MetricsRegistry()
+    first = registry.counter("xm_trades_total", "Trades")
+
+    assert registry.counter("xm_trades_total", "Trades") is first
+    with pytest.raises(ValueError):
+        registry.gauge("xm_trades_total", "Trades")
+
+
+def test_server_serves_metrics_only():
+    registry = MetricsRegistry()
+    registry.gauge("xm_up", "Process up").set(1)
+    server = MetricsServer(registry, host="127.0.0.1", port=0)
+    assert server.start()
+    try:
+        base = f"http://127.0.0.1:{server.port}"
+        with urllib.request.urlopen(base + "/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert b"xm_up 1.0" in response.read()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(base + "/other", timeout=5)
+    finally:
+        server.stop()
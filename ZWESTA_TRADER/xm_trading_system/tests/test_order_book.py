@@ -0,0 +1,139 @@
+"""Tests for the pending order index and manager"""
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.api.symbol_specs import SymbolSpec
+from src.trading.order_book import OrderIndex, OrderManager, PendingOrder
+from src.utils.clock import VirtualClock, get_clock, set_clock
+
+EURUSD = SymbolSpec("EURUSD", digits=5, point=0.00001, tick_size=0.00001, tick_value=1.0,
+                    contract_size=100000, volume_min=0.01, volume_max=100, volume_step=0.01)
+START = 1792230000.0
+SERVER_OFFSET = -3 * 3600  # a broker clock behind ours
+
+
+def _order(ticket, price, symbol="EURUSD", expiration=None):
+    return PendingOrder(ticket, symbol, "BUY_LIMIT", 0.1, price, price - 0.005, price + 0.01, expiration)
+
+
+def test_index_by_price_and_range():
+    index = OrderIndex()
+    for ticket, price in ((1, 1.1010), (2, 1.0990), (3, 1.1000)):
+        index.add(_order(ticket, price))
+    index.add(_order(4, 1.2, symbol="GBPUSD"))
+
+    assert [o.ticket for o in index.by_symbol("EURUSD")] == [2, 3, 1]
+    assert [o.ticket for o in index.between("EURUSD", 1.0995, 1.1010)] == [3, 1]
+
+    index.reprice(2, 1.1020)
+    assert [o.ticket for o in index.by_symbol("EURUSD")] == [3, 1, 2]
+    assert index.remove(4).symbol == "GBPUSD" and index.by_symbol("GBPUSD") == []
+
+
+def test_index_expiry_skips_removed_and_readded_orders():
+    index = OrderIndex()
+    now = datetime(2026, 10, 18, 12, 0)
+    index.add(_order(1, 1.1, expiration=now + timedelta(seconds=10)))
+    index.add(_order(2, 1.1, expiration=now + timedelta(seconds=20)))
+    index.add(_order(3, 1.1, expiration=now + timedelta(seconds=5)))
+    index.remove(3)
+    index.add(_order(1, 1.1, expiration=now + timedelta(seconds=60)))  # extended
+
+    assert [o.ticket for o in index.pop_expired(now + timedelta(seconds=30))] == [2]
+    assert 1 in index
+    assert [o.ticket for o in index.pop_expired(now + timedelta(seconds=60))] == [1]
+    assert len(index) == 0
+
+
+class _Terminal:
+    """Connector stub whose server clock runs at an offset from ours"""
+
+    def __init__(self):
+        self.symbol_specs = {"EURUSD": EURUSD}
+        self.working = {}
+        self.history = []
+        self.modifies = []
+        self._tickets = itertools.count(500)
+
+    def server_time(self):
+        return get_clock().time() + SERVER_OFFSET
+
+    def place_pending_order(self, symbol, order_type, volume, price, stop_loss, take_profit,
+                            expiration=None, comment=""):
+        ticket = next(self._tickets)
+        self.working[ticket] = {"ticket": ticket}
+        return ticket
+
+    def modify_order(self, ticket, price, stop_loss, take_profit, expiration=None):
+        self.modifies.append((ticket, price, stop_loss, take_profit))
+        return True
+
+    def cancel_order(self, ticket):
+        return self.working.pop(ticket, None) is not None
+
+    def get_orders(self):
+        return list(self.working.values())
+
+    def get_order_history(self, since_msc):
+        return [o for o in self.history if o["time_done_msc"] >= since_msc]
+
+    def finish(self, ticket, state, fill_price=0.0):
+        self.working.pop(ticket, None)
+        self.history.append({
+            "ticket": ticket, "state": state, "volume": 0.1, "fill_price": fill_price,
+            "stop_loss": 1.095, "take_profit": 1.11, "position_id": ticket + 1000 if state == "FILLED" else 0,
+            "time_done_msc": int(self.server_time() * 1000),
+        })
+
+
+@pytest.fixture
+def orders(make_position_manager):
+    previous = get_clock()
+    set_clock(VirtualClock(START))
+    api = _Terminal()
+    manager = make_position_manager(api)
+    yield api, manager, OrderManager(api, manager)
+    set_clock(previous)
+
+
+def test_reprices_are_coalesced_and_shift_stops(orders):
+    api, _, book = orders
+    ticket = book.place("EURUSD", "BUY_LIMIT", 0.1, 1.1000, 1.0950, 1.1100)
+
+    book.replace(ticket, 1.1003)
+    book.replace(ticket, 1.1005)
+    assert book.flush() == 1
+    assert api.modifies == [(ticket, 1.1005, pytest.approx(1.0955), pytest.approx(1.1105))]
+    assert book.replaces_coalesced == 1
+
+    book.replace(ticket, 1.10051)  # under min_reprice_points
+    assert book.flush() == 0
+
+
+def test_expire_cancels_orders_past_their_ttl(orders):
+    api, _, book = orders
+    short = book.place("EURUSD", "BUY_LIMIT", 0.1, 1.1, 1.09, 1.12, ttl_seconds=30)
+    book.place("EURUSD", "BUY_LIMIT", 0.1, 1.1, 1.09, 1.12, ttl_seconds=0)  # GTC
+
+    get_clock().advance(31)
+    assert book.expire() == 1
+    assert short not in api.working and len(api.working) == 1
+
+
+def test_fills_are_read_from_server_time(orders):
+    api, manager, book = orders
+    filled = book.place("EURUSD", "BUY_LIMIT", 0.1, 1.1000, 1.0950, 1.1100)
+    cancelled = book.place("EURUSD", "SELL_LIMIT", 0.1, 1.1100, 1.1150, 1.1000)
+
+    get_clock().advance(1)
+    api.finish(filled, "FILLED", fill_price=1.0999)
+    api.finish(cancelled, "CANCELED")
+
+    # The server stamps these three hours before our clock; they must still be seen
+    assert book.poll_fills() == 1
+    position = manager.open_positions.get(filled + 1000)
+    assert position.entry_price == 1.0999 and position.volume == 0.1
+    assert len(book.index) == 0
+    assert book.poll_fills() == 0
@@ -0,0 +1,120 @@
+"""Tests for the paper trading connector"""
+import os
+from datetime import datetime
+
+import pytest
+
+from src.api.paper_connector import PaperConnector
+from src.api.symbol_specs import SymbolSpecCache
+from src.data.tick_recorder import Tick
+from src.utils.clock import VirtualClock, get_clock, set_clock
+from src.utils.config_loader import get_config
+
+EURUSD_INFO = {"symbol": "EURUSD", "digits": 5, "point": 0.00001, "tick_size": 0.00001, "tick_value": 1.0,
+               "contract_size": 100000, "volume_min": 0.01, "volume_max": 50, "volume_step": 0.01}
+START = 1792230000.0
+
+
+class _Feed:
+    """Quote feed stub: push() delivers a tick to the listeners"""
+
+    def __init__(self):
+        self.connected = True
+        self.listeners = []
+        self.symbol_specs = SymbolSpecCache(self)
+
+    def add_tick_listener(self, listener):
+        self.listeners.append(listener)
+
+    def get_symbol_info(self, symbol):
+        return EURUSD_INFO if symbol == "EURUSD" else None
+
+    def get_quote(self, symbol):
+        return None
+
+    def push(self, symbol, bid, ask):
+        tick = Tick(int(get_clock().time() * 1000), bid, ask, 0)
+        for listener in self.listeners:
+            listener(symbol, tick)
+
+
+@pytest.fixture
+def paper():
+    previous = get_clock()
+    set_clock(VirtualClock(START))
+    feed = _Feed()
+    connector = PaperConnector(feed, seed=1)
+    connector.max_slippage_points = 0
+    connector.commission_per_lot = 0.0
+    connector.balance = 10000.0
+    yield feed, connector
+    set_clock(previous)
+
+
+def test_market_round_trip_books_profit_from_spec(paper):
+    feed, connector = paper
+    feed.push("EURUSD", 1.1000, 1.1002)
+    ticket = connector.open_trade("EURUSD", "BUY", 0.5, 1.0900, 1.1200, magic=7)
+    assert connector.pop_order_result(7)["price"] == 1.1002
+
+    feed.push("EURUSD", 1.1052, 1.1054)
+    assert connector.get_account_info()["equity"] == pytest.approx(10250.0)
+    assert connector.close_trade(ticket)
+
+    out = connector.get_deals_since(0)[-1]
+    assert out["entry"] == "OUT" and out["profit"] == pytest.approx(250.0)
+    assert connector.balance == pytest.approx(10250.0)
+    assert connector.get_positions() == []
+
+
+def test_order_without_spec_is_rejected(paper):
+    feed, connector = paper
+    feed.push("XYZUSD", 1.0, 1.01)
+
+    assert connector.open_trade("XYZUSD", "BUY", 1.0, 0.9, 1.1, magic=8) is None
+    assert connector.pop_order_result(8)["ok"] is False
+    assert connector.place_pending_order("XYZUSD", "BUY_LIMIT", 1.0, 0.99, 0.9, 1.1) is None
+    assert connector.deals == []
+
+
+def test_stop_loss_is_executed_broker_side(paper):
+    feed, connector = paper
+    feed.push("EURUSD", 1.1000, 1.1002)
+    connector.open_trade("EURUSD", "SELL", 0.1, 1.1050, 1.0900)
+
+    feed.push("EURUSD", 1.1049, 1.1051)
+    (deal,) = [d for d in connector.get_deals_since(0) if d["entry"] == "OUT"]
+    assert deal["price"] == 1.1050
+    assert deal["profit"] == pytest.approx(-50.0)
+    assert deal["comment"] == "[stop_loss]"
+
+
+def test_pending_limit_fills_or_expires(paper):
+    feed, connector = paper
+    feed.push("EURUSD", 1.1000, 1.1002)
+    filled = connector.place_pending_order("EURUSD", "BUY_LIMIT", 0.1, 1.0990, 1.0950, 1.1050)
+    expiring = connector.place_pending_order(
+        "EURUSD", "SELL_LIMIT", 0.1, 1.1100, 1.1150, 1.1000,
+        expiration=datetime.fromtimestamp(START + 60)
+    )
+    assert {o["ticket"] for o in connector.get_orders()} == {filled, expiring}
+
+    feed.push("EURUSD", 1.0987, 1.0989)
+    get_clock().advance(61)
+    feed.push("EURUSD", 1.0990, 1.0992)
+
+    history = {o["ticket"]: o for o in connector.get_order_history(0)}
+    assert history[filled]["state"] == "FILLED" and history[filled]["fill_price"] == 1.0989
+    assert history[expiring]["state"] == "EXPIRED"
+    assert connector.get_orders() == []
+
+
+def test_paper_state_lives_under_its_own_root(monkeypatch):
+    config = get_config()
+    monkeypatch.setattr(config, "trading_mode", "live")
+    assert config.state_path("journal.path", "data/positions.journal") == "data/positions.journal"
+
+    monkeypatch.setattr(config, "trading_mode", "paper")
+    assert config.state_path("journal.path", "data/positions.journal") == \
+        os.path.join("data/paper", "positions.journal")
+    assert config.state_path("history.trades_path", "data/trades") == os.path.join("data/paper", "trades")
@@ -0,0 +1,116 @@
+"""Tests for the incremental portfolio VaR and exposure checks"""
+import math
+import re
+
+import numpy as np
+import pytest
+
+from src.risk.portfolio_risk import PortfolioRisk, split_symbol
+
+PRICES = {"GOLD": 2000.0, "XAUUSD": 2000.0, "EURUSD": 1.1, "GBPUSD": 1.3, "USDJPY": 150.0,
+          "USDCAD": 1.35, "BTCUSD": 60000.0, "ETHUSD": 3000.0}
+
+
+class _Terminal:
+    symbol_specs = {}
+
+
+def _market(seed=5, bars=120):
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.001, bars)
+    ohlc, quotes = {}, {}
+    for symbol, price in PRICES.items():
+        path = price * np.exp(np.cumsum(0.7 * common + rng.normal(0, 0.001, bars)))
+        ohlc[symbol] = [{"close": float(close)} for close in path]
+        quotes[symbol] = {"bid": float(path[-1]) * 0.9999, "ask": float(path[-1]) * 1.0001}
+    return ohlc, quotes
+
+
+@pytest.fixture
+def risk(make_position_manager):
+    manager = make_position_manager(_Terminal())
+    portfolio = PortfolioRisk(manager)
+    ohlc, quotes = _market()
+    return manager, portfolio, ohlc, quotes
+
+
+def _var_in(reason):
+    return float(re.search(r"VaR \$([\d.]+)", reason).group(1))
+
+
+def test_split_symbol():
+    assert split_symbol("USDJPY") == ("USD", "JPY")
+    assert split_symbol("GOLD") == ("XAU", "USD")
+    assert split_symbol("US30") == ("US30", "USD")
+
+
+def test_marginal_var_matches_a_full_recompute(risk):
+    manager, portfolio, ohlc, quotes = risk
+    manager.add_position(1, "EURUSD", "BUY", 1.0, 1.1, 1.09, 1.12)
+    manager.add_position(2, "USDJPY", "SELL", 0.5, 150.0, 151.0, 149.0)
+    portfolio.update(ohlc, quotes)
+
+    passed, reason = portfolio.check_new_position("GBPUSD", "BUY", 0.7, 1_000_000)
+    assert passed
+
+    manager.add_position(3, "GBPUSD", "BUY", 0.7, 1.3, 1.29, 1.31)
+    portfolio.update(ohlc, quotes)
+    assert _var_in(reason) == pytest.approx(portfolio.parametric_var(), abs=0.01)
+
+
+def test_apply_fill_matches_a_full_recompute(risk):
+    manager, portfolio, ohlc, quotes = risk
+    manager.add_position(1, "BTCUSD", "BUY", 0.2, 60000, 59000, 61000)
+    portfolio.update(ohlc, quotes)
+
+    fills = [("EURUSD", "SELL", 2.0), ("GOLD", "BUY", 0.3), ("EURUSD", "BUY", 0.5)]
+    for ticket, (symbol, side, volume) in enumerate(fills, start=2):
+        portfolio.apply_fill(symbol, side, volume)
+        manager.add_position(ticket, symbol, side, volume, PRICES[symbol], 0, 0)
+    incremental = portfolio.parametric_var(), portfolio.w.copy(), portfolio._cov_w.copy()
+
+    portfolio.update(ohlc, quotes)
+    assert incremental[0] == pytest.approx(portfolio.parametric_var())
+    np.testing.assert_allclose(incremental[1], portfolio.w)
+    np.testing.assert_allclose(incremental[2], portfolio._cov_w, atol=1e-9)
+
+
+def test_parametric_var_formula(risk):
+    manager, portfolio, ohlc, quotes = risk
+    manager.add_position(1, "EURUSD", "BUY", 1.0, 1.1, 1.09, 1.12)
+    portfolio.update(ohlc, quotes)
+
+    i = portfolio.index["EURUSD"]
+    sigma = math.sqrt(portfolio.cov[i, i]) * abs(portfolio.w[i])
+    assert portfolio.parametric_var() == pytest.approx(portfolio.z * sigma * portfolio.horizon)
+    assert portfolio.historical_var() > 0
+
+
+def test_currency_exposure_is_long_base_short_quote(risk):
+    manager, portfolio, ohlc, quotes = risk
+    manager.add_position(1, "EURUSD", "BUY", 1.0, 1.1, 1.09, 1.12)
+    manager.add_position(2, "USDJPY", "BUY", 1.0, 150.0, 149.0, 151.0)
+    portfolio.update(ohlc, quotes)
+
+    exposure = portfolio.currency_exposure()
+    eur = exposure["EUR"]
+    assert eur == pytest.approx(100000 * (quotes["EURUSD"]["bid"] + quotes["EURUSD"]["ask"]) / 2, rel=1e-6)
+    assert exposure["USD"] == pytest.approx(-eur + 100000, abs=1)  # USDJPY notional is USD 100k
+    assert exposure["JPY"] == pytest.approx(-100000, abs=1)
+
+
+def test_limits_reject_oversized_trades(risk):
+    manager, portfolio, ohlc, quotes = risk
+    portfolio.update(ohlc, quotes)
+
+    passed, reason = portfolio.check_new_position("BTCUSD", "BUY", 100, 10000)
+    assert not passed and "VaR" in reason
+
+    portfolio.max_var_percent = 1e9
+    passed, reason = portfolio.check_new_position("EURUSD", "BUY", 10, 10000)
+    assert not passed and reason.startswith("forex exposure")
+
+
+def test_not_ready_before_update(risk):
+    _, portfolio, _, _ = risk
+    assert portfolio.check_new_position("EURUSD", "BUY", 1, 10000) == (True, "Portfolio risk not available")
@@ -0,0 +1,69 @@
+"""Tests for the indexed position book"""
+import random
+from datetime import datetime
+
+import pytest
+
+from src.risk.position_book import Position, PositionBook
+
+SYMBOLS = ("EURUSD", "GBPUSD", "GOLD")
+
+
+def _position(ticket, symbol="EURUSD", side="BUY", volume=0.1):
+    return Position(ticket, symbol, side, volume, 1.1, 1.09, 1.12, datetime(2026, 10, 17))
+
+
+def test_indexes_follow_add_and_remove():
+    book = PositionBook()
+    book.add(_position(1, "EURUSD", "BUY", 0.3))
+    book.add(_position(2, "EURUSD", "SELL", 0.1))
+    book.add(_position(3, "GOLD", "BUY", 0.2))
+
+    assert [p.ticket for p in book.by_symbol("EURUSD")] == [1, 2]
+    assert [p.ticket for p in book.by_side("BUY")] == [1, 3]
+    assert book.count("EURUSD") == 2 and book.count() == 3
+    assert book.exposure("EURUSD") == pytest.approx(0.4)
+    assert book.net("EURUSD") == pytest.approx(0.2)
+
+    assert book.remove(1).ticket == 1 and book.remove(1) is None
+    assert book.symbols() == ["EURUSD", "GOLD"]
+    book.remove(2)
+    assert book.symbols() == ["GOLD"] and book.exposure("EURUSD") == 0.0
+
+
+def test_readding_a_ticket_replaces_it():
+    book = PositionBook()
+    book.add(_position(1, "EURUSD", "BUY", 0.3))
+    book.add(_position(1, "GOLD", "SELL", 0.1))
+
+    assert len(book) == 1 and book.by_symbol("EURUSD") == []
+    assert book.net() == pytest.approx(-0.1)
+
+
+def test_aggregates_match_a_full_recompute():
+    rng = random.Random(7)
+    book = PositionBook()
+    for _ in range(2000):
+        action = rng.random()
+        if action < 0.5 or not len(book):
+            book.add(_position(rng.randrange(200), rng.choice(SYMBOLS), rng.choice(("BUY", "SELL")),
+                               round(rng.uniform(0.01, 2), 2)))
+        elif action < 0.8:
+            book.remove(rng.choice(list(book.keys())))
+        else:
+            book.resize(rng.choice(list(book.keys())), round(rng.uniform(0.01, 2), 2))
+
+        positions = list(book.values())
+        assert book.exposure() == pytest.approx(sum(p.volume for p in positions), abs=1e-9)
+        for symbol in SYMBOLS:
+            mine = [p for p in positions if p.symbol == symbol]
+            assert book.count(symbol) == len(mine)
+            assert book.exposure(symbol) == pytest.approx(sum(p.volume for p in mine), abs=1e-9)
+            assert book.net(symbol) == pytest.approx(
+                sum(p.volume if p.type == "BUY" else -p.volume for p in mine), abs=1e-9
+            )
+
+
+def test_position_is_slotted():
+    with pytest.raises(AttributeError):
+        _position(1).extra = True
@@ -0,0 +1,143 @@
+"""Tests for the position journal and startup reconciliation"""
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from src.risk.position_book import Position
+from src.risk.position_journal import PositionJournal
+
+OPENED = datetime(2026, 10, 17, 9, 30)
+
+
+def _position(ticket, symbol="EURUSD"):
+    return Position(ticket=ticket, symbol=symbol, type="BUY", volume=0.1, entry_price=1.1,
+                    stop_loss=1.09, take_profit=1.12, open_time=OPENED, entry_equity=10000.0)
+
+
+def test_replay_folds_events(tmp_path):
+    journal = PositionJournal(path=str(tmp_path / "positions.journal"))
+    journal.record_open(_position(1))
+    journal.record_open(_position(2))
+    journal.record_modify(1, 1.095, 1.13)
+    journal.record_close(2)
+    journal.close()
+
+    positions = PositionJournal(path=journal.path).replay()
+    assert list(positions) == [1]
+    assert positions[1]["stop_loss"] == 1.095 and positions[1]["take_profit"] == 1.13
+    assert positions[1]["open_time"] == OPENED
+    assert positions[1]["entry_equity"] == 10000.0
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    journal = PositionJournal(path=str(tmp_path / "positions.journal"))
+    journal.record_open(_position(1))
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"e":"close","tick')
+
+    assert list(journal.replay()) == [1]
+
+
+def test_compact_rewrites_open_positions_only(tmp_path):
+    journal = PositionJournal(path=str(tmp_path / "positions.journal"))
+    journal.compact_every = 3
+    for ticket in (1, 2, 3):
+        journal.record_open(_position(ticket))
+    journal.record_close(1)
+    assert journal.should_compact(open_count=2)
+
+    journal.compact([_position(2), _position(3)])
+    with open(journal.path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+    assert sorted(journal.replay()) == [2, 3]
+    assert journal.events_since_compact == 0
+
+    # Appends after a compaction go to the new file
+    journal.record_close(3)
+    assert list(journal.replay()) == [2]
+
+
+class _MagicAllocator:
+    @staticmethod
+    def owns(magic: int) -> bool:
+        return magic == 234500
+
+
+class _Terminal:
+    """Connector stub exposing only what reconciliation reads"""
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.symbol_specs = {}
+        self.magic_allocator = _MagicAllocator()
+
+    def get_positions(self):
+        return self.positions
+
+
+def _live(ticket, magic, open_epoch=1792230000):
+    return {"ticket": ticket, "symbol": "EURUSD", "type": "SELL", "volume": 0.2,
+            "entry_price": 1.1, "stop_loss": 1.2, "take_profit": 1.0,
+            "open_time": datetime.fromtimestamp(open_epoch).isoformat(), "magic": magic}
+
+
+@pytest.fixture
+def manager_for(make_position_manager, monkeypatch):
+    def build(positions, journaled=(), adopt_unknown=False):
+        manager = make_position_manager(_Terminal(positions))
+        for position in journaled:
+            manager.journal.record_open(position)
+        get = manager.config.get
+        monkeypatch.setattr(manager.config, "get", lambda key, default=None: (
+            adopt_unknown if key == "journal.adopt_unknown" else get(key, default)
+        ))
+        return manager
+    return build
+
+
+@pytest.fixture
+def local_timezone():
+    """Run with a local time zone that differs from UTC"""
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = previous
+    time.tzset()
+
+
+def test_reconcile_restores_and_drops_offline_closes(manager_for):
+    manager = manager_for([_live(1, 234500)], journaled=[_position(1), _position(2)])
+
+    summary = manager.reconcile_with_terminal()
+
+    assert summary == {"restored": 1, "adopted": 0, "ignored": 0, "foreign": 0, "closed_offline": 1}
+    restored = manager.open_positions.get(1)
+    assert restored.volume == 0.2 and restored.stop_loss == 1.2  # terminal values win
+    assert restored.open_time == OPENED  # journal keeps the original UTC open time
+    assert list(manager.journal.replay()) == [1]
+
+
+def test_reconcile_adopts_only_own_magic_in_utc(manager_for, local_timezone):
+    manager = manager_for([_live(5, 234500), _live(6, 12345), _live(7, 0)], adopt_unknown=True)
+
+    summary = manager.reconcile_with_terminal()
+
+    assert summary["adopted"] == 1 and summary["foreign"] == 2
+    assert list(manager.open_positions) == [5]
+    assert manager.open_positions.get(5).open_time == datetime.utcfromtimestamp(1792230000)
+
+
+def test_reconcile_ignores_own_positions_by_default(manager_for):
+    manager = manager_for([_live(5, 234500)])
+
+    summary = manager.reconcile_with_terminal()
+
+    assert summary["ignored"] == 1
+    assert len(manager.open_positions) == 0
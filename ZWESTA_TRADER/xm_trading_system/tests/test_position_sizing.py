@@ -0,0 +1,61 @@
+"""Tests for risk-based position sizing and contract specs"""
+import pytest
+
+from src.api.symbol_specs import SymbolSpec, SymbolSpecCache
+
+EURUSD_INFO = {"symbol": "EURUSD", "digits": 5, "point": 0.00001, "tick_size": 0.00001, "tick_value": 1.0,
+               "contract_size": 100000, "volume_min": 0.01, "volume_max": 50, "volume_step": 0.01}
+
+
+class _Terminal:
+    def __init__(self, infos=()):
+        self.infos = {info["symbol"]: info for info in infos}
+        self.lookups = 0
+        self.symbol_specs = SymbolSpecCache(self)
+
+    def get_symbol_info(self, symbol):
+        self.lookups += 1
+        return self.infos.get(symbol)
+
+
+def test_spec_rounding():
+    spec = SymbolSpec.from_info(dict(EURUSD_INFO, volume_step=0.1, volume_min=0.1))
+
+    assert spec.money_per_price_unit() == pytest.approx(100000)
+    assert spec.round_volume(0.37) == 0.3
+    assert spec.round_volume(0.05) == 0.1
+    assert spec.round_volume(80) == 50
+    assert spec.round_price(1.123456) == 1.12346
+
+
+def test_spec_cache_retries_failed_lookups():
+    api = _Terminal()
+    assert api.symbol_specs.get("EURUSD") is None
+    api.infos["EURUSD"] = EURUSD_INFO
+    assert api.symbol_specs.get("EURUSD").volume_max == 50
+    api.symbol_specs.get("EURUSD")
+    assert api.lookups == 2
+
+
+def test_size_from_spec(make_position_manager):
+    manager = make_position_manager(_Terminal([EURUSD_INFO]))
+
+    # 2% of 10,000 = $200 at risk; 200 points at $1/point/lot -> 1.0 lot
+    assert manager.calculate_position_size("EURUSD", 10000, 1.1000, 1.0980) == 1.0
+
+
+def test_size_below_minimum_lot_is_skipped(make_position_manager):
+    manager = make_position_manager(_Terminal([EURUSD_INFO]))
+
+    # $2 at risk over 500 points would need 0.004 lots - never rounded up to 0.01
+    assert manager.calculate_position_size("EURUSD", 100, 1.1000, 1.0950) == 0
+
+
+def test_size_without_spec_uses_configured_contract_size(make_position_manager):
+    manager = make_position_manager(_Terminal())
+
+    # forex contract 100,000: $200 over 0.0020 -> 1.0 lot (not clamped to 10 lots)
+    assert manager.calculate_position_size("EURUSD", 10000, 1.1000, 1.0980) == 1.0
+    # USD-based pair: the loss is converted out of the quote currency
+    assert manager.calculate_position_size("USDJPY", 10000, 150.0, 149.7) == 1.0
+    assert manager.calculate_position_size("EURUSD", 10000, 1.1, 1.1) == 0
@@ -0,0 +1,83 @@
+"""Tests for the cached profitability decision"""
+import dataclasses
+
+import pytest
+
+from src.trading.profitability_filter import ProfitabilityFilter
+from src.utils.clock import VirtualClock, get_clock, set_clock
+from src.utils.config_loader import get_config
+
+
+class _Terminal:
+    symbol_specs = {}
+
+
+@pytest.fixture
+def gate(make_position_manager, monkeypatch):
+    previous = get_clock()
+    set_clock(VirtualClock(1792230000.0))
+    monkeypatch.setattr(get_config(), "reload_listeners", [])
+    manager = make_position_manager(_Terminal())
+    profitability = ProfitabilityFilter(manager)
+    profitability.settings = dataclasses.replace(
+        profitability.settings, demo_mode=False, check_24h_profit=True, min_win_rate=50,
+        max_consecutive_losses=3, min_24h_profit_percent=0.0
+    )
+    decisions = []
+    profitability.add_decision_listener(lambda ok, reason: decisions.append(ok))
+    yield manager, profitability, decisions
+    set_clock(previous)
+
+
+def _close(manager, ticket, profit):
+    manager.add_position(ticket, "EURUSD", "BUY", 0.1, 1.1, 1.09, 1.12)
+    manager.remove_position(ticket, 1.1, profit, "test")
+
+
+def test_decision_is_cached_until_a_close(gate):
+    manager, profitability, decisions = gate
+
+    assert profitability.can_trade(10000)[0]
+    assert profitability.can_trade(10000)[0]
+    assert (profitability.recomputations, profitability.recomputations_avoided) == (1, 1)
+
+    _close(manager, 1, -20.0)
+    allowed, reason = profitability.can_trade(10000)
+    assert not allowed and reason.startswith("Win rate 0.0%")
+    assert profitability.recomputations == 2
+    assert decisions == [True, False]  # listeners hear about changes only
+
+
+def test_decision_is_recomputed_when_the_oldest_trade_expires(gate):
+    manager, profitability, decisions = gate
+    _close(manager, 1, -20.0)
+    assert not profitability.can_trade(10000)[0]
+
+    get_clock().advance(23 * 3600)
+    assert not profitability.can_trade(10000)[0]
+    assert profitability.recomputations == 1
+
+    get_clock().advance(3600)
+    assert profitability.can_trade(10000) == (True, "Trade conditions met")
+    assert profitability.recomputations == 2
+    assert decisions == [False, True]
+
+
+def test_consecutive_losses_block_trading(gate):
+    manager, profitability, _ = gate
+    for ticket, profit in enumerate((50.0, 50.0, 50.0, 50.0, -1.0, -1.0, -1.0), start=1):
+        _close(manager, ticket, profit)
+
+    assert profitability.can_trade(10000) == (False, "Max consecutive losses (3) reached")
+
+
+def test_config_reload_invalidates_the_decision(gate):
+    manager, profitability, _ = gate
+    _close(manager, 1, -20.0)
+    assert not profitability.can_trade(10000)[0]
+
+    snapshot = get_config()._snapshot
+    relaxed = dataclasses.replace(profitability.settings, demo_mode=True)
+    profitability._on_config_reload(dataclasses.replace(snapshot, risk=relaxed))
+
+    assert profitability.can_trade(10000) == (True, "Demo mode - trading enabled")
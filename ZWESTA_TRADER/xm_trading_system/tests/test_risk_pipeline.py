@@ -0,0 +1,90 @@
+"""Tests for the pre-trade risk pipeline"""
+import pytest
+
+from src.trading.risk_pipeline import (
+    PositionLimitCheck, RiskCheck, RiskPipeline, TradeContext, reward_risk_ratio,
+)
+
+
+class _Check(RiskCheck):
+    def __init__(self, name, passed=True, error=None):
+        super().__init__()
+        self.name = name
+        self.passed = passed
+        self.error = error
+        self.calls = 0
+
+    def run(self, ctx):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        ctx.position_size += 1
+        return self.passed, f"{self.name} says {self.passed}"
+
+
+def _ctx():
+    return TradeContext("EURUSD", "BUY", {"bid": 1.1, "ask": 1.1002}, [], 10000.0)
+
+
+def test_risk_check_requires_run():
+    class Incomplete(RiskCheck):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_checks_run_in_order_and_share_context():
+    first, second = _Check("first"), _Check("second")
+    pipeline = RiskPipeline([first, second])
+    ctx = _ctx()
+
+    assert pipeline.evaluate(ctx) == (True, "All checks passed")
+    assert ctx.position_size == 2
+    assert pipeline.stats["second"]["calls"] == 1
+
+
+def test_first_rejection_stops_the_pipeline():
+    reject, after = _Check("limit", passed=False), _Check("after")
+    pipeline = RiskPipeline([reject, after])
+
+    assert pipeline.evaluate(_ctx()) == (False, "limit: limit says False")
+    assert after.calls == 0
+    assert pipeline.stats["limit"]["rejects"] == 1
+    assert "limit 1/1 rejected" in pipeline.get_stats()
+
+
+def test_check_error_is_a_rejection():
+    pipeline = RiskPipeline([_Check("broken", error=ValueError("no quote")), _Check("after")])
+
+    passed, reason = pipeline.evaluate(_ctx())
+    assert not passed and reason == "broken: error: no quote"
+
+
+def test_position_limit_counts_pending_entries():
+    class Manager:
+        def __init__(self):
+            self.pending_seen = []
+
+        def can_open_position(self, pending=0):
+            self.pending_seen.append(pending)
+            return pending < 2
+
+    manager = Manager()
+    pending = [0]
+    check = PositionLimitCheck(manager, lambda: pending[0])
+
+    assert check.run(_ctx())[0]
+    pending[0] = 2
+    assert check.run(_ctx()) == (False, "Position limit reached")
+    assert manager.pending_seen == [0, 2]
+
+
+@pytest.mark.parametrize("entry, stop_loss, take_profit, side, expected", [
+    (1.0, 0.99, 1.02, "BUY", 2.0),
+    (1.0, 1.01, 0.995, "SELL", 0.5),
+    (1.0, 1.0, 1.02, "BUY", 0.0),    # no risk
+    (1.0, 0.99, 0.98, "BUY", 0.0),   # TP on the wrong side
+])
+def test_reward_risk_ratio(entry, stop_loss, take_profit, side, expected):
+    assert reward_risk_ratio(entry, stop_loss, take_profit, side) == pytest.approx(expected)
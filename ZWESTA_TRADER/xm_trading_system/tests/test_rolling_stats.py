@@ -0,0 +1,58 @@
+"""Tests for the incrementally maintained 24h trade statistics"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.risk.rolling_stats import RollingWindowStats
+
+START = datetime(2026, 10, 17)
+
+
+def test_empty_window():
+    stats = RollingWindowStats()
+
+    assert stats.snapshot(START) == {"trades": 0, "wins": 0, "losses": 0, "win_rate": 0,
+                                     "total_profit": 0.0, "avg_profit": 0.0}
+    assert stats.next_expiry() is None
+
+
+def test_trades_leave_exactly_one_window_after_closing():
+    stats = RollingWindowStats()
+    stats.add(START, 30.0)
+    stats.add(START + timedelta(hours=1), -10.0)
+    assert stats.next_expiry() == START + timedelta(hours=24)
+
+    assert stats.snapshot(START + timedelta(hours=23, minutes=59))["trades"] == 2
+    snapshot = stats.snapshot(START + timedelta(hours=24))
+    assert snapshot == {"trades": 1, "wins": 0, "losses": 1, "win_rate": 0.0,
+                        "total_profit": -10.0, "avg_profit": -10.0}
+
+
+def test_consecutive_losses_reset_on_a_win():
+    stats = RollingWindowStats()
+    for profit in (-1.0, -2.0, 5.0, 0.0, -1.0):
+        stats.add(START, profit)
+
+    assert stats.consecutive_losses == 2  # a flat trade counts as a loss
+    assert stats.snapshot(START)["wins"] == 1
+
+
+def test_matches_a_full_recompute():
+    rng = random.Random(11)
+    stats = RollingWindowStats()
+    closed = []
+    now = START
+    for _ in range(3000):
+        now += timedelta(minutes=rng.randrange(0, 90))
+        if rng.random() < 0.7:
+            profit = round(rng.uniform(-50, 50), 2)
+            stats.add(now, profit)
+            closed.append((now, profit))
+
+        closed = [(t, p) for t, p in closed if t > now - timedelta(hours=24)]
+        window = [p for _, p in closed]
+        snapshot = stats.snapshot(now)
+        assert snapshot["trades"] == len(window)
+        assert snapshot["wins"] == sum(1 for p in window if p > 0)
+        assert snapshot["total_profit"] == pytest.approx(sum(window), abs=1e-6)
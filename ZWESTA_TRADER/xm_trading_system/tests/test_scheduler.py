@@ -0,0 +1,108 @@
+"""Tests for the heap scheduler on a virtual clock"""
+from datetime import datetime
+
+import pytest
+
+from src.utils.clock import VirtualClock
+from src.utils.scheduler import Scheduler
+
+START = 1792230000.0  # a multiple of 300
+
+
+def _recorder(clock, runs, name, cost=0.0):
+    def job():
+        runs.append((name, clock.time() - START))
+        clock.advance(cost)
+    return job
+
+
+def test_jobs_run_at_fixed_rate_in_due_order():
+    clock = VirtualClock(START)
+    scheduler = Scheduler(clock)
+    runs = []
+    scheduler.every("fast", 1, _recorder(clock, runs, "fast"))
+    scheduler.every("slow", 2.5, _recorder(clock, runs, "slow"), first_delay=0.5)
+
+    scheduler.run_until(START + 3)
+
+    assert runs == [("fast", 0), ("slow", 0.5), ("fast", 1), ("fast", 2), ("slow", 3), ("fast", 3)]
+    assert clock.time() == START + 3
+
+
+def test_overrun_skips_missed_slots_instead_of_bunching():
+    clock = VirtualClock(START)
+    scheduler = Scheduler(clock)
+    runs = []
+    job = scheduler.every("slow", 1, _recorder(clock, runs, "slow", cost=2.5))
+
+    scheduler.run_until(START + 6)
+
+    assert [t for _, t in runs] == [0, 3, 6]
+    assert job.overruns == 3 and job.skipped == 6  # two slots dropped per run
+
+
+def test_aligned_job_runs_after_each_boundary():
+    clock = VirtualClock(START + 100)
+    scheduler = Scheduler(clock)
+    runs = []
+    scheduler.every("bar_close", 300, _recorder(clock, runs, "bar"), align=True, offset=1)
+
+    scheduler.run_until(START + 700)
+
+    assert [t for _, t in runs] == [301, 601]
+
+
+def test_notify_runs_event_job_once_before_due_jobs():
+    clock = VirtualClock(START)
+    scheduler = Scheduler(clock)
+    runs = []
+    scheduler.every("scan", 5, _recorder(clock, runs, "scan"))
+    scheduler.on_event("exits", _recorder(clock, runs, "exits"))
+
+    scheduler.notify("exits")
+    scheduler.notify("exits")  # coalesced with the pending one
+    assert scheduler.run_pending() == 2
+    assert [name for name, _ in runs] == ["exits", "scan"]
+    assert scheduler.run_pending() == 0
+
+
+def test_run_soon_restarts_the_schedule_and_cancel_drops_the_job():
+    clock = VirtualClock(START)
+    scheduler = Scheduler(clock)
+    runs = []
+    scheduler.every("scan", 5, _recorder(clock, runs, "scan"), first_delay=5)
+
+    clock.advance(2)
+    scheduler.run_soon("scan")
+    scheduler.run_until(START + 8)
+    assert [t for _, t in runs] == [2, 7]
+
+    scheduler.cancel("scan")
+    scheduler.run_until(START + 20)
+    assert len(runs) == 2
+
+
+def test_failing_job_is_counted_and_rescheduled():
+    clock = VirtualClock(START)
+    scheduler = Scheduler(clock)
+    job = scheduler.every("broken", 1, lambda: 1 / 0)
+
+    scheduler.run_until(START + 2)
+
+    assert job.runs == 3 and job.errors == 3
+
+
+def test_interval_must_be_positive():
+    with pytest.raises(ValueError):
+        Scheduler(VirtualClock(START)).every("bad", 0, lambda: None)
+
+
+def test_virtual_clock_only_moves_forward():
+    clock = VirtualClock(START)
+    clock.advance_to(START - 10)
+    clock.advance(-5)
+    assert clock.time() == clock.monotonic() == START
+
+    clock.sleep(1.5)
+    assert clock.time() == START + 1.5
+    assert clock.utcnow() == datetime(2026, 10, 17, 9, 40, 1, 500000)
@@ -0,0 +1,98 @@
+"""Tests for trailing / breakeven stops and modify coalescing"""
+import pytest
+
+from src.risk.stop_manager import StopManager
+
+
+class _Terminal:
+    def __init__(self):
+        self.symbol_specs = {}
+        self.modifies = []
+
+    def modify_trade(self, ticket, stop_loss, take_profit, symbol=None):
+        self.modifies.append((ticket, stop_loss))
+        return True
+
+
+@pytest.fixture
+def stops(make_position_manager):
+    api = _Terminal()
+    manager = make_position_manager(api)
+    manager.add_position(1, "EURUSD", "BUY", 0.1, 1.0000, 0.9950, 1.0500)
+    stop_manager = StopManager(api, manager)
+    stop_manager.trailing_enabled = True
+    stop_manager.trailing_percent = 1.0
+    stop_manager.breakeven_offset = 0.3
+    stop_manager.min_step_points = 10
+    stop_manager.coalesce_seconds = 1.0
+    stop_manager.modify_budget = 10
+    stop_manager.budget_window = 60
+    return api, manager, stop_manager
+
+
+def _quote(bid):
+    return {"EURUSD": {"bid": bid, "ask": bid + 0.0002, "digits": 5}}
+
+
+def test_breakeven_then_trailing(stops):
+    api, manager, stop_manager = stops
+
+    stop_manager.on_quotes(_quote(1.0020))  # +0.2%: the trail is still below the stop
+    assert stop_manager.flush(now=100.0) == 0
+
+    stop_manager.on_quotes(_quote(1.0040))  # +0.4%: breakeven beats the 1% trail
+    assert stop_manager.flush(now=101.0) == 1
+    assert manager.open_positions.get(1).stop_loss == 1.0
+
+    stop_manager.on_quotes(_quote(1.0200))  # the trail is now above entry
+    stop_manager.flush(now=102.0)
+    assert api.modifies == [(1, 1.0), (1, 1.0098)]
+
+
+def test_stops_only_move_in_the_position_s_favour(stops):
+    api, _, stop_manager = stops
+    stop_manager.on_quotes(_quote(1.0200))
+    stop_manager.flush(now=100.0)
+
+    stop_manager.on_quotes(_quote(1.0150))  # pullback
+    stop_manager.on_quotes(_quote(1.02009))  # trail 9 points better: under min_step
+    assert stop_manager.flush(now=200.0) == 0
+    assert api.modifies == [(1, 1.0098)]
+
+
+def test_updates_within_the_interval_are_coalesced(stops):
+    api, _, stop_manager = stops
+    stop_manager.on_quotes(_quote(1.0200))
+    stop_manager.flush(now=100.0)
+
+    for bid in (1.0250, 1.0300, 1.0350):
+        stop_manager.on_quotes(_quote(bid))
+        stop_manager.flush(now=100.5)
+    assert len(api.modifies) == 1 and stop_manager.updates_coalesced == 2
+
+    assert stop_manager.flush(now=101.0) == 1
+    assert api.modifies[-1] == (1, round(1.0350 * 0.99, 5))  # only the latest stop is sent
+
+
+def test_modify_budget_per_symbol(stops):
+    api, manager, stop_manager = stops
+    stop_manager.modify_budget = 2
+    for ticket in (2, 3):
+        manager.add_position(ticket, "EURUSD", "BUY", 0.1, 1.0000, 0.9950, 1.0500)
+
+    stop_manager.on_quotes(_quote(1.0200))
+    assert stop_manager.flush(now=100.0) == 2
+    assert stop_manager.throttled == 1
+
+    assert stop_manager.flush(now=130.0) == 0  # budget still spent
+    assert stop_manager.flush(now=160.0) == 1  # window rolled over
+    assert sorted(t for t, _ in api.modifies) == [1, 2, 3]
+
+
+def test_closed_positions_drop_their_queued_stop(stops):
+    api, manager, stop_manager = stops
+    stop_manager.on_quotes(_quote(1.0200))
+    manager.open_positions.remove(1)
+
+    assert stop_manager.flush(now=100.0) == 0
+    assert stop_manager._pending == {} and api.modifies == []
@@ -0,0 +1,103 @@
+"""Tests for the binary tick recorder and replay"""
+import os
+
+from src.api.symbol_specs import SymbolSpec
+from src.data.tick_recorder import RECORD, Tick, TickRecorder, TickReplay, iter_segment
+
+# 2026-10-18 00:00:00 UTC in milliseconds
+MIDNIGHT_MSC = 1792281600000
+
+
+def _record(recorder, symbol, times, bid=1.1):
+    for i, time_msc in enumerate(times):
+        recorder.on_tick(symbol, Tick(time_msc, bid + i * 0.0001, bid + 0.0002 + i * 0.0001, 6))
+    recorder._drain()
+
+
+def _files(root, symbol):
+    return sorted(os.listdir(os.path.join(root, symbol)))
+
+
+def test_ticks_round_trip(tmp_path):
+    recorder = TickRecorder(root=str(tmp_path))
+    _record(recorder, "EURUSD", [1000, 2000, 3000])
+
+    (name,) = _files(str(tmp_path), "EURUSD")
+    ticks = list(iter_segment(os.path.join(str(tmp_path), "EURUSD", name)))
+    assert [t.time_msc for t in ticks] == [1000, 2000, 3000]
+    assert ticks[1].bid == 1.1001 and ticks[1].flags == 6
+    assert ticks[2].time == 3
+    assert recorder.recorded == 3
+
+
+def test_batch_across_midnight_is_split_by_day(tmp_path):
+    recorder = TickRecorder(root=str(tmp_path))
+    _record(recorder, "EURUSD", [MIDNIGHT_MSC - 1000, MIDNIGHT_MSC - 1, MIDNIGHT_MSC, MIDNIGHT_MSC + 500])
+
+    assert _files(str(tmp_path), "EURUSD") == ["20261017-0000.ticks", "20261018-0000.ticks"]
+    before, after = (
+        [t.time_msc for t in iter_segment(os.path.join(str(tmp_path), "EURUSD", name))]
+        for name in _files(str(tmp_path), "EURUSD")
+    )
+    assert before == [MIDNIGHT_MSC - 1000, MIDNIGHT_MSC - 1]
+    assert after == [MIDNIGHT_MSC, MIDNIGHT_MSC + 500]
+
+
+def test_repeated_quotes_are_recorded_once(tmp_path):
+    recorder = TickRecorder(root=str(tmp_path))
+    tick = Tick(1000, 1.1, 1.1002, 6)
+    for _ in range(3):
+        recorder.on_tick("EURUSD", tick)
+    recorder._drain()
+
+    assert recorder.recorded == 1
+    assert recorder.dropped_duplicates == 2
+
+
+def test_segment_rolls_over_by_size_and_never_reuses_old_files(tmp_path):
+    recorder = TickRecorder(root=str(tmp_path))
+    recorder.segment_bytes = 2 * RECORD.size
+    _record(recorder, "EURUSD", [1000, 2000])
+    _record(recorder, "EURUSD", [3000])
+    assert _files(str(tmp_path), "EURUSD") == ["19700101-0000.ticks", "19700101-0001.ticks"]
+
+    # A new run starts a fresh segment instead of appending to the last one
+    _record(TickRecorder(root=str(tmp_path)), "EURUSD", [4000])
+    assert len(_files(str(tmp_path), "EURUSD")) == 3
+
+
+def test_partial_trailing_record_is_ignored(tmp_path):
+    recorder = TickRecorder(root=str(tmp_path))
+    _record(recorder, "EURUSD", [1000, 2000])
+    path = os.path.join(str(tmp_path), "EURUSD", _files(str(tmp_path), "EURUSD")[0])
+    with open(path, "ab") as f:
+        f.write(RECORD.pack(3000, 1.2, 1.2002, 6)[:10])
+
+    assert [t.time_msc for t in iter_segment(path)] == [1000, 2000]
+
+
+def test_replay_merges_symbols_in_time_order(tmp_path):
+    recorder = TickRecorder(root=str(tmp_path))
+    _record(recorder, "GBPUSD", [1000, 3000, 5000], bid=1.3)
+    _record(recorder, "EURUSD", [1000, 2000, 6000])
+
+    replay = TickReplay(["EURUSD", "GBPUSD"], root=str(tmp_path), start_msc=1000, end_msc=6000)
+    seen = []
+    replay.add_tick_listener(lambda symbol, tick: seen.append((tick.time_msc, symbol)))
+
+    assert replay.run() == 5
+    assert seen == [(1000, "EURUSD"), (1000, "GBPUSD"), (2000, "EURUSD"), (3000, "GBPUSD"), (5000, "GBPUSD")]
+    assert replay.get_quote("GBPUSD")["bid"] == 1.3002
+
+
+def test_replay_serves_specs_saved_with_the_recording(tmp_path):
+    spec = SymbolSpec("EURUSD", digits=5, point=0.00001, tick_size=0.00001, tick_value=1.0,
+                      contract_size=100000, volume_min=0.01, volume_max=50, volume_step=0.01)
+    recorder = TickRecorder(root=str(tmp_path))
+    recorder.save_specs([spec])
+    _record(recorder, "EURUSD", [1000])
+
+    replay = TickReplay(["EURUSD", "GBPUSD"], root=str(tmp_path))
+    assert replay.symbol_specs.get("EURUSD") == spec
+    assert replay.symbol_specs.get("GBPUSD") is None
+    assert replay.run() == 1
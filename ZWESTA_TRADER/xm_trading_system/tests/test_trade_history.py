@@ -0,0 +1,67 @@
+"""Tests for the two-tier closed-trade history"""
+import os
+from datetime import datetime, timedelta
+
+from src.risk.trade_history import TRADE_DTYPE, TradeHistory
+
+DAY = datetime(2026, 10, 17)
+
+
+def _trade(ticket, close_time, symbol="EURUSD", profit=1.0, reason="Take Profit Hit"):
+    return {
+        "ticket": ticket, "symbol": symbol, "type": "BUY", "volume": 0.1,
+        "entry_price": 1.1, "stop_loss": 1.09, "take_profit": None, "close_price": 1.11,
+        "profit": profit, "entry_equity": 10000.0,
+        "open_time": close_time - timedelta(minutes=5), "close_time": close_time,
+        "close_reason": reason,
+    }
+
+
+def test_round_trip_through_hot_tier(tmp_path):
+    history = TradeHistory(root=str(tmp_path), hot_capacity=10)
+    history.append(_trade(1, DAY, reason="Stop Loss Hit"))
+
+    (trade,) = history.query()
+    assert trade["ticket"] == 1
+    assert trade["take_profit"] == 0.0
+    assert trade["open_time"] == DAY - timedelta(minutes=5)
+    assert trade["close_reason"] == "Stop Loss Hit"
+    assert not os.listdir(str(tmp_path))
+
+
+def test_spill_archives_oldest_trades_by_day(tmp_path):
+    history = TradeHistory(root=str(tmp_path), hot_capacity=4)
+    times = [DAY + timedelta(hours=10 * i) for i in range(6)]  # spans three days
+    for i, close_time in enumerate(times):
+        history.append(_trade(i, close_time))
+
+    assert len(history) == 6
+    assert history.archived_count() == 2
+    assert sorted(os.listdir(str(tmp_path))) == ["20261017.bin"]
+    assert os.path.getsize(os.path.join(str(tmp_path), "20261017.bin")) == 2 * TRADE_DTYPE.itemsize
+    assert [t["ticket"] for t in history.query()] == [0, 1, 2, 3, 4, 5]
+    assert [t["ticket"] for t in history.recent(2)] == [4, 5]
+
+
+def test_query_by_time_and_symbol_across_tiers(tmp_path):
+    history = TradeHistory(root=str(tmp_path), hot_capacity=4)
+    for i in range(8):
+        history.append(_trade(i, DAY + timedelta(hours=6 * i), symbol="GOLD" if i % 2 else "EURUSD"))
+
+    window = history.query(start=DAY + timedelta(hours=6), end=DAY + timedelta(hours=36))
+    assert [t["ticket"] for t in window] == [1, 2, 3, 4, 5]
+    assert [t["ticket"] for t in history.query(symbol="GOLD")] == [1, 3, 5, 7]
+    assert all(t["close_reason"] == "Take Profit Hit" for t in window)
+
+
+def test_flush_and_reopen(tmp_path):
+    history = TradeHistory(root=str(tmp_path), hot_capacity=10)
+    for i in range(3):
+        history.append(_trade(i, DAY + timedelta(days=i), reason="Manual" if i == 1 else "Stop Loss Hit"))
+    history.flush()
+
+    reopened = TradeHistory(root=str(tmp_path), hot_capacity=10)
+    assert len(reopened) == 3
+    trades = reopened.query(start=DAY + timedelta(days=1))
+    assert [(t["ticket"], t["close_reason"]) for t in trades] == [(1, "Manual"), (2, "Stop Loss Hit")]
+    assert trades[0]["entry_equity"] == 10000.0
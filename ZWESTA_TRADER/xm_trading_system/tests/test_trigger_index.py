@@ -0,0 +1,85 @@
+"""Tests for the SL/TP price-level trigger index"""
+import random
+
+from src.risk.trigger_index import TriggerIndex
+
+
+def test_buy_closes_at_bid_and_sell_at_ask():
+    index = TriggerIndex()
+    index.add(1, "EURUSD", "BUY", 1.0950, 1.1100)
+    index.add(2, "EURUSD", "SELL", 1.1050, 1.0900)
+
+    assert index.check("EURUSD", 1.0999, 1.1001) == []
+    # The ask crosses the SELL stop, the bid is still inside the BUY range
+    assert index.check("EURUSD", 1.1049, 1.1051) == [(2, "STOP_LOSS")]
+    assert index.check("EURUSD", 1.1100, 1.1102) == [(1, "TAKE_PROFIT")]
+    assert len(index) == 0
+
+
+def test_fired_and_removed_positions_do_not_fire_again():
+    index = TriggerIndex()
+    index.add(1, "EURUSD", "BUY", 1.0950, 1.1100)
+    index.add(2, "EURUSD", "BUY", 1.0950, 0)  # no take profit
+    index.remove(2)
+
+    assert index.check("EURUSD", 1.0940, 1.0942) == [(1, "STOP_LOSS")]
+    assert index.check("EURUSD", 1.2000, 1.2002) == []
+    assert 1 not in index
+
+
+def test_update_moves_the_levels():
+    index = TriggerIndex()
+    index.add(1, "GOLD", "SELL", 2010.0, 1990.0)
+    index.update(1, 2005.0, 1990.0)
+
+    assert index.check("GOLD", 2005.5, 2006.0) == [(1, "STOP_LOSS")]
+    index.update(1, 2000.0, 1980.0)  # fired positions are not re-armed by update()
+    assert len(index) == 0
+
+
+def test_matches_a_full_scan_with_churn():
+    rng = random.Random(3)
+    index = TriggerIndex()
+    levels = {}
+    for _ in range(5000):
+        action = rng.random()
+        if action < 0.4:
+            ticket = rng.randrange(300)
+            side = rng.choice(("BUY", "SELL"))
+            stop = round(rng.uniform(0.99, 1.0), 4)
+            target = round(rng.uniform(1.01, 1.02), 4) if rng.random() < 0.8 else 0
+            if side == "SELL":
+                stop, target = 2.01 - stop, (2.01 - target if target else 0)
+            index.add(ticket, "EURUSD", side, stop, target)
+            levels[ticket] = (side, stop, target)
+        elif action < 0.6 and levels:
+            ticket = rng.choice(list(levels))
+            index.remove(ticket)
+            del levels[ticket]
+        else:
+            bid = round(rng.uniform(0.985, 1.025), 4)
+            ask = bid + 0.0002
+            expected = set()
+            for ticket, (side, stop, target) in levels.items():
+                price = bid if side == "BUY" else ask
+                up, down = (target, stop) if side == "BUY" else (stop, target)
+                if up and price >= up:
+                    expected.add((ticket, "TAKE_PROFIT" if side == "BUY" else "STOP_LOSS"))
+                elif down and price <= down:
+                    expected.add((ticket, "STOP_LOSS" if side == "BUY" else "TAKE_PROFIT"))
+            fired = index.check("EURUSD", bid, ask)
+            assert set(fired) == expected and len(fired) == len(expected)
+            for ticket, _ in fired:
+                del levels[ticket]
+        assert len(index) == len(levels)
+
+
+def test_stale_entries_are_compacted():
+    index = TriggerIndex()
+    index.add(0, "EURUSD", "BUY", 0.9, 1.2)
+    for ticket in range(1, 3000):
+        index.add(ticket, "EURUSD", "BUY", 1.0, 1.1)
+        index.remove(ticket)
+
+    assert sum(len(heap) for heap in index._heaps.values()) < 2000
+    assert index.check("EURUSD", 1.2, 1.2002) == [(0, "TAKE_PROFIT")]